@@ -0,0 +1,66 @@
+"""
+This module holds functionality for delivering the results of pages to their `callback_url`.
+"""
+import concurrent.futures
+import logging
+import os
+from typing import List, Optional
+
+from sqlalchemy.engine import Row
+
+from core.pages import callbacks
+
+CALLBACK_DELIVERY_CONCURRENCY: int = int(os.getenv("CALLBACK_DELIVERY_CONCURRENCY", 8))
+
+logger = logging.getLogger(__name__)
+
+
+def deliver_page_callbacks(
+    pages: List[Row],
+    client: Optional[callbacks.CallbackClient] = None,
+    max_batch_size: int = callbacks.CALLBACK_BATCH_MAX_SIZE,
+    concurrency: int = CALLBACK_DELIVERY_CONCURRENCY,
+) -> List[int]:
+    """
+    Posts the pages to their `callback_url`, with 1 request per batch of pages per destination.
+
+    Batches are posted on a pool of `concurrency` threads,
+    so that 1 slow destination does not hold up the others.
+    A batch which fails does not fail the other batches.
+
+    Args:
+        pages: Rows of each page to be delivered, see `crud.get_page_callbacks()`.
+        client: The client to post with. Defaults to `callbacks.get_callback_client()`.
+        max_batch_size: The maximum number of pages to post in 1 request.
+        concurrency: The number of batches to post at once.
+
+    Returns:
+        (list) - The IDs of the pages whose delivery failed and should be retried.
+
+    """
+    client = client or callbacks.get_callback_client()
+    batches = callbacks.group_callbacks(pages, max_batch_size=max_batch_size)
+    if not batches:
+        return []
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(
+                client.post, callback_url, callbacks.build_callback_payload(callback_pages)
+            ): callback_pages
+            for callback_url, callback_pages in batches
+        }
+
+    retry_page_ids = []
+    for future, callback_pages in futures.items():
+        try:
+            future.result()
+        except callbacks.CallbackRejectedError:
+            logger.warning("Callback of %d pages was rejected", len(callback_pages), exc_info=True)
+        except callbacks.CallbackDeliveryError:
+            logger.warning(
+                "Could not deliver callback of %d pages", len(callback_pages), exc_info=True
+            )
+            retry_page_ids.extend(page.id for page in callback_pages)
+
+    return retry_page_ids
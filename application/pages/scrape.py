@@ -1,56 +1,504 @@
 """
 This module holds functionality for scraping a page.
 """
-import uuid
-from typing import Optional
+import concurrent.futures
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
 
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from core.pages.statistics import get_page_text_statistics
+from core.pages import counting, fetcher, profiling
+from core.pages.blob_store import BLOB_STORE_ENABLED, BlobStore, get_blob_store
+from core.pages.cache import PageTextStatistics
+from core.pages.coalescing import get_coalesced_page_statistics
+from core.pages.html_spool import HtmlSpool, get_html_spool
+from core.pages.statistics import get_blob_text_statistics, get_html_text_statistics
+from db.models import crud
 from db.models.page import Page
 
+STORE_WORD_COUNTS: bool = os.getenv("STORE_WORD_COUNTS", "false").lower() == "true"
+SCRAPE_BATCH_FETCH_CONCURRENCY: int = int(os.getenv("SCRAPE_BATCH_FETCH_CONCURRENCY", 8))
+SCRAPE_BATCH_PARSE_PROCESSES: int = int(os.getenv("SCRAPE_BATCH_PARSE_PROCESSES", 0))
+
+logger = logging.getLogger(__name__)
+
+
+def _get_enabled_blob_store() -> Optional[BlobStore]:
+    return get_blob_store() if BLOB_STORE_ENABLED else None
+
+
+def _get_stored_blob_key(content_hash: str, blob_store: Optional[BlobStore]) -> Optional[str]:
+    if blob_store is None or not blob_store.exists(content_hash):
+        return None
+    return content_hash
+
+
+def _truncate_results(results: Dict[str, int], page) -> Dict[str, int]:
+    return counting.truncate_word_counts(results, top_k=page.top_k, min_count=page.min_count)
+
+
+def _store_timings(timers: Dict[int, profiling.StageTimer], db: Optional[Session]) -> None:
+    # The timings are only there to diagnose slow pages,
+    # so failing to write them does not fail the scrape.
+    try:
+        Page.update_timings(
+            timings={page_id: timer.as_dict() for page_id, timer in timers.items()}, db=db
+        )
+    except SQLAlchemyError:
+        logger.exception("Could not store the timings of %d pages", len(timers))
+        if db is not None:
+            db.rollback()
+
+
+def run_scrape_pages(
+    pages: List[Page],
+    db: Optional[Session] = None,
+    fetch_concurrency: int = SCRAPE_BATCH_FETCH_CONCURRENCY,
+    parse_executor: Optional[concurrent.futures.Executor] = None,
+    blob_store: Optional[BlobStore] = None,
+) -> List[int]:
+    """
+    Scrapes a batch of `Page` objects concurrently,
+    writing their statuses and results with as few statements as possible.
+
+    All pages are marked as started with 1 statement.
+    Pages are then fetched on a pool of `fetch_concurrency` threads,
+    so that waiting on 1 slow host does not hold up the rest of the batch.
+    The results of the successful pages and the `DONE` status
+    are written with 1 bulk update, and the failed pages are marked with another.
+
+    A page which fails does not fail the rest of the batch.
+
+    The html is parsed with the `parser` selected for each `Page`,
+    falling back to the fastest installed parser.
+    Results of recent scrapes of the same URL are reused where the page has not changed,
+    and concurrent scrapes of the same URL are coalesced into a single fetch.
+    The results are counted within the `max_vocabulary` of the `Page`, if set,
+    and cut down to its `top_k` and `min_count` before being stored.
+    The html is written to the `blob_store` as it arrives,
+    and the key of the blob is stored on the `html_blob_key` field
+    so that the page can be reprocessed without being fetched again.
+
+    If `STORE_WORD_COUNTS` is enabled, the results are also written
+    to the `page_word_count` table, so that they can be paginated by the database.
+
+    Profiled pages are timed on their fetching threads,
+    and the writes of the batch are counted in full towards the "persist" stage of each.
+
+    Args:
+        pages: The `Page` objects which are to have scraping performed.
+        db: The session used to write the statuses and results.
+        fetch_concurrency: The number of pages to fetch at once.
+        parse_executor: The executor to parse the pages on, e.g. a process pool.
+            Defaults to parsing each page on its fetching thread as it arrives.
+        blob_store: The store to write the html of the pages to.
+            Defaults to `get_blob_store()` if `BLOB_STORE_ENABLED`.
+
+    Returns:
+        (list) - The IDs of the pages which failed.
+
+    """
+    if not pages:
+        return []
+
+    blob_store = blob_store or _get_enabled_blob_store()
+
+    if db is not None:
+        for page in pages:
+            if page in db:
+                db.expunge(page)
+
+    timers = {page.id: profiling.StageTimer() for page in pages if profiling.should_profile(page)}
+    try:
+        return _run_scrape_pages(
+            pages=pages,
+            timers=timers,
+            db=db,
+            fetch_concurrency=fetch_concurrency,
+            parse_executor=parse_executor,
+            blob_store=blob_store,
+        )
+    finally:
+        if timers:
+            _store_timings(timers, db=db)
+
+
+def _get_profiled_page_statistics(
+    page: Page, timer: Optional[profiling.StageTimer], **kwargs
+) -> PageTextStatistics:
+    with profiling.profile_scrape(timer, page_id=page.id):
+        return get_coalesced_page_statistics(
+            page.target_url, parser=page.parser, max_vocabulary=page.max_vocabulary, **kwargs
+        )
+
+
+def _run_scrape_pages(
+    pages: List[Page],
+    timers: Dict[int, profiling.StageTimer],
+    db: Optional[Session],
+    fetch_concurrency: int,
+    parse_executor: Optional[concurrent.futures.Executor],
+    blob_store: Optional[BlobStore],
+) -> List[int]:
+    with profiling.shared_stage(timers.values(), "persist"):
+        Page.update_statuses_by_ids(page_ids=[page.id for page in pages], status="STARTED", db=db)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=fetch_concurrency) as executor:
+        futures = {
+            executor.submit(
+                _get_profiled_page_statistics,
+                page,
+                timers.get(page.id),
+                parse_executor=parse_executor,
+                blob_store=blob_store,
+            ): page
+            for page in pages
+        }
+
+    # The results of the batch are written together,
+    # so the whole of the writing is counted towards each profiled page.
+    with profiling.shared_stage(timers.values(), "persist"):
+        done_pages, failed_page_ids = [], []
+        for future, page in futures.items():
+            try:
+                page_statistics = future.result()
+            except Exception:
+                logger.exception("Could not scrape page %s", page.id)
+                page.status = "FAILED"
+                failed_page_ids.append(page.id)
+                continue
+
+            page.results = _truncate_results(page_statistics.results, page)
+            page.html_blob_key = _get_stored_blob_key(page_statistics.content_hash, blob_store)
+            if STORE_WORD_COUNTS:
+                crud.replace_page_word_counts(page_id=page.id, results=page.results, db=db)
+                page.has_word_counts = True
+
+            page.status = "DONE"
+            done_pages.append(
+                {
+                    "id": page.id,
+                    "results": page.results,
+                    "has_word_counts": bool(page.has_word_counts),
+                    "html_blob_key": page.html_blob_key,
+                }
+            )
+
+        Page.bulk_update_results_and_status_to_done(pages=done_pages, db=db)
+
+        if failed_page_ids:
+            Page.update_statuses_by_ids(page_ids=failed_page_ids, status="FAILED", db=db)
+
+    return failed_page_ids
+
+
+def _store_fetched_html(
+    html: bytes, html_spool: Optional[HtmlSpool], blob_store: Optional[BlobStore]
+) -> Dict[str, str]:
+    if blob_store is not None:
+        return {"blob_key": blob_store.put(html)}
+
+    html_spool = html_spool or get_html_spool()
+    return {"html_reference": html_spool.put(html)}
+
+
+def fetch_pages(
+    pages: List[Page],
+    db: Optional[Session] = None,
+    fetch_concurrency: int = SCRAPE_BATCH_FETCH_CONCURRENCY,
+    html_spool: Optional[HtmlSpool] = None,
+    blob_store: Optional[BlobStore] = None,
+) -> Tuple[Dict[int, Dict], List[int]]:
+    """
+    Fetches a batch of `Page` objects concurrently and stores their html for the parse stage.
+
+    This is the first stage of the split pipeline, which only waits on the network.
+    All pages are marked as started with 1 statement,
+    fetched on a pool of `fetch_concurrency` threads,
+    and the pages which could not be fetched are marked as failed with another.
+    A page which fails does not fail the rest of the batch.
+
+    Unlike `run_scrape_pages()`, pages are always fetched in full,
+    since neither the result cache nor the coalescing of concurrent scrapes
+    are used by the split pipeline.
+
+    The html is written to the `blob_store` if `BLOB_STORE_ENABLED`,
+    otherwise to the `html_spool`, from which it is deleted once parsed.
+
+    Profiled pages are timed on their fetching threads, and their timings so far
+    are handed over to `parse_page()`, which writes them once the page is done.
+    The timings of the pages which could not be fetched are written here.
+
+    Args:
+        pages: The `Page` objects which are to be fetched.
+        db: The session used to write the statuses.
+        fetch_concurrency: The number of pages to fetch at once.
+        html_spool: The spool to write the html to. Defaults to `get_html_spool()`.
+        blob_store: The store to write the html to.
+            Defaults to `get_blob_store()` if `BLOB_STORE_ENABLED`.
+
+    Returns:
+        (tuple) - The arguments of `parse_page()` for each fetched page by its ID,
+            i.e. either the `blob_key` or the `html_reference` of its html
+            and the `fetch_timings` of a profiled page, and the IDs of the pages which failed.
 
-def run_scrape_page(page: Page, db: Optional[Session] = None) -> None:
     """
-    Updates the status of the `Page` object
-    around the calling of `scrape_page()`.
+    if not pages:
+        return {}, []
+
+    blob_store = blob_store or _get_enabled_blob_store()
+    if blob_store is None:
+        html_spool = html_spool or get_html_spool()
+
+    timers = {page.id: profiling.StageTimer() for page in pages if profiling.should_profile(page)}
+
+    with profiling.shared_stage(timers.values(), "persist"):
+        Page.update_statuses_by_ids(page_ids=[page.id for page in pages], status="STARTED", db=db)
+
+    def fetch_and_store(page: Page) -> Dict[str, str]:
+        with profiling.profile_scrape(timers.get(page.id), page_id=page.id):
+            html = fetcher.open_url(page.target_url)
+            return _store_fetched_html(html, html_spool=html_spool, blob_store=blob_store)
 
-    Note that `scrape_page()` is responsible for the real computation.
-    This function should be considered
-    as the synchronous version of the `run_scrape_page_task`.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=fetch_concurrency) as executor:
+        futures = {executor.submit(fetch_and_store, page): page for page in pages}
+
+    parse_arguments, failed_page_ids = {}, []
+    for future, page in futures.items():
+        try:
+            parse_arguments[page.id] = future.result()
+        except Exception:
+            logger.exception("Could not fetch page %s", page.id)
+            failed_page_ids.append(page.id)
+
+    if failed_page_ids:
+        failed_timers = {
+            page_id: timers[page_id] for page_id in failed_page_ids if page_id in timers
+        }
+        with profiling.shared_stage(failed_timers.values(), "persist"):
+            Page.update_statuses_by_ids(page_ids=failed_page_ids, status="FAILED", db=db)
+        if failed_timers:
+            _store_timings(failed_timers, db=db)
+
+    for page_id, timer in timers.items():
+        if page_id in parse_arguments:
+            parse_arguments[page_id]["fetch_timings"] = timer.as_dict()
+
+    return parse_arguments, failed_page_ids
+
+
+def parse_page(
+    page_id: int,
+    html_reference: Optional[str] = None,
+    parser: Optional[str] = None,
+    db: Optional[Session] = None,
+    html_spool: Optional[HtmlSpool] = None,
+    blob_key: Optional[str] = None,
+    blob_store: Optional[BlobStore] = None,
+    result_options: Optional[Dict[str, Optional[int]]] = None,
+    fetch_timings: Optional[Dict] = None,
+) -> None:
+    """
+    Parses the html fetched by `fetch_pages()` and writes the results along with the `DONE` status.
+
+    This is the second stage of the split pipeline, which only uses the CPU.
+    Html held in the spool is deleted once the page has been parsed or has failed,
+    whereas html held in the blob store is kept and recorded on the page.
+
+    If the page was profiled whilst it was fetched, its timings are carried on
+    through parsing and writing, and written to its `timings` once it is done or has failed.
 
     Args:
-        page: A `Page` object which is to have scraping performed.
+        page_id: The ID of the `Page` object which was fetched.
+        html_reference: The spool reference returned by `fetch_pages()`.
+        parser: The name of the parser to use.
+        db: The session used to write the status and results.
+        html_spool: The spool to read the html from. Defaults to `get_html_spool()`.
+        blob_key: The blob key returned by `fetch_pages()`, used instead of `html_reference`.
+        blob_store: The store to read the html from. Defaults to `get_blob_store()`.
+        result_options: The `top_k`, `min_count` and `max_vocabulary` of the page,
+            see `counting.ResultOptions`.
+        fetch_timings: The timings of the page whilst it was fetched, returned by `fetch_pages()`.
+            If None, the page is not profiled.
 
     Returns:
         None
 
     """
-    page.update_status_to_started(db=db)
+    timer = profiling.StageTimer.from_dict(fetch_timings) if fetch_timings is not None else None
+    try:
+        with profiling.profile_scrape(timer, page_id=page_id):
+            _parse_page(
+                page_id=page_id,
+                html_reference=html_reference,
+                parser=parser,
+                db=db,
+                html_spool=html_spool or get_html_spool(),
+                blob_key=blob_key,
+                blob_store=blob_store,
+                result_options=counting.ResultOptions(**(result_options or {})),
+            )
+    finally:
+        if timer is not None:
+            _store_timings({page_id: timer}, db=db)
+
 
+def _parse_page(
+    page_id: int,
+    html_reference: Optional[str],
+    parser: Optional[str],
+    db: Optional[Session],
+    html_spool: HtmlSpool,
+    blob_key: Optional[str],
+    blob_store: Optional[BlobStore],
+    result_options: counting.ResultOptions,
+) -> None:
     try:
-        scrape_page(page=page)
+        if blob_key is not None:
+            results = get_blob_text_statistics(
+                blob_key,
+                parser=parser,
+                blob_store=blob_store or get_blob_store(),
+                max_vocabulary=result_options.max_vocabulary,
+            )
+        else:
+            results = get_html_text_statistics(
+                html_spool.get(html_reference),
+                parser=parser,
+                max_vocabulary=result_options.max_vocabulary,
+            )
+        results = _truncate_results(results, result_options)
+
+        with profiling.stage("persist"):
+            if STORE_WORD_COUNTS:
+                crud.replace_page_word_counts(page_id=page_id, results=results, db=db)
+
+            Page.update_results_and_status_to_done(
+                page_id=page_id,
+                results=results,
+                has_word_counts=STORE_WORD_COUNTS,
+                html_blob_key=blob_key,
+                db=db,
+            )
     except Exception:
         # Logging should be made here so we can see why the action failed
-        page.update_status_to_failed(db=db)
+        with profiling.stage("persist"):
+            if db is not None:
+                db.rollback()
+            Page.update_statuses_by_ids(page_ids=[page_id], status="FAILED", db=db)
         raise
-
-    page.update_status_to_done(db=db)
+    finally:
+        if html_reference is not None:
+            html_spool.delete(html_reference)
 
 
-def scrape_page(page: Page) -> None:
+def reprocess_pages(
+    pages: List[Row],
+    db: Optional[Session] = None,
+    blob_store: Optional[BlobStore] = None,
+    parse_executor: Optional[concurrent.futures.Executor] = None,
+) -> List[int]:
     """
-    Scrapes the page by fetching text elements from the `target_url`.
-    The results of which are stored as JSON
-    on the `results` field of the `Page` object.
+    Recomputes the results of pages from their stored html, without fetching them again.
+
+    This picks up any change made to the parsers or text filters since the pages were scraped.
+    The statuses of the pages are left as they are and no status changes are published,
+    and a page whose html cannot be reprocessed keeps its previous results.
+    The new results are written with 1 bulk update.
 
     Args:
-        page: A `Page` object which is to have scraping performed.
+        pages: Rows of `id`, `parser`, `html_blob_key` and the result options of each page,
+            see `crud.get_page_blob_keys()`.
+        db: The session used to write the results.
+        blob_store: The store to read the html from. Defaults to `get_blob_store()`.
+            Cannot be combined with a `parse_executor`, which reads from the default store.
+        parse_executor: The executor to parse the pages on, e.g. a process pool.
+            Defaults to parsing each page in turn in the current process.
 
     Returns:
-        None
+        (list) - The IDs of the pages which could not be reprocessed.
+
+    """
+    if parse_executor is None:
+        compute_results = [
+            functools.partial(
+                get_blob_text_statistics,
+                page.html_blob_key,
+                parser=page.parser,
+                blob_store=blob_store,
+                max_vocabulary=page.max_vocabulary,
+            )
+            for page in pages
+        ]
+    else:
+        compute_results = [
+            parse_executor.submit(
+                get_blob_text_statistics,
+                page.html_blob_key,
+                page.parser,
+                max_vocabulary=page.max_vocabulary,
+            ).result
+            for page in pages
+        ]
+
+    reprocessed_pages, failed_page_ids = [], []
+    for page, compute_result in zip(pages, compute_results):
+        try:
+            results = _truncate_results(compute_result(), page)
+        except Exception:
+            logger.exception("Could not reprocess page %s", page.id)
+            failed_page_ids.append(page.id)
+            continue
+
+        if STORE_WORD_COUNTS:
+            crud.replace_page_word_counts(page_id=page.id, results=results, db=db)
+
+        reprocessed_pages.append(
+            {
+                "id": page.id,
+                "results": results,
+                "has_word_counts": STORE_WORD_COUNTS,
+                "html_blob_key": page.html_blob_key,
+            }
+        )
+
+    Page.bulk_replace_results(pages=reprocessed_pages, db=db)
 
+    return failed_page_ids
+
+
+_parse_executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_parse_executor_lock = threading.Lock()
+
+
+def get_parse_executor() -> Optional[concurrent.futures.ProcessPoolExecutor]:
     """
-    page_statistics = get_page_text_statistics(page.target_url)
+    Gets the process pool used to parse pages in the current process.
+
+    Daemonic processes, e.g. the children of the Celery prefork pool,
+    cannot start processes of their own,
+    so pages are parsed on their fetching threads instead.
+
+    Returns:
+        (ProcessPoolExecutor) - The pool of `SCRAPE_BATCH_PARSE_PROCESSES` processes,
+            None if it is disabled or cannot be used in this process.
+
+    """
+    global _parse_executor
+
+    if SCRAPE_BATCH_PARSE_PROCESSES <= 0 or multiprocessing.current_process().daemon:
+        return None
+
+    with _parse_executor_lock:
+        if _parse_executor is None:
+            _parse_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=SCRAPE_BATCH_PARSE_PROCESSES
+            )
 
-    page.results = page_statistics
+    return _parse_executor
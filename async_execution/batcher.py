@@ -0,0 +1,175 @@
+"""
+This module holds functionality for batching page IDs before their tasks are dispatched.
+
+Pages created within `SCRAPE_TASK_BATCH_WINDOW` seconds of each other
+are dispatched together as 1 `run_scrape_pages_task`,
+so that the worker scrapes them concurrently rather than 1 task at a time.
+A batch is dispatched early once it holds `SCRAPE_TASK_BATCH_MAX_SIZE` pages.
+
+Likewise, pages completed by a worker process within `CALLBACK_BATCH_WINDOW` seconds
+of each other are delivered to their `callback_url` by 1 `deliver_page_callbacks_task`.
+
+Batches are held in the memory of the process,
+so `close()` must be called on shutdown to dispatch any pending page IDs.
+This is done for the callback batcher when the worker process shuts down.
+"""
+import concurrent.futures
+import logging
+import os
+import threading
+from typing import Callable, List, Optional
+
+from celery.signals import worker_process_shutdown, worker_shutdown
+
+from async_execution.tasks import dispatch_page_callback_tasks, dispatch_scrape_page_tasks
+from core.pages.callbacks import CALLBACK_BATCH_MAX_SIZE
+
+SCRAPE_TASK_BATCH_WINDOW: float = float(os.getenv("SCRAPE_TASK_BATCH_WINDOW", 0.05))
+SCRAPE_TASK_BATCH_MAX_SIZE: int = int(os.getenv("SCRAPE_TASK_BATCH_MAX_SIZE", 100))
+CALLBACK_BATCH_WINDOW: float = float(os.getenv("CALLBACK_BATCH_WINDOW", 1))
+
+logger = logging.getLogger(__name__)
+
+
+class PageIdBatcher:
+    """
+    Collects page IDs and passes them to `dispatch` in batches.
+
+    Batches are dispatched on a background thread,
+    so adding a page ID never waits on the broker.
+    """
+
+    def __init__(
+        self,
+        dispatch: Callable[[List[int]], None],
+        window: float = SCRAPE_TASK_BATCH_WINDOW,
+        max_size: int = SCRAPE_TASK_BATCH_MAX_SIZE,
+    ):
+        self.dispatch = dispatch
+        self.window = window
+        self.max_size = max_size
+        self.page_ids: List[int] = []
+        self.lock = threading.Lock()
+        self.timer: Optional[threading.Timer] = None
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def add(self, page_id: int) -> None:
+        """
+        Adds the `page_id` to the current batch.
+
+        The batch is dispatched once it is full or once the `window` has passed
+        since its first page ID was added.
+
+        Args:
+            page_id: The ID of the `Page` object to be scraped.
+
+        Returns:
+            None
+
+        """
+        with self.lock:
+            self.page_ids.append(page_id)
+
+            if len(self.page_ids) >= self.max_size:
+                self._submit(self._take_batch())
+            elif self.timer is None:
+                self.timer = threading.Timer(self.window, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def flush(self) -> None:
+        with self.lock:
+            self._submit(self._take_batch())
+
+    def close(self) -> None:
+        """
+        Dispatches any pending page IDs and waits for all batches to be dispatched.
+
+        Returns:
+            None
+
+        """
+        self.flush()
+        self.executor.shutdown(wait=True)
+
+    def _take_batch(self) -> List[int]:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+        page_ids, self.page_ids = self.page_ids, []
+        return page_ids
+
+    def _submit(self, page_ids: List[int]) -> None:
+        if page_ids:
+            self.executor.submit(self._dispatch, page_ids)
+
+    def _dispatch(self, page_ids: List[int]) -> None:
+        try:
+            self.dispatch(page_ids)
+        except Exception:
+            logger.exception("Could not dispatch tasks for pages %s", page_ids)
+
+
+_page_id_batcher: Optional[PageIdBatcher] = None
+_page_id_batcher_lock = threading.Lock()
+
+
+def get_page_id_batcher() -> Optional[PageIdBatcher]:
+    """
+    Gets the `PageIdBatcher` for the current process.
+
+    Returns:
+        (PageIdBatcher) - The batcher, None if `SCRAPE_TASK_BATCH_WINDOW` is 0.
+
+    """
+    global _page_id_batcher
+
+    if SCRAPE_TASK_BATCH_WINDOW <= 0:
+        return None
+
+    with _page_id_batcher_lock:
+        if _page_id_batcher is None:
+            _page_id_batcher = PageIdBatcher(dispatch=dispatch_scrape_page_tasks)
+
+    return _page_id_batcher
+
+
+_callback_batcher: Optional[PageIdBatcher] = None
+_callback_batcher_lock = threading.Lock()
+
+
+def get_callback_batcher() -> Optional[PageIdBatcher]:
+    """
+    Gets the `PageIdBatcher` of pages to be posted to their `callback_url` for the current process.
+
+    Returns:
+        (PageIdBatcher) - The batcher, None if `CALLBACK_BATCH_WINDOW` is 0.
+
+    """
+    global _callback_batcher
+
+    if CALLBACK_BATCH_WINDOW <= 0:
+        return None
+
+    with _callback_batcher_lock:
+        if _callback_batcher is None:
+            _callback_batcher = PageIdBatcher(
+                dispatch=dispatch_page_callback_tasks,
+                window=CALLBACK_BATCH_WINDOW,
+                max_size=CALLBACK_BATCH_MAX_SIZE,
+            )
+
+    return _callback_batcher
+
+
+@worker_shutdown.connect
+@worker_process_shutdown.connect
+def close_callback_batcher(**kwargs) -> None:
+    global _callback_batcher
+
+    with _callback_batcher_lock:
+        callback_batcher, _callback_batcher = _callback_batcher, None
+
+    if callback_batcher is not None:
+        callback_batcher.close()
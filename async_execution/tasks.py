@@ -1,16 +1,39 @@
 """
 This module holds decorated asynchronous tasks
 """
-from application.pages.scrape import run_scrape_page
+import logging
+import os
+from typing import Dict, List, Optional
+
+from application.pages.callbacks import deliver_page_callbacks
+from application.pages.scrape import (
+    fetch_pages,
+    get_parse_executor,
+    parse_page,
+    reprocess_pages,
+    run_scrape_pages,
+)
 from celery_app import celery
+from core.pages.callbacks import compute_backoff
 from db.models import crud
-from db.session import SessionLocal
+from db.session import session_scope
+
+SCRAPE_PAGE_TASK_CHUNK_SIZE: int = int(os.getenv("SCRAPE_PAGE_TASK_CHUNK_SIZE", 100))
+SCRAPE_PIPELINE: str = os.getenv("SCRAPE_PIPELINE", "single")
+REPROCESS_PAGE_TASK_CHUNK_SIZE: int = int(os.getenv("REPROCESS_PAGE_TASK_CHUNK_SIZE", 500))
+CALLBACK_MAX_ATTEMPTS: int = int(os.getenv("CALLBACK_MAX_ATTEMPTS", 6))
+
+logger = logging.getLogger(__name__)
 
 
 @celery.task(ignore_result=True)
 def run_scrape_page_task(page_id: int):
     """
-    Calls `run_scrape_page()` within the context of a celery task.
+    Scrapes a single page by calling `run_scrape_pages_task` for it.
+
+    Deprecated: pages are only dispatched to `run_scrape_pages_task` and `fetch_pages_task`,
+    see `dispatch_scrape_page_tasks()`. This task is only kept so that messages queued
+    by earlier releases are still scraped, and is to be removed in the next release.
 
     Args:
         page_id: The ID of the `Page` object to be scraped.
@@ -19,6 +42,281 @@ def run_scrape_page_task(page_id: int):
         None
 
     """
-    db = SessionLocal()
-    page = crud.get_page_by_id(page_id=page_id, db=db)
-    run_scrape_page(page=page, db=db)
+    logger.warning(
+        "run_scrape_page_task is deprecated, scraping page %s with run_scrape_pages_task", page_id
+    )
+    run_scrape_pages_task([page_id])
+
+
+@celery.task(ignore_result=True)
+def run_scrape_pages_task(page_ids: List[int]):
+    """
+    Calls `run_scrape_pages()` for a batch of pages within the context of a celery task.
+
+    The pages are loaded with 1 query and share 1 session,
+    which is closed once the task finishes.
+    The pages which have a `callback_url` are then posted to it.
+
+    Args:
+        page_ids: The IDs of the `Page` objects to be scraped.
+
+    Returns:
+        None
+
+    """
+    with session_scope(expire_on_commit=False) as db:
+        pages = crud.get_pages_by_ids(page_ids=page_ids, db=db)
+        run_scrape_pages(pages=pages, db=db, parse_executor=get_parse_executor())
+
+    enqueue_page_callbacks([page.id for page in pages if page.callback_url])
+
+
+@celery.task(ignore_result=True)
+def fetch_pages_task(page_ids: List[int]):
+    """
+    Calls `fetch_pages()` for a batch of pages and hands each fetched page to a `parse_page_task`.
+
+    This task is routed to the `io` queue.
+    The pages which cannot be fetched are posted to their `callback_url` as failed.
+
+    Args:
+        page_ids: The IDs of the `Page` objects to be fetched.
+
+    Returns:
+        None
+
+    """
+    with session_scope(expire_on_commit=False) as db:
+        pages = crud.get_pages_by_ids(page_ids=page_ids, db=db)
+        parse_arguments, failed_page_ids = fetch_pages(pages=pages, db=db)
+
+    for page in pages:
+        if page.id in parse_arguments:
+            _dispatch_parse_page_task(page, parse_arguments[page.id])
+
+    failed_page_ids = set(failed_page_ids)
+    enqueue_page_callbacks(
+        [page.id for page in pages if page.id in failed_page_ids and page.callback_url]
+    )
+
+
+def _dispatch_parse_page_task(page, parse_arguments: Dict) -> None:
+    result_options = {
+        "top_k": page.top_k,
+        "min_count": page.min_count,
+        "max_vocabulary": page.max_vocabulary,
+    }
+    parse_page_task.delay(
+        page_id=page.id,
+        parser=page.parser,
+        result_options=result_options,
+        has_callback_url=bool(page.callback_url),
+        **parse_arguments,
+    )
+
+
+@celery.task(ignore_result=True)
+def parse_page_task(
+    page_id: int,
+    html_reference: Optional[str] = None,
+    parser: Optional[str] = None,
+    blob_key: Optional[str] = None,
+    result_options: Optional[Dict[str, Optional[int]]] = None,
+    has_callback_url: bool = False,
+    fetch_timings: Optional[Dict] = None,
+):
+    """
+    Calls `parse_page()` for html which has been fetched by the `fetch_pages_task`.
+
+    This task is routed to the `cpu` queue.
+    The page is then posted to its `callback_url`, whether or not it succeeded.
+
+    Args:
+        page_id: The ID of the `Page` object which was fetched.
+        html_reference: The reference to the fetched html within the spool.
+        parser: The name of the parser to use.
+        blob_key: The key of the fetched html within the blob store,
+            given instead of the `html_reference`.
+        result_options: The `top_k`, `min_count` and `max_vocabulary` of the page.
+        has_callback_url: Whether the page is to be posted to its `callback_url`.
+        fetch_timings: The timings of the page whilst it was fetched, if it is profiled.
+
+    Returns:
+        None
+
+    """
+    try:
+        with session_scope() as db:
+            parse_page(
+                page_id=page_id,
+                html_reference=html_reference,
+                parser=parser,
+                blob_key=blob_key,
+                result_options=result_options,
+                fetch_timings=fetch_timings,
+                db=db,
+            )
+    finally:
+        if has_callback_url:
+            enqueue_page_callbacks([page_id])
+
+
+@celery.task(ignore_result=True)
+def reprocess_pages_task(page_ids: List[int]):
+    """
+    Calls `reprocess_pages()` for a batch of pages within the context of a celery task.
+
+    This task is routed to the `cpu` queue.
+    Pages without stored html are skipped.
+
+    Args:
+        page_ids: The IDs of the `Page` objects to be reprocessed.
+
+    Returns:
+        None
+
+    """
+    with session_scope() as db:
+        pages = crud.get_page_blob_keys(page_ids=page_ids, db=db)
+        reprocess_pages(pages=pages, db=db, parse_executor=get_parse_executor())
+
+
+@celery.task(ignore_result=True)
+def reprocess_all_pages_task(chunk_size: int = REPROCESS_PAGE_TASK_CHUNK_SIZE):
+    """
+    Dispatches a `reprocess_pages_task` for every page whose html has been stored.
+
+    The page IDs are read in batches of `chunk_size` by keyset pagination,
+    so that the IDs of every page are never held in memory at once.
+
+    Args:
+        chunk_size: The number of pages to be reprocessed per task message.
+
+    Returns:
+        None
+
+    """
+    after = 0
+    while True:
+        page_ids = crud.get_page_ids_with_blobs(limit=chunk_size, after=after)
+        if not page_ids:
+            return
+
+        reprocess_pages_task.delay(page_ids)
+        after = page_ids[-1]
+
+
+@celery.task(ignore_result=True)
+def deliver_page_callbacks_task(page_ids: List[int], attempt: int = 1):
+    """
+    Calls `deliver_page_callbacks()` for a batch of pages within the context of a celery task.
+
+    This task is routed to the `io` queue.
+    Pages whose delivery failed are retried by another task after a delay,
+    which grows exponentially with each attempt, see `compute_backoff()`.
+    They are given up on after `CALLBACK_MAX_ATTEMPTS` attempts.
+
+    Args:
+        page_ids: The IDs of the `Page` objects to be delivered.
+        attempt: The number of this attempt at delivering the pages, starting from 1.
+
+    Returns:
+        None
+
+    """
+    with session_scope() as db:
+        pages = crud.get_page_callbacks(page_ids=page_ids, db=db)
+
+    retry_page_ids = deliver_page_callbacks(pages=pages)
+    if not retry_page_ids:
+        return
+
+    if attempt >= CALLBACK_MAX_ATTEMPTS:
+        logger.error(
+            "Gave up delivering callbacks of pages %s after %d attempts", retry_page_ids, attempt
+        )
+        return
+
+    deliver_page_callbacks_task.apply_async(
+        args=(retry_page_ids,),
+        kwargs={"attempt": attempt + 1},
+        countdown=compute_backoff(attempt),
+    )
+
+
+def dispatch_page_callback_tasks(page_ids: List[int]) -> None:
+    deliver_page_callbacks_task.delay(page_ids)
+
+
+def enqueue_page_callbacks(page_ids: List[int]) -> None:
+    """
+    Queues the `page_ids` to be posted to their `callback_url`.
+
+    Pages completed by the current process within `CALLBACK_BATCH_WINDOW` seconds of each other
+    are delivered by 1 `deliver_page_callbacks_task`,
+    so that the pages of each destination are posted together.
+
+    Args:
+        page_ids: The IDs of the `Page` objects which are done or have failed.
+
+    Returns:
+        None
+
+    """
+    # Imported here since the batcher module dispatches the tasks of this module.
+    from async_execution.batcher import get_callback_batcher
+
+    if not page_ids:
+        return
+
+    callback_batcher = get_callback_batcher()
+    if callback_batcher is None:
+        dispatch_page_callback_tasks(page_ids)
+        return
+
+    for page_id in page_ids:
+        callback_batcher.add(page_id)
+
+
+def dispatch_scrape_page_tasks(
+    page_ids: List[int], chunk_size: int = SCRAPE_PAGE_TASK_CHUNK_SIZE
+) -> None:
+    """
+    Dispatches `run_scrape_pages_task` for the `page_ids`.
+
+    The page IDs are split into chunks of `chunk_size`,
+    with 1 message published to the broker per chunk rather than per page.
+    The pages within each chunk are then scraped concurrently by the worker.
+
+    If `SCRAPE_PIPELINE` is "split", `fetch_pages_task` is dispatched per chunk instead,
+    which hands each page over to a `parse_page_task` once it has been fetched.
+
+    Args:
+        page_ids: The IDs of the `Page` objects to be scraped.
+        chunk_size: The number of pages to be scraped per task message.
+
+    Returns:
+        None
+
+    """
+    task = fetch_pages_task if SCRAPE_PIPELINE == "split" else run_scrape_pages_task
+    for start in range(0, len(page_ids), chunk_size):
+        task.delay(page_ids[start : start + chunk_size])
+
+
+def dispatch_reprocess_page_tasks(
+    page_ids: List[int], chunk_size: int = REPROCESS_PAGE_TASK_CHUNK_SIZE
+) -> None:
+    """
+    Dispatches `reprocess_pages_task` for the `page_ids`, in chunks of `chunk_size`.
+
+    Args:
+        page_ids: The IDs of the `Page` objects to be reprocessed.
+        chunk_size: The number of pages to be reprocessed per task message.
+
+    Returns:
+        None
+
+    """
+    for start in range(0, len(page_ids), chunk_size):
+        reprocess_pages_task.delay(page_ids[start : start + chunk_size])
@@ -0,0 +1,138 @@
+"""
+This module holds a benchmark for the word counting strategies in `core.pages.counting`.
+
+The visible text blocks of each html fixture are found once up front with `BeautifulSoup`,
+so that only the splitting, filtering and counting are timed.
+Each fixture is also repeated `--scale` times, to show how the strategies cope
+with pages holding millions of words.
+
+Usage:
+
+    python -m benchmarks.counting --repeat 5 --scale 1 10 --fixtures-dir benchmarks/fixtures
+
+The "numpy" strategy is only run if the optional `numpy` package is installed.
+"""
+import argparse
+import time
+from pathlib import Path
+from typing import List, NamedTuple
+
+from benchmarks.parsers import DEFAULT_FIXTURES_DIR, load_fixtures
+from core.pages import beautiful_soup_crawler, counting
+from core.pages.statistics import DEFAULT_TEXT_FILTERS
+
+
+class CountingBenchmarkResult(NamedTuple):
+    strategy: str
+    fixture: str
+    scale: int
+    tokens: int
+    tokens_per_second: float
+
+
+def benchmark_strategy(
+    strategy: str, fixture: str, text_blocks: List[str], scale: int, repeat: int
+) -> CountingBenchmarkResult:
+    """
+    Benchmarks the counting `strategy` against the `text_blocks`.
+
+    The fastest of the `repeat` runs is used for the throughput,
+    since slower runs are generally caused by noise from elsewhere on the machine.
+
+    Args:
+        strategy: The name of the counting strategy.
+        fixture: The name of the fixture the `text_blocks` were found in.
+        text_blocks: The visible text of the fixture, repeated `scale` times.
+        scale: The number of times the fixture was repeated.
+        repeat: The number of timed runs.
+
+    Returns:
+        (CountingBenchmarkResult) - The measurements for this strategy and fixture.
+
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        word_counts = counting.count_words_in_text_blocks(
+            text_blocks, apply_text_filters=DEFAULT_TEXT_FILTERS, strategy=strategy
+        )
+        timings.append(time.perf_counter() - start)
+
+    tokens = sum(word_counts.values())
+    return CountingBenchmarkResult(
+        strategy=strategy,
+        fixture=fixture,
+        scale=scale,
+        tokens=tokens,
+        tokens_per_second=tokens / min(timings),
+    )
+
+
+def run_benchmarks(
+    fixtures_dir: Path, scales: List[int], repeat: int
+) -> List[CountingBenchmarkResult]:
+    """
+    Benchmarks every available counting strategy against every fixture at every scale.
+
+    Each strategy is checked to count the same words as the "tokens" strategy.
+
+    Args:
+        fixtures_dir: The directory holding `.html` fixtures.
+        scales: The numbers of times to repeat each fixture.
+        repeat: The number of timed runs per strategy, fixture and scale.
+
+    Raises:
+        AssertionError: If a strategy counts different words.
+
+    Returns:
+        (list) - The measurements for each strategy, fixture and scale.
+
+    """
+    strategies = [
+        strategy
+        for strategy in counting.COUNTING_STRATEGIES
+        if counting.is_counting_strategy_available(strategy)
+    ]
+
+    results = []
+    for fixture, html in load_fixtures(fixtures_dir).items():
+        all_text = beautiful_soup_crawler.find_all_text_in_html(html)
+        fixture_blocks = list(beautiful_soup_crawler.filter_for_visible_text_blocks(all_text))
+        expected_word_counts = counting.count_words_in_text_blocks(
+            fixture_blocks, apply_text_filters=DEFAULT_TEXT_FILTERS, strategy="tokens"
+        )
+
+        for strategy in strategies:
+            word_counts = counting.count_words_in_text_blocks(
+                fixture_blocks, apply_text_filters=DEFAULT_TEXT_FILTERS, strategy=strategy
+            )
+            if word_counts != expected_word_counts:
+                raise AssertionError(f"{strategy} counted different words for {fixture}")
+
+        for scale in scales:
+            text_blocks = fixture_blocks * scale
+            results.extend(
+                benchmark_strategy(strategy, fixture, text_blocks, scale, repeat)
+                for strategy in strategies
+            )
+    return results
+
+
+def format_results(results: List[CountingBenchmarkResult]) -> str:
+    lines = [f"{'fixture':<10} {'scale':>5} {'tokens':>9} {'strategy':<9} {'tokens/s':>14}"]
+    for result in results:
+        lines.append(
+            f"{result.fixture:<10} {result.scale:>5} {result.tokens:>9} {result.strategy:<9} "
+            f"{result.tokens_per_second:>14,.0f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--fixtures-dir", type=Path, default=DEFAULT_FIXTURES_DIR)
+    argument_parser.add_argument("--scale", type=int, nargs="+", default=[1, 10])
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    arguments = argument_parser.parse_args()
+
+    print(format_results(run_benchmarks(arguments.fixtures_dir, arguments.scale, arguments.repeat)))
@@ -0,0 +1,147 @@
+"""
+This module holds a load test for the API.
+
+A fixed number of GET requests are sent to the given paths by `concurrency` clients at once,
+and the latency percentiles and throughput are reported.
+This is useful for comparing how a single uvicorn worker copes as concurrency grows,
+e.g. before and after a change to how handlers access the database.
+
+Usage:
+
+    uvicorn main:app --port 8000 --workers 1
+    python -m benchmarks.load_test --base-url http://localhost:8000 --concurrency 200 \\
+        --requests 5000 --paths "/pages/?limit=100" /pages/1
+
+Each client is a thread holding a keep-alive connection,
+so the measured latency includes the time spent waiting for the server
+but not the time spent opening connections.
+"""
+import argparse
+import concurrent.futures
+import itertools
+import statistics
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+import urllib3
+
+DEFAULT_PATHS: List[str] = ["/pages/?limit=100", "/pages/1"]
+
+
+class LoadTestResult(NamedTuple):
+    concurrency: int
+    requests: int
+    errors: int
+    duration_in_seconds: float
+    latencies_in_milliseconds: List[float]
+
+    @property
+    def requests_per_second(self) -> float:
+        return self.requests / self.duration_in_seconds
+
+    def percentile(self, percent: int) -> float:
+        if len(self.latencies_in_milliseconds) < 2:
+            return self.latencies_in_milliseconds[0] if self.latencies_in_milliseconds else 0.0
+        return statistics.quantiles(self.latencies_in_milliseconds, n=100)[percent - 1]
+
+
+def send_request(pool_manager: urllib3.PoolManager, url: str) -> Optional[float]:
+    """
+    Sends a GET request to the `url` and measures its latency.
+
+    Args:
+        pool_manager: The client whose connections are kept alive between requests.
+        url: The URL to request.
+
+    Returns:
+        (float) - The latency in milliseconds, None if the request failed.
+
+    """
+    start = time.perf_counter()
+    try:
+        response = pool_manager.request("GET", url, retries=False)
+    except urllib3.exceptions.HTTPError:
+        return None
+
+    if response.status >= 400:
+        return None
+
+    return (time.perf_counter() - start) * 1000
+
+
+def run_load_test(
+    base_url: str, paths: List[str], concurrency: int, requests: int
+) -> LoadTestResult:
+    """
+    Sends `requests` GET requests to the `paths` in turn, with `concurrency` in flight at once.
+
+    Args:
+        base_url: The scheme and host of the running API.
+        paths: The paths to request, cycled through in order.
+        concurrency: The number of requests in flight at once.
+        requests: The total number of requests to send.
+
+    Returns:
+        (LoadTestResult) - The latency of each successful request and the number of errors.
+
+    """
+    pool_manager = urllib3.PoolManager(maxsize=concurrency, block=True)
+    urls = itertools.cycle([base_url.rstrip("/") + path for path in paths])
+    urls_lock = threading.Lock()
+
+    def next_url() -> str:
+        with urls_lock:
+            return next(urls)
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(
+            executor.map(lambda _: send_request(pool_manager, next_url()), range(requests))
+        )
+    duration = time.perf_counter() - start
+
+    successful_latencies = [latency for latency in latencies if latency is not None]
+    return LoadTestResult(
+        concurrency=concurrency,
+        requests=requests,
+        errors=requests - len(successful_latencies),
+        duration_in_seconds=duration,
+        latencies_in_milliseconds=successful_latencies,
+    )
+
+
+def format_results(results: List[LoadTestResult]) -> str:
+    lines = [
+        f"{'concurrency':>11} {'req/s':>9} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.concurrency:>11} {result.requests_per_second:>9.1f} "
+            f"{result.percentile(50):>9.1f} {result.percentile(90):>9.1f} "
+            f"{result.percentile(99):>9.1f} {result.errors:>7}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--base-url", default="http://localhost:8000")
+    argument_parser.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    argument_parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    argument_parser.add_argument("--requests", type=int, default=2000)
+    arguments = argument_parser.parse_args()
+
+    print(
+        format_results(
+            [
+                run_load_test(
+                    base_url=arguments.base_url,
+                    paths=arguments.paths,
+                    concurrency=concurrency,
+                    requests=arguments.requests,
+                )
+                for concurrency in arguments.concurrency
+            ]
+        )
+    )
@@ -0,0 +1,136 @@
+"""
+This module holds a benchmark for the html parser backends registered in `core.pages.parsers`.
+
+Each available backend is run against every html fixture
+and the throughput (MB/s) and peak memory are reported.
+
+Usage:
+
+    python -m benchmarks.parsers --repeat 5 --fixtures-dir benchmarks/fixtures
+
+Note that peak memory is measured with `tracemalloc`,
+so allocations made outside of the Python allocator, e.g. within `libxml2`, are not included.
+"""
+import argparse
+import collections
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, NamedTuple
+
+from core.pages import parsers
+from core.pages.streaming_crawler import iter_chunks
+
+DEFAULT_FIXTURES_DIR: Path = Path(__file__).parent / "fixtures"
+
+BYTES_IN_MEGABYTE: int = 1024 * 1024
+
+
+class ParserBenchmarkResult(NamedTuple):
+    parser: str
+    fixture: str
+    size_in_bytes: int
+    throughput_in_megabytes_per_second: float
+    peak_memory_in_megabytes: float
+
+
+def load_fixtures(fixtures_dir: Path) -> Dict[str, bytes]:
+    """
+    Loads each html fixture within the `fixtures_dir`, ordered by size.
+
+    Args:
+        fixtures_dir: The directory holding `.html` fixtures.
+
+    Returns:
+        (dict) - Keys being the fixture name and values being the raw html.
+
+    """
+    fixtures = {path.stem: path.read_bytes() for path in fixtures_dir.glob("*.html")}
+    return dict(sorted(fixtures.items(), key=lambda item: len(item[1])))
+
+
+def run_parser(parser: str, html: bytes) -> None:
+    parser_backend = parsers.get_parser(parser)
+    collections.deque(parser_backend(iter_chunks(html)), maxlen=0)
+
+
+def benchmark_parser(
+    parser: str, fixture: str, html: bytes, repeat: int
+) -> ParserBenchmarkResult:
+    """
+    Benchmarks the `parser` against the given `html`.
+
+    The fastest of the `repeat` runs is used for the throughput,
+    since slower runs are generally caused by noise from elsewhere on the machine.
+
+    Args:
+        parser: The name of the registered parser.
+        fixture: The name of the fixture the `html` was loaded from.
+        html: The raw html to be parsed.
+        repeat: The number of timed runs.
+
+    Returns:
+        (ParserBenchmarkResult) - The measurements for this parser and fixture.
+
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run_parser(parser, html)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run_parser(parser, html)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size_in_megabytes = len(html) / BYTES_IN_MEGABYTE
+    return ParserBenchmarkResult(
+        parser=parser,
+        fixture=fixture,
+        size_in_bytes=len(html),
+        throughput_in_megabytes_per_second=size_in_megabytes / min(timings),
+        peak_memory_in_megabytes=peak_memory / BYTES_IN_MEGABYTE,
+    )
+
+
+def run_benchmarks(fixtures_dir: Path, repeat: int) -> List[ParserBenchmarkResult]:
+    """
+    Benchmarks every available parser against every fixture.
+
+    Args:
+        fixtures_dir: The directory holding `.html` fixtures.
+        repeat: The number of timed runs per parser and fixture.
+
+    Returns:
+        (list) - The measurements for each parser and fixture.
+
+    """
+    fixtures = load_fixtures(fixtures_dir)
+    return [
+        benchmark_parser(parser=parser, fixture=fixture, html=html, repeat=repeat)
+        for fixture, html in fixtures.items()
+        for parser in parsers.get_available_parsers()
+    ]
+
+
+def format_results(results: List[ParserBenchmarkResult]) -> str:
+    lines = [
+        f"{'fixture':<10} {'size (KB)':>10} {'parser':<12} {'MB/s':>8} {'peak MB':>9}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.fixture:<10} {result.size_in_bytes / 1024:>10.1f} {result.parser:<12} "
+            f"{result.throughput_in_megabytes_per_second:>8.2f} "
+            f"{result.peak_memory_in_megabytes:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--fixtures-dir", type=Path, default=DEFAULT_FIXTURES_DIR)
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    arguments = argument_parser.parse_args()
+
+    print(format_results(run_benchmarks(arguments.fixtures_dir, arguments.repeat)))
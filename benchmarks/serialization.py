@@ -0,0 +1,212 @@
+"""
+This module holds a benchmark for encoding the results of a page, as returned and as stored.
+
+Synthetic results of `--words` distinct words are built with Zipf distributed counts,
+as found on real pages, and each is encoded by:
+
+    - "stdlib json": The previous response path, `jsonable_encoder()` followed by `json.dumps()`.
+    - "orjson": The output encoded directly with `orjson`, as `ORJSONResponse` does.
+    - "columnar orjson": The columnar format, see `serializers.formats`.
+    - "columnar msgpack": The columnar format encoded with MessagePack, if installed.
+    - "stored json": The results alone as JSON, as the `results` column used to hold them.
+    - "stored compressed": The results alone as written by `db.types.CompressedJSON`.
+
+The size of each payload is reported as it is and as compressed by the response middleware,
+along with the time taken to encode it and the time taken to compress it.
+Stored payloads are not compressed again and report the time taken to decode them instead.
+
+Usage:
+
+    python -m benchmarks.serialization --words 1000 10000 100000 --repeat 5
+"""
+import argparse
+import datetime
+import json
+import random
+import string
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+from db.types import CompressedJSON
+from serializers.compression import CONTENT_ENCODINGS, is_content_encoding_available
+from serializers.formats import MSGPACK_MEDIA_TYPE, is_media_type_available, to_columnar_results
+
+
+class SerializationBenchmarkResult(NamedTuple):
+    encoding: str
+    words: int
+    encode_seconds: float
+    size: int
+    gzip_size: Optional[int]
+    gzip_seconds: Optional[float]
+    brotli_size: Optional[int]
+    brotli_seconds: Optional[float]
+    decode_seconds: Optional[float]
+
+
+def build_results(words: int, seed: int = 0) -> Dict[str, int]:
+    """
+    Builds results holding `words` distinct words with Zipf distributed counts.
+
+    Args:
+        words: The number of distinct words.
+        seed: The seed for the random words.
+
+    Returns:
+        (dict) - Keys are the words and values are their counts, most frequent first.
+
+    """
+    random_generator = random.Random(seed)
+    results = {}
+    while len(results) < words:
+        word = "".join(
+            random_generator.choices(string.ascii_lowercase, k=random_generator.randint(2, 12))
+        )
+        results.setdefault(word, max(1, int(10_000 / (len(results) + 1))))
+    return results
+
+
+def build_output(results: Dict[str, int]) -> Dict:
+    return {
+        "target_url": "https://example.com",
+        "created at": datetime.datetime.now(datetime.timezone.utc),
+        "status": "DONE",
+        "results": results,
+    }
+
+
+def _encode_with_msgpack(output: Dict) -> bytes:
+    import msgpack
+
+    columnar_output = {**output, "results": to_columnar_results(output["results"])}
+    return msgpack.packb(columnar_output, default=lambda value: value.isoformat())
+
+
+def build_encoders(output: Dict) -> Dict[str, Callable[[], bytes]]:
+    compressed_json = CompressedJSON()
+    encoders = {
+        "stdlib json": lambda: json.dumps(jsonable_encoder(output)).encode(),
+        "orjson": lambda: orjson.dumps(output),
+        "columnar orjson": lambda: orjson.dumps(
+            {**output, "results": to_columnar_results(output["results"])}
+        ),
+        "stored json": lambda: json.dumps(output["results"]).encode(),
+        "stored compressed": lambda: compressed_json.process_bind_param(
+            output["results"], dialect=None
+        ),
+    }
+    if is_media_type_available(MSGPACK_MEDIA_TYPE):
+        encoders["columnar msgpack"] = lambda: _encode_with_msgpack(output)
+    return encoders
+
+
+def build_decoders() -> Dict[str, Callable[[bytes], object]]:
+    compressed_json = CompressedJSON()
+    return {
+        "stored json": json.loads,
+        "stored compressed": lambda value: compressed_json.process_result_value(
+            value, dialect=None
+        ),
+    }
+
+
+def time_fastest(function: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _compress(content_encoding: str, payload: bytes) -> bytes:
+    compressor = CONTENT_ENCODINGS[content_encoding]()
+    return compressor.compress(payload) + compressor.finish()
+
+
+def benchmark_words(words: int, repeat: int) -> List[SerializationBenchmarkResult]:
+    """
+    Benchmarks each encoding of results holding `words` distinct words.
+
+    The fastest of the `repeat` runs is used for each timing,
+    since slower runs are generally caused by noise from elsewhere on the machine.
+
+    Args:
+        words: The number of distinct words in the results.
+        repeat: The number of timed runs.
+
+    Returns:
+        (list) - The measurements for each encoding.
+
+    """
+    output = build_output(build_results(words))
+    decoders = build_decoders()
+
+    results = []
+    for encoding, encode in build_encoders(output).items():
+        payload = encode()
+        measurements = {"gzip": (None, None), "br": (None, None)}
+        decode_seconds = None
+
+        if encoding in decoders:
+            decode_seconds = time_fastest(lambda: decoders[encoding](payload), repeat)
+        else:
+            for content_encoding in measurements:
+                if is_content_encoding_available(content_encoding):
+                    measurements[content_encoding] = (
+                        len(_compress(content_encoding, payload)),
+                        time_fastest(lambda: _compress(content_encoding, payload), repeat),
+                    )
+
+        results.append(
+            SerializationBenchmarkResult(
+                encoding=encoding,
+                words=words,
+                encode_seconds=time_fastest(encode, repeat),
+                size=len(payload),
+                gzip_size=measurements["gzip"][0],
+                gzip_seconds=measurements["gzip"][1],
+                brotli_size=measurements["br"][0],
+                brotli_seconds=measurements["br"][1],
+                decode_seconds=decode_seconds,
+            )
+        )
+    return results
+
+
+def run_benchmarks(words: List[int], repeat: int) -> List[SerializationBenchmarkResult]:
+    return [result for count in words for result in benchmark_words(count, repeat)]
+
+
+def _format_optional(value: Optional[float], scale: float = 1, precision: int = 0) -> str:
+    return "-" if value is None else f"{value * scale:,.{precision}f}"
+
+
+def format_results(results: List[SerializationBenchmarkResult]) -> str:
+    lines = [
+        f"{'words':>7} {'encoding':<18} {'encode ms':>10} {'bytes':>11} "
+        f"{'gzip bytes':>11} {'gzip ms':>8} {'br bytes':>11} {'br ms':>8} {'decode ms':>10}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.words:>7} {result.encoding:<18} "
+            f"{result.encode_seconds * 1000:>10,.2f} {result.size:>11,} "
+            f"{_format_optional(result.gzip_size):>11} "
+            f"{_format_optional(result.gzip_seconds, 1000, 2):>8} "
+            f"{_format_optional(result.brotli_size):>11} "
+            f"{_format_optional(result.brotli_seconds, 1000, 2):>8} "
+            f"{_format_optional(result.decode_seconds, 1000, 2):>10}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--words", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    arguments = argument_parser.parse_args()
+
+    print(format_results(run_benchmarks(arguments.words, arguments.repeat)))
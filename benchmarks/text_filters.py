@@ -0,0 +1,136 @@
+"""
+This module holds a microbenchmark for filtering and counting the words scraped from a page.
+
+The visible words of each html fixture are scraped once up front,
+so that only the filtering and counting are timed.
+Each pipeline is then run against those words and the throughput (tokens/s) is reported:
+
+    - "chained": The previous implementation, with each filter nested as another generator
+        and `re.search()` looking its pattern up within the `re` module cache per token.
+    - "compiled": The filters as composed by `statistics.compile_text_filters()`.
+
+A further "end to end" row per fixture includes parsing with the default parser,
+to show how much of the time taken on a real page the filtering and counting account for.
+
+Usage:
+
+    python -m benchmarks.text_filters --repeat 5 --fixtures-dir benchmarks/fixtures
+"""
+import argparse
+import collections
+import re
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple
+
+from benchmarks.parsers import DEFAULT_FIXTURES_DIR, load_fixtures
+from core.pages import parsers, string_utils
+from core.pages.statistics import DEFAULT_TEXT_FILTERS, get_html_text_statistics
+from core.pages.streaming_crawler import iter_chunks
+
+
+class TextFilterBenchmarkResult(NamedTuple):
+    pipeline: str
+    fixture: str
+    tokens: int
+    tokens_per_second: float
+
+
+def count_with_chained_filters(words: Iterable[str]) -> Dict[str, int]:
+    text_items = (
+        word for word in words if not re.search(string_utils.REGEX_MATCH_FOR_DIGITS, word)
+    )
+    return collections.Counter(text_items)
+
+
+def count_with_compiled_filters(words: Iterable[str]) -> Dict[str, int]:
+    return collections.Counter(DEFAULT_TEXT_FILTERS(words))
+
+
+PIPELINES: Dict[str, Callable[[List[str]], Dict[str, int]]] = {
+    "chained": count_with_chained_filters,
+    "compiled": count_with_compiled_filters,
+}
+
+
+def time_fastest(function: Callable[[], object], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def benchmark_fixture(fixture: str, html: bytes, repeat: int) -> List[TextFilterBenchmarkResult]:
+    """
+    Benchmarks each of the `PIPELINES` against the words scraped from the `html`.
+
+    The fastest of the `repeat` runs is used for the throughput,
+    since slower runs are generally caused by noise from elsewhere on the machine.
+
+    Args:
+        fixture: The name of the fixture the `html` was loaded from.
+        html: The raw html to scrape words from.
+        repeat: The number of timed runs.
+
+    Returns:
+        (list) - The measurements for each pipeline against this fixture.
+
+    """
+    words = list(parsers.get_parser()(iter_chunks(html)))
+    expected_results = count_with_chained_filters(words)
+
+    results = []
+    for pipeline, count_words in PIPELINES.items():
+        if count_words(words) != expected_results:
+            raise AssertionError(f"{pipeline} counted different words for {fixture}")
+
+        duration = time_fastest(lambda: count_words(words), repeat)
+        results.append(
+            TextFilterBenchmarkResult(
+                pipeline=pipeline,
+                fixture=fixture,
+                tokens=len(words),
+                tokens_per_second=len(words) / duration,
+            )
+        )
+
+    duration = time_fastest(lambda: get_html_text_statistics(html), repeat)
+    results.append(
+        TextFilterBenchmarkResult(
+            pipeline="end to end",
+            fixture=fixture,
+            tokens=len(words),
+            tokens_per_second=len(words) / duration,
+        )
+    )
+    return results
+
+
+def run_benchmarks(fixtures_dir: Path, repeat: int) -> List[TextFilterBenchmarkResult]:
+    fixtures = load_fixtures(fixtures_dir)
+    return [
+        result
+        for fixture, html in fixtures.items()
+        for result in benchmark_fixture(fixture=fixture, html=html, repeat=repeat)
+    ]
+
+
+def format_results(results: List[TextFilterBenchmarkResult]) -> str:
+    lines = [f"{'fixture':<10} {'tokens':>8} {'pipeline':<12} {'tokens/s':>14}"]
+    for result in results:
+        lines.append(
+            f"{result.fixture:<10} {result.tokens:>8} {result.pipeline:<12} "
+            f"{result.tokens_per_second:>14,.0f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--fixtures-dir", type=Path, default=DEFAULT_FIXTURES_DIR)
+    argument_parser.add_argument("--repeat", type=int, default=5)
+    arguments = argument_parser.parse_args()
+
+    print(format_results(run_benchmarks(arguments.fixtures_dir, arguments.repeat)))
@@ -4,9 +4,65 @@ This module holds the Celery application instance
 import os
 
 from celery import Celery
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_init,
+    worker_process_shutdown,
+)
+from prometheus_client import start_http_server
+
+from core.metrics import celery_tasks
+from core.metrics.registry import build_metrics_registry, mark_process_dead
+from db.session import dispose_engine
+
+CELERY_METRICS_PORT: int = int(os.getenv("CELERY_METRICS_PORT", 0))
 
 celery = Celery(__name__, include=["async_execution.tasks"])
 celery.conf.broker_url = os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379")
 celery.conf.result_backend = os.environ.get(
     "CELERY_RESULT_BACKEND", "redis://localhost:6379"
 )
+
+# Fetching waits on the network, so the `io` queue should be consumed by a pool
+# of many threads, e.g. `--pool threads --concurrency 64`.
+# Parsing uses the CPU, so the `cpu` queue should be consumed by a prefork pool
+# with 1 process per core, e.g. `--pool prefork --prefetch-multiplier 1`.
+# Reprocessing reads stored html from local disk, so it also only uses the CPU.
+# Delivering callbacks waits on the network, so it shares the `io` queue with fetching.
+celery.conf.task_routes = {
+    "async_execution.tasks.fetch_pages_task": {"queue": "io"},
+    "async_execution.tasks.parse_page_task": {"queue": "cpu"},
+    "async_execution.tasks.reprocess_pages_task": {"queue": "cpu"},
+    "async_execution.tasks.deliver_page_callbacks_task": {"queue": "io"},
+}
+
+
+@worker_process_init.connect
+def reset_database_connections(**kwargs) -> None:
+    """
+    Ensures that each forked worker process opens its own database connections.
+    """
+    dispose_engine()
+
+
+task_prerun.connect(celery_tasks.record_task_start)
+task_postrun.connect(celery_tasks.record_task_end)
+
+
+@worker_init.connect
+def start_metrics_server(**kwargs) -> None:
+    """
+    Serves the metrics of the worker and its pool processes on `CELERY_METRICS_PORT`, if set.
+
+    Prefork pool processes can only be read from if `PROMETHEUS_MULTIPROC_DIR` is set,
+    see `core.metrics.registry`.
+    """
+    if CELERY_METRICS_PORT:
+        start_http_server(CELERY_METRICS_PORT, registry=build_metrics_registry())
+
+
+@worker_process_shutdown.connect
+def remove_live_metrics(pid: int, **kwargs) -> None:
+    mark_process_dead(pid)
@@ -5,9 +5,10 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
-from db.session import yield_db
+from db.session import provide_session
 
 
+@provide_session
 def postgres_is_healthy(db: Optional[Session] = None) -> bool:
     """
     Checks if the database can be reached by executing a query.
@@ -16,9 +17,6 @@ def postgres_is_healthy(db: Optional[Session] = None) -> bool:
         True if the database is available, False otherwise.
 
     """
-    if db is None:
-        db = next(yield_db())
-
     try:
         return bool(db.execute('SELECT 1'))
     except ValueError:
@@ -0,0 +1,77 @@
+"""
+This module holds metrics for Celery tasks and the queues they are consumed from.
+
+The following metrics are recorded:
+    - `nate_celery_task_seconds`: Time taken to run each task, by task name and final state.
+        Recorded by `record_task_start()` and `record_task_end()`,
+        which are connected to the `task_prerun` and `task_postrun` signals by `celery_app`.
+    - `nate_celery_queue_depth`: Messages waiting on each queue,
+        read from the Redis broker by `CeleryQueueDepthCollector` each time metrics are collected.
+"""
+import logging
+import os
+import time
+from typing import Dict, Iterator, List, Optional
+
+import redis
+from prometheus_client import Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+CELERY_METRICS_QUEUES: List[str] = os.getenv("CELERY_METRICS_QUEUES", "celery,io,cpu").split(",")
+
+CELERY_TASK_SECONDS = Histogram(
+    "nate_celery_task_seconds",
+    "Time taken to run each task",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+
+logger = logging.getLogger(__name__)
+
+_task_started_at: Dict[str, float] = {}
+
+
+def record_task_start(task_id: str, **kwargs) -> None:
+    _task_started_at[task_id] = time.perf_counter()
+
+
+def record_task_end(task_id: str, task, state: Optional[str] = None, **kwargs) -> None:
+    started_at = _task_started_at.pop(task_id, None)
+    if started_at is None:
+        return
+
+    CELERY_TASK_SECONDS.labels(task.name, state or "UNKNOWN").observe(
+        time.perf_counter() - started_at
+    )
+
+
+class CeleryQueueDepthCollector:
+    """
+    Reads the number of messages waiting on each of the `queues` from the Redis broker.
+
+    The Redis transport holds each queue as a list named after the queue,
+    so its depth is read with `LLEN`.
+    Nothing is collected if the broker cannot be reached,
+    so that the other metrics can still be scraped.
+    """
+
+    def __init__(self, client: redis.Redis, queues: List[str] = CELERY_METRICS_QUEUES):
+        self.client = client
+        self.queues = queues
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        queue_depth = GaugeMetricFamily(
+            "nate_celery_queue_depth", "Messages waiting on each queue", labels=["queue"]
+        )
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for queue in self.queues:
+                pipeline.llen(queue)
+            depths = pipeline.execute()
+        except redis.RedisError:
+            logger.warning("Could not read the depth of the Celery queues", exc_info=True)
+            return
+
+        for queue, depth in zip(self.queues, depths):
+            queue_depth.add_metric([queue], depth)
+        yield queue_depth
@@ -0,0 +1,61 @@
+"""
+This module holds the registries which metrics are exposed from.
+
+Metrics are registered with the default `prometheus_client` registry where they are defined,
+e.g. in `db.pool` and `core.pages.fetcher`.
+Each process holds its own values, so processes forked by the Celery prefork pool,
+or by a multi-worker API server, cannot be read from the default registry of their parent.
+
+When `PROMETHEUS_MULTIPROC_DIR` is set, `prometheus_client` instead writes the values of every
+process to files within that directory, which are summed by `build_metrics_registry()`.
+The directory must exist before any metric is defined and should be emptied between runs.
+"""
+import os
+from typing import Iterable, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    generate_latest,
+    multiprocess,
+)
+
+METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+PROMETHEUS_MULTIPROC_DIR: str = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+
+
+def is_multiprocess_mode() -> bool:
+    return bool(PROMETHEUS_MULTIPROC_DIR)
+
+
+def build_metrics_registry(collectors: Iterable = ()) -> CollectorRegistry:
+    """
+    Builds the registry to expose the metrics of this process and any processes it has forked.
+
+    Args:
+        collectors: Additional collectors, e.g. whose values are read when they are collected.
+
+    Returns:
+        (CollectorRegistry) - A registry which reads the values of every process
+            if `PROMETHEUS_MULTIPROC_DIR` is set, otherwise those of the default registry.
+
+    """
+    registry = CollectorRegistry()
+    if is_multiprocess_mode():
+        multiprocess.MultiProcessCollector(registry, path=PROMETHEUS_MULTIPROC_DIR)
+    else:
+        registry.register(REGISTRY)
+
+    for collector in collectors:
+        registry.register(collector)
+    return registry
+
+
+def render_metrics(registry: CollectorRegistry) -> Tuple[bytes, str]:
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int) -> None:
+    if is_multiprocess_mode():
+        multiprocess.mark_process_dead(pid, path=PROMETHEUS_MULTIPROC_DIR)
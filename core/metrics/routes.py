@@ -0,0 +1,70 @@
+"""
+This module holds the middleware which records the latency of requests by route.
+
+Requests are labelled with the path template of their route, e.g. `/pages/{page_id}`,
+rather than the requested path, so that the number of label values stays bounded.
+Requests which match no route are labelled as "unmatched".
+The latency of streamed responses covers the whole stream.
+"""
+import time
+from typing import Callable, Dict
+
+from prometheus_client import Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "nate_http_request_seconds",
+    "Time taken to respond to each request, by route",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RouteMetricsMiddleware:
+    """
+    Records the time taken to respond to each request, labelled with its route.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.route_paths: Dict[Callable, str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(scope["method"], self._get_route(scope), status).observe(
+                time.perf_counter() - started_at
+            )
+
+    def _get_route(self, scope: Scope) -> str:
+        # The router adds the endpoint of the matched route to the scope.
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+
+        if endpoint not in self.route_paths:
+            self.route_paths[endpoint] = next(
+                (
+                    route.path
+                    for route in scope["app"].routes
+                    if getattr(route, "endpoint", None) is endpoint
+                ),
+                UNMATCHED_ROUTE,
+            )
+        return self.route_paths[endpoint]
@@ -1,13 +1,34 @@
 """
 This module holds the functionality for crawling pages with `BeautifulSoup`.
+
+The following metrics are registered with the default `prometheus_client` registry:
+    - `nate_parse_seconds`: Time taken by `BeautifulSoup` to parse a page.
+    - `nate_parse_seconds_per_megabyte`: The same, divided by the size of the page in MB,
+        so that pages of different sizes can be compared.
 """
-import urllib.request
+import time
 from typing import Iterator, List, Optional
 
 import bs4
+from prometheus_client import Histogram
+
+from core.pages import fetcher
 
 INVISIBLE_TAGS: List[str] = ["style", "script", "head", "title", "meta", "[document]"]
 
+PARSE_SECONDS = Histogram(
+    "nate_parse_seconds",
+    "Time taken by BeautifulSoup to parse a page",
+    ["parser"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PARSE_SECONDS_PER_MEGABYTE = Histogram(
+    "nate_parse_seconds_per_megabyte",
+    "Time taken by BeautifulSoup to parse a page, per MB of html",
+    ["parser"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
 
 def is_tag_valid(
     tag: bs4.element.Doctype, invalid_tag_types: Optional[List[str]] = None
@@ -56,9 +77,7 @@ def filter_for_visible_text(all_html_text: bs4.element.ResultSet) -> Iterator[st
             which are of a valid type.
 
     """
-    valid_text_elements = (
-        html_text for html_text in all_html_text if is_tag_valid(html_text)
-    )
+    valid_text_elements = filter_for_visible_text_blocks(all_html_text)
 
     return (
         word
@@ -67,6 +86,23 @@ def filter_for_visible_text(all_html_text: bs4.element.ResultSet) -> Iterator[st
     )
 
 
+def filter_for_visible_text_blocks(all_html_text: bs4.element.ResultSet) -> Iterator[str]:
+    """
+    Creates a generator of the text elements from the given html which are of a valid type.
+
+    Unlike `filter_for_visible_text()` the elements are not split into words,
+    so that they can be counted in batches by `counting.count_words_in_text_blocks()`.
+
+    Args:
+        all_html_text: The result of BeautifulSoup scraping the target url.
+
+    Returns:
+        (Generator) - Text elements from the html which are of a valid type.
+
+    """
+    return (html_text for html_text in all_html_text if is_tag_valid(html_text))
+
+
 def find_all_text_in_html(
     html: bytes, parser: str = "html.parser"
 ) -> bs4.element.ResultSet:
@@ -88,16 +124,24 @@ def find_all_text_in_html(
     Returns:
         (ResultSet) - HTML text elements scraped from the page.
     """
+    started_at = time.perf_counter()
     beautiful_soup_parser = bs4.BeautifulSoup(markup=html, features=parser)
-    return beautiful_soup_parser.findAll(text=True)
+    all_text = beautiful_soup_parser.findAll(text=True)
+    seconds = time.perf_counter() - started_at
+
+    PARSE_SECONDS.labels(parser).observe(seconds)
+    # `BeautifulSoup` also accepts file objects, whose size is not known.
+    if isinstance(html, (bytes, str)) and html:
+        PARSE_SECONDS_PER_MEGABYTE.labels(parser).observe(seconds * 1_000_000 / len(html))
+    return all_text
 
 
 def open_url(target_url: str) -> bytes:
     """
     Opens the `target_url` with a request.
 
-    Sends a request using urllib and opens the
-    received http response.
+    Sends a request using the pooled client from `fetcher`
+    and reads the received http response.
 
     Args:
         target_url: The URL to scrape text from.
@@ -106,7 +150,7 @@ def open_url(target_url: str) -> bytes:
         (bytes) - HTML opened from the `target_url`.
 
     """
-    return urllib.request.urlopen(target_url).read()
+    return fetcher.open_url(target_url)
 
 
 def scrape_text_from_target_url(target_url: str) -> Iterator[str]:
@@ -0,0 +1,268 @@
+"""
+This module holds a content-addressed store for the raw html of scraped pages.
+
+Each blob is keyed by the SHA-256 hex digest of the html it holds,
+which is the same `content_hash` used by the result cache.
+This means pages with identical content share a single blob,
+and the statistics of any stored page can be recomputed without fetching it again.
+
+Blobs are compressed with `zstd` if the `zstandard` package is installed,
+otherwise with `gzip`. The codec can be forced with `BLOB_STORE_COMPRESSION`.
+Blobs written with either codec can always be read back,
+so changing the codec does not orphan existing blobs.
+
+The store is a directory, set by `BLOB_STORE_DIR`,
+which must be shared by every worker that scrapes or reprocesses pages.
+"""
+import contextlib
+import hashlib
+import importlib.util
+import mmap
+import os
+import re
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+BLOB_STORE_ENABLED: bool = os.getenv("BLOB_STORE_ENABLED", "true").lower() == "true"
+BLOB_STORE_DIR: str = os.getenv(
+    "BLOB_STORE_DIR", os.path.join(tempfile.gettempdir(), "nate-blobs")
+)
+BLOB_STORE_COMPRESSION: str = os.getenv(
+    "BLOB_STORE_COMPRESSION",
+    "zstd" if importlib.util.find_spec("zstandard") is not None else "gzip",
+)
+BLOB_STORE_READ_SIZE: int = int(os.getenv("BLOB_STORE_READ_SIZE", 1024 * 1024))
+
+KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobNotFoundError(Exception):
+    ...
+
+
+class BlobCodec(NamedTuple):
+    extension: str
+    compressor: Callable
+    decompressor: Callable
+
+
+def _build_zstd_codec() -> BlobCodec:
+    import zstandard
+
+    return BlobCodec(
+        extension=".zst",
+        compressor=lambda: zstandard.ZstdCompressor(level=3).compressobj(),
+        decompressor=lambda: zstandard.ZstdDecompressor().decompressobj(),
+    )
+
+
+CODECS: Dict[str, Callable[[], BlobCodec]] = {
+    "gzip": lambda: BlobCodec(
+        extension=".gz",
+        compressor=lambda: zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16),
+        decompressor=lambda: zlib.decompressobj(zlib.MAX_WBITS | 16),
+    ),
+    "zstd": _build_zstd_codec,
+}
+
+
+def is_codec_available(name: str) -> bool:
+    return name == "gzip" or (
+        name == "zstd" and importlib.util.find_spec("zstandard") is not None
+    )
+
+
+class BlobWriter:
+    """
+    Compresses html into a temporary file as it is written.
+
+    The blob only becomes visible once `commit()` is called,
+    at which point its key is known.
+    """
+
+    def __init__(self, store: "BlobStore"):
+        self.store = store
+        self.content_hash = hashlib.sha256()
+        self.compressor = store.codec.compressor()
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=store.directory, suffix=".tmp"
+        )
+        self.temporary_path = Path(temporary_path)
+        self.file = os.fdopen(file_descriptor, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.content_hash.update(chunk)
+        self.file.write(self.compressor.compress(chunk))
+
+    def commit(self) -> str:
+        """
+        Moves the written blob into the store under the hash of its content.
+
+        If a blob with the same content is already stored, the written blob is dropped.
+
+        Returns:
+            (str) - The key of the blob.
+
+        """
+        self.file.write(self.compressor.flush())
+        self.file.close()
+
+        key = self.content_hash.hexdigest()
+        if self.store.exists(key):
+            self.temporary_path.unlink()
+            return key
+
+        path = self.store._build_path(key, self.store.codec)
+        path.parent.mkdir(exist_ok=True)
+        os.replace(self.temporary_path, path)
+        return key
+
+    def discard(self) -> None:
+        self.file.close()
+        self.temporary_path.unlink(missing_ok=True)
+
+
+class BlobStore:
+    """
+    Stores compressed html in files named by the SHA-256 hash of the html.
+
+    Blobs are spread over 256 subdirectories by the first 2 characters of their key.
+    Files are written to a temporary name and then renamed,
+    so a reader never sees a partially written blob.
+    """
+
+    def __init__(
+        self,
+        directory: str = BLOB_STORE_DIR,
+        compression: str = BLOB_STORE_COMPRESSION,
+        read_size: int = BLOB_STORE_READ_SIZE,
+    ):
+        if compression not in CODECS:
+            raise ValueError(f"Unsupported blob store compression: {compression}")
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.codec = CODECS[compression]()
+        self.read_codecs = [self.codec] + [
+            CODECS[name]()
+            for name in CODECS
+            if name != compression and is_codec_available(name)
+        ]
+        self.read_size = read_size
+
+    def _build_path(self, key: str, codec: BlobCodec) -> Path:
+        if not KEY_PATTERN.match(key):
+            raise ValueError(f"Invalid blob key: {key!r}")
+        return self.directory / key[:2] / f"{key}{codec.extension}"
+
+    def _find(self, key: str) -> Optional[Tuple[Path, BlobCodec]]:
+        for codec in self.read_codecs:
+            path = self._build_path(key, codec)
+            if path.exists():
+                return path, codec
+        return None
+
+    def exists(self, key: str) -> bool:
+        return self._find(key) is not None
+
+    @contextlib.contextmanager
+    def open_writer(self) -> Iterator[BlobWriter]:
+        """
+        Opens a `BlobWriter` which is discarded unless it has been committed.
+
+        Returns:
+            (BlobWriter) - The writer to stream html into.
+
+        """
+        writer = BlobWriter(store=self)
+        try:
+            yield writer
+        finally:
+            if writer.temporary_path.exists():
+                writer.discard()
+
+    def put(self, html: bytes) -> str:
+        """
+        Writes the `html` to the store, unless it is already stored.
+
+        Args:
+            html: The raw html of the page.
+
+        Returns:
+            (str) - The key to read the html back with.
+
+        """
+        with self.open_writer() as writer:
+            writer.write(html)
+            return writer.commit()
+
+    def iter_chunks(self, key: str) -> Iterator[bytes]:
+        """
+        Reads the html stored under the `key` in decompressed chunks.
+
+        The blob is memory-mapped rather than read into a buffer,
+        so only the decompressed chunk currently being parsed is held in memory.
+
+        Args:
+            key: The SHA-256 hex digest of the html.
+
+        Raises:
+            BlobNotFoundError: If no blob is stored under the `key`.
+
+        Returns:
+            (Generator) - Decompressed chunks of the html.
+
+        """
+        found = self._find(key)
+        if found is None:
+            raise BlobNotFoundError(key)
+
+        return self._iter_decompressed_chunks(*found)
+
+    def _iter_decompressed_chunks(self, path: Path, codec: BlobCodec) -> Iterator[bytes]:
+        decompressor = codec.decompressor()
+        with path.open("rb") as file, mmap.mmap(
+            file.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped_file:
+            with memoryview(mapped_file) as view:
+                for start in range(0, len(view), self.read_size):
+                    chunk = decompressor.decompress(view[start : start + self.read_size])
+                    if chunk:
+                        yield chunk
+
+        remainder = decompressor.flush()
+        if remainder:
+            yield remainder
+
+    def get(self, key: str) -> bytes:
+        """
+        Reads the html stored under the `key`.
+
+        Args:
+            key: The SHA-256 hex digest of the html.
+
+        Raises:
+            BlobNotFoundError: If no blob is stored under the `key`.
+
+        Returns:
+            (bytes) - The raw html of the page.
+
+        """
+        return b"".join(self.iter_chunks(key))
+
+
+_blob_store: Optional[BlobStore] = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    global _blob_store
+
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore()
+
+    return _blob_store
@@ -0,0 +1,497 @@
+"""
+This module holds a cache of page text statistics in front of `get_page_text_statistics`.
+
+Entries are keyed by the normalized URL and the selected parser,
+and point to the results via the SHA-256 hash of the page content.
+This means pages with identical content share a single set of stored results.
+
+The `ETag` and `Last-Modified` validators of the response are stored alongside,
+so that later scrapes can send a conditional GET and reuse the results on a `304`.
+Entries fetched within the last `RESULT_CACHE_FRESH_FOR` seconds
+are reused without contacting the remote server at all.
+
+The storage is swappable, currently supported backends are:
+    - "memory": An in-process LRU cache, the default.
+    - "redis": Any Redis compatible client, e.g. `fakeredis` for tests.
+    - "none": Disables the cache.
+"""
+import abc
+import collections
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+import redis
+
+from core.pages import fetcher, parsers, profiling
+from core.pages.blob_store import BlobStore, BlobWriter
+from core.pages.statistics import (
+    get_html_chunks_text_statistics,
+    get_html_text_statistics,
+    get_page_text_statistics,
+)
+
+RESULT_CACHE_BACKEND: str = os.getenv("RESULT_CACHE_BACKEND", "memory")
+RESULT_CACHE_URL: str = os.getenv("RESULT_CACHE_URL", "redis://localhost:6379/1")
+RESULT_CACHE_TTL: int = int(os.getenv("RESULT_CACHE_TTL", 24 * 60 * 60))
+RESULT_CACHE_FRESH_FOR: int = int(os.getenv("RESULT_CACHE_FRESH_FOR", 60))
+RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 1024))
+
+DEFAULT_PORTS: Dict[str, int] = {"http": 80, "https": 443}
+
+
+class CacheBackend(abc.ABC):
+    """
+    Interface for the storage behind the `ResultCache`.
+
+    Values are JSON serializable dicts, which expire after `ttl` seconds.
+    """
+
+    @abc.abstractmethod
+    def get(self, key: str) -> Optional[Dict]:
+        ...
+
+    @abc.abstractmethod
+    def set(self, key: str, value: Dict, ttl: int) -> None:
+        ...
+
+
+class InProcessCacheBackend(CacheBackend):
+    """
+    A thread-safe LRU cache held in the memory of the current process.
+
+    The least recently used entry is evicted once `max_entries` is exceeded.
+    """
+
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries: collections.OrderedDict = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self.lock:
+            try:
+                expires_at, value = self.entries[key]
+            except KeyError:
+                return None
+
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict, ttl: int) -> None:
+        with self.lock:
+            self.entries[key] = (time.monotonic() + ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    A cache shared between processes, stored in Redis.
+
+    Expiry is delegated to Redis.
+    For LRU eviction the server should be run with `maxmemory-policy allkeys-lru`.
+    """
+
+    def __init__(self, client: redis.Redis, prefix: str = "nate:results:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Dict]:
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Dict, ttl: int) -> None:
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+
+def normalize_url(target_url: str) -> str:
+    """
+    Normalizes the `target_url` so that equivalent URLs share a cache entry.
+
+    The scheme and host are lowercased, default ports and fragments are dropped,
+    an empty path becomes "/" and query parameters are sorted.
+
+    Args:
+        target_url: The URL to normalize.
+
+    Returns:
+        (str) - The normalized URL.
+
+    """
+    parsed_url = urllib.parse.urlsplit(target_url.strip())
+    scheme = parsed_url.scheme.lower()
+    netloc = (parsed_url.hostname or "").lower()
+
+    if parsed_url.port and parsed_url.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{parsed_url.port}"
+
+    query = urllib.parse.urlencode(
+        sorted(urllib.parse.parse_qsl(parsed_url.query, keep_blank_values=True))
+    )
+    return urllib.parse.urlunsplit((scheme, netloc, parsed_url.path or "/", query, ""))
+
+
+class ResultCache:
+    """
+    Stores page text statistics along with the validators of the response they came from.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: int = RESULT_CACHE_TTL,
+        fresh_for: int = RESULT_CACHE_FRESH_FOR,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.fresh_for = fresh_for
+
+    @staticmethod
+    def _build_page_key(target_url: str, parser: str) -> str:
+        return f"page:{parser}:{normalize_url(target_url)}"
+
+    @staticmethod
+    def _build_content_key(content_hash: str, parser: str) -> str:
+        return f"content:{parser}:{content_hash}"
+
+    def get(self, target_url: str, parser: str) -> Optional[Dict]:
+        """
+        Gets the cached entry for the `target_url`.
+
+        Args:
+            target_url: The URL which was scraped.
+            parser: The name of the parser which produced the results.
+
+        Returns:
+            (dict) - The `results`, `content_hash`, `etag`, `last_modified`
+                and `fetched_at` of the entry, None if it is missing or has expired.
+
+        """
+        entry = self.backend.get(self._build_page_key(target_url, parser))
+        if entry is None:
+            return None
+
+        results = self.backend.get(self._build_content_key(entry["content_hash"], parser))
+        if results is None:
+            return None
+
+        return {**entry, "results": results}
+
+    def set(
+        self,
+        target_url: str,
+        parser: str,
+        results: Dict[str, int],
+        content_hash: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """
+        Stores the `results` for the `target_url`, along with the response validators.
+
+        The `results` are only written if no other page with the same
+        `content_hash` has already stored them.
+
+        Args:
+            target_url: The URL which was scraped.
+            parser: The name of the parser which produced the results.
+            results: The word frequencies of the page.
+            content_hash: The SHA-256 hex digest of the page content.
+            etag: The `ETag` header of the response.
+            last_modified: The `Last-Modified` header of the response.
+
+        Returns:
+            None
+
+        """
+        content_key = self._build_content_key(content_hash, parser)
+        if self.backend.get(content_key) is None:
+            self.backend.set(content_key, results, self.ttl)
+
+        self._set_page_entry(target_url, parser, content_hash, etag, last_modified)
+
+    def refresh(self, target_url: str, parser: str, entry: Dict) -> None:
+        """
+        Extends the lifetime of an `entry` which has been revalidated by the remote server.
+
+        Args:
+            target_url: The URL which was scraped.
+            parser: The name of the parser which produced the results.
+            entry: The entry as returned by `get()`.
+
+        Returns:
+            None
+
+        """
+        content_key = self._build_content_key(entry["content_hash"], parser)
+        self.backend.set(content_key, entry["results"], self.ttl)
+        self._set_page_entry(
+            target_url, parser, entry["content_hash"], entry["etag"], entry["last_modified"]
+        )
+
+    def _set_page_entry(
+        self,
+        target_url: str,
+        parser: str,
+        content_hash: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        page_entry = {
+            "content_hash": content_hash,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        self.backend.set(self._build_page_key(target_url, parser), page_entry, self.ttl)
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry["fetched_at"] < self.fresh_for
+
+
+def build_result_cache(backend_name: str = RESULT_CACHE_BACKEND) -> Optional[ResultCache]:
+    """
+    Builds the `ResultCache` for the configured `backend_name`.
+
+    Args:
+        backend_name: One of "memory", "redis" or "none".
+
+    Raises:
+        ValueError: If the `backend_name` is not supported.
+
+    Returns:
+        (ResultCache) - The cache, None if caching has been disabled.
+
+    """
+    if backend_name == "none":
+        return None
+
+    if backend_name == "memory":
+        return ResultCache(backend=InProcessCacheBackend())
+
+    if backend_name == "redis":
+        client = redis.Redis.from_url(RESULT_CACHE_URL)
+        return ResultCache(backend=RedisCacheBackend(client=client))
+
+    raise ValueError(f"Unsupported result cache backend: {backend_name}")
+
+
+_result_cache: Optional[ResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    global _result_cache
+
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = build_result_cache()
+
+    return _result_cache
+
+
+def build_results_variant(parser: str, max_vocabulary: Optional[int] = None) -> str:
+    """
+    Builds the name under which results are cached,
+    so that results counted in different ways are never mixed up.
+
+    Args:
+        parser: The name of the parser which produced the results.
+        max_vocabulary: The maximum number of distinct words held whilst counting.
+
+    Returns:
+        (str) - The parser name, qualified by the `max_vocabulary` if one was given.
+
+    """
+    if max_vocabulary is None:
+        return parser
+    return f"{parser}:max-vocabulary={max_vocabulary}"
+
+
+def _build_conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+    if entry is None:
+        return {}
+
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def _hash_chunks(html_chunks: Iterator[bytes], content_hash) -> Iterator[bytes]:
+    for chunk in html_chunks:
+        content_hash.update(chunk)
+        yield chunk
+
+
+def _tee_chunks(html_chunks: Iterator[bytes], blob_writer: BlobWriter) -> Iterator[bytes]:
+    for chunk in html_chunks:
+        blob_writer.write(chunk)
+        yield chunk
+
+
+class PageTextStatistics(NamedTuple):
+    results: Dict[str, int]
+    content_hash: str
+
+
+def get_cached_page_text_statistics(
+    target_url: str,
+    parser: Optional[str] = None,
+    text_filters: Optional[List[Callable]] = None,
+    result_cache: Optional[ResultCache] = None,
+    parse_executor: Optional[concurrent.futures.Executor] = None,
+) -> Dict[str, int]:
+    """
+    Gets the text statistics of the `target_url`, reusing cached results where possible.
+
+    Results are only cached for the default `text_filters`,
+    since custom filters cannot be reliably keyed upon.
+    See `get_cached_page_statistics()` for how cached results are reused.
+
+    Args:
+        target_url: The URL to scrape text from.
+        parser: The name of the parser to use.
+        text_filters: A list of callables which can be used to filter the output text.
+        result_cache: The cache to use. Defaults to `get_result_cache()`.
+        parse_executor: The executor to parse the page on.
+
+    Raises:
+        FetchError: If the page could not be fetched.
+
+    Returns:
+        (Counter) - Keys are the items and values are the aggregated frequencies.
+
+    """
+    if text_filters is None:
+        return get_cached_page_statistics(
+            target_url, parser=parser, result_cache=result_cache, parse_executor=parse_executor
+        ).results
+
+    if parse_executor is not None:
+        raise ValueError("Custom `text_filters` cannot be sent to a `parse_executor`")
+
+    parser = parsers.select_parser(parser)
+    return get_page_text_statistics(
+        target_url,
+        text_scraper=lambda url: parsers.scrape_text_from_target_url(url, parser=parser),
+        text_filters=text_filters,
+    )
+
+
+def get_cached_page_statistics(
+    target_url: str,
+    parser: Optional[str] = None,
+    result_cache: Optional[ResultCache] = None,
+    parse_executor: Optional[concurrent.futures.Executor] = None,
+    blob_store: Optional[BlobStore] = None,
+    max_vocabulary: Optional[int] = None,
+) -> PageTextStatistics:
+    """
+    Gets the text statistics of the `target_url` along with the hash of its content.
+
+    Cached results are reused without a request if they are still fresh,
+    otherwise a conditional GET is sent and they are reused on a `304`.
+
+    If a `parse_executor` is given, e.g. a process pool,
+    the page is downloaded in full and then parsed on the executor
+    rather than being parsed as it arrives.
+
+    If a `blob_store` is given, the html is written to it as it arrives,
+    so that the page can later be reprocessed without being fetched again.
+    The blob is only kept if the page was parsed successfully.
+
+    Results counted with a `max_vocabulary` are cached separately from exact results.
+
+    Args:
+        target_url: The URL to scrape text from.
+        parser: The name of the parser to use.
+        result_cache: The cache to use. Defaults to `get_result_cache()`.
+        parse_executor: The executor to parse the page on.
+        blob_store: The store to write the html to.
+        max_vocabulary: The maximum number of distinct words to hold whilst counting,
+            see `statistics.get_html_chunks_text_statistics()`.
+
+    Raises:
+        FetchError: If the page could not be fetched.
+
+    Returns:
+        (PageTextStatistics) - The word frequencies of the page
+            and the SHA-256 hex digest of its content, which is also its blob key.
+
+    """
+    parser = parsers.select_parser(parser)
+    if result_cache is None:
+        result_cache = get_result_cache()
+
+    results_variant = build_results_variant(parser, max_vocabulary)
+    entry = None
+    if result_cache is not None:
+        entry = result_cache.get(target_url, results_variant)
+        if entry is not None and result_cache.is_fresh(entry):
+            return PageTextStatistics(
+                collections.Counter(entry["results"]), entry["content_hash"]
+            )
+
+    with contextlib.ExitStack() as stack:
+        response = stack.enter_context(
+            fetcher.get_fetcher().stream(target_url, headers=_build_conditional_headers(entry))
+        )
+        if response.status == 304 and entry is not None:
+            result_cache.refresh(target_url, results_variant, entry)
+            return PageTextStatistics(
+                collections.Counter(entry["results"]), entry["content_hash"]
+            )
+
+        if response.status >= 400:
+            raise fetcher.FetchError(f"{target_url} responded with {response.status}")
+
+        content_hash = hashlib.sha256()
+        html_chunks = _hash_chunks(fetcher.iter_response_chunks(response), content_hash)
+        if blob_store is not None:
+            blob_writer = stack.enter_context(blob_store.open_writer())
+            html_chunks = _tee_chunks(html_chunks, blob_writer)
+
+        if parse_executor is None:
+            results = get_html_chunks_text_statistics(
+                html_chunks, parser=parser, max_vocabulary=max_vocabulary
+            )
+        else:
+            html = b"".join(html_chunks)
+            # Parsing, filtering and counting all happen on the executor,
+            # so the time spent waiting on it is only counted as parsing.
+            with profiling.stage("parse"):
+                results = parse_executor.submit(
+                    get_html_text_statistics, html, parser, max_vocabulary
+                ).result()
+
+        if blob_store is not None:
+            blob_writer.commit()
+
+        if result_cache is not None:
+            result_cache.set(
+                target_url,
+                results_variant,
+                results=results,
+                content_hash=content_hash.hexdigest(),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+
+    return PageTextStatistics(results, content_hash.hexdigest())
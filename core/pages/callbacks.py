@@ -0,0 +1,208 @@
+"""
+This module holds the functionality for posting the results of pages to their `callback_url`.
+
+A single pooled client is kept per process, as with `fetcher.Fetcher`,
+so that connections to each destination are kept alive and reused across deliveries.
+
+Pages are grouped by their `callback_url`,
+and the pages of each destination are posted together in batches of `CALLBACK_BATCH_MAX_SIZE`
+as a JSON object of the form `{"pages": [{"id": ..., "status": ..., "results": ...}, ...]}`.
+
+Deliveries which fail with a connection error, a `429` or a `5xx` status can be retried,
+after a delay given by `compute_backoff()`.
+Any other error status means the destination rejected the delivery, which is not retried.
+"""
+import os
+import random
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+import urllib3
+from sqlalchemy.engine import Row
+
+CALLBACK_CONNECT_TIMEOUT: float = float(os.getenv("CALLBACK_CONNECT_TIMEOUT", 5))
+CALLBACK_READ_TIMEOUT: float = float(os.getenv("CALLBACK_READ_TIMEOUT", 10))
+CALLBACK_MAX_CONNECTIONS_PER_HOST: int = int(os.getenv("CALLBACK_MAX_CONNECTIONS_PER_HOST", 2))
+CALLBACK_MAX_HOSTS: int = int(os.getenv("CALLBACK_MAX_HOSTS", 100))
+CALLBACK_BATCH_MAX_SIZE: int = int(os.getenv("CALLBACK_BATCH_MAX_SIZE", 100))
+CALLBACK_BACKOFF_BASE: float = float(os.getenv("CALLBACK_BACKOFF_BASE", 2))
+CALLBACK_BACKOFF_MAX: float = float(os.getenv("CALLBACK_BACKOFF_MAX", 300))
+
+DEFAULT_HEADERS: Dict[str, str] = {
+    "User-Agent": "nate-callbacks",
+    "Content-Type": "application/json",
+}
+
+
+class CallbackDeliveryError(Exception):
+    ...
+
+
+class CallbackRejectedError(CallbackDeliveryError):
+    ...
+
+
+def is_retryable_status(status: int) -> bool:
+    return status == 429 or status >= 500
+
+
+def build_callback_payload(pages: Iterable[Row]) -> bytes:
+    """
+    Encodes the pages to be posted to their `callback_url` in 1 request.
+
+    Results are only sent for pages which are done,
+    since failed pages may still hold the results of an earlier scrape.
+
+    Args:
+        pages: Rows of `id`, `target_url`, `status`, `created_at` and `results` of each page.
+
+    Returns:
+        (bytes) - The JSON encoded body of the request.
+
+    """
+    return orjson.dumps(
+        {
+            "pages": [
+                {
+                    "id": page.id,
+                    "target_url": page.target_url,
+                    "status": page.status,
+                    "created_at": page.created_at,
+                    "results": page.results if page.status == "DONE" else None,
+                }
+                for page in pages
+            ]
+        }
+    )
+
+
+def group_callbacks(
+    pages: Iterable[Row], max_batch_size: int = CALLBACK_BATCH_MAX_SIZE
+) -> List[Tuple[str, List[Row]]]:
+    """
+    Groups the pages by their `callback_url`, in batches of at most `max_batch_size`.
+
+    Args:
+        pages: Rows of each page to be delivered, including its `callback_url`.
+        max_batch_size: The maximum number of pages to post in 1 request.
+
+    Returns:
+        (list) - Pairs of the `callback_url` and the pages to post to it in 1 request.
+
+    """
+    pages_by_callback_url: Dict[str, List[Row]] = {}
+    for page in pages:
+        if page.callback_url:
+            pages_by_callback_url.setdefault(page.callback_url, []).append(page)
+
+    return [
+        (callback_url, callback_pages[start : start + max_batch_size])
+        for callback_url, callback_pages in pages_by_callback_url.items()
+        for start in range(0, len(callback_pages), max_batch_size)
+    ]
+
+
+def compute_backoff(
+    attempt: int, base: float = CALLBACK_BACKOFF_BASE, maximum: float = CALLBACK_BACKOFF_MAX
+) -> float:
+    """
+    Computes the number of seconds to wait before the next attempt at a delivery.
+
+    The delay doubles with each attempt up to the `maximum`,
+    and a random delay of up to that amount is chosen,
+    so that deliveries which failed together are not all retried at once.
+
+    Args:
+        attempt: The number of attempts which have failed so far, starting from 1.
+        base: The upper bound of the delay after the first attempt.
+        maximum: The upper bound of the delay after any attempt.
+
+    Returns:
+        (float) - The number of seconds to wait.
+
+    """
+    return random.uniform(0, min(maximum, base * 2 ** (attempt - 1)))
+
+
+class CallbackClient:
+    """
+    A pooled HTTP client for posting results, with keep-alive connections per destination.
+
+    Requests are not retried by the client itself,
+    since retries are delayed by rescheduling the delivery instead.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = CALLBACK_CONNECT_TIMEOUT,
+        read_timeout: float = CALLBACK_READ_TIMEOUT,
+        max_connections_per_host: int = CALLBACK_MAX_CONNECTIONS_PER_HOST,
+        max_hosts: int = CALLBACK_MAX_HOSTS,
+    ):
+        self.pool_manager = urllib3.PoolManager(
+            num_pools=max_hosts,
+            maxsize=max_connections_per_host,
+            block=True,
+            timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+            retries=False,
+        )
+
+    def post(self, callback_url: str, body: bytes) -> None:
+        """
+        Posts the `body` to the `callback_url`.
+
+        Args:
+            callback_url: The URL to post to.
+            body: The JSON encoded body, see `build_callback_payload()`.
+
+        Raises:
+            CallbackRejectedError: If the destination responded with an error status
+                which should not be retried.
+            CallbackDeliveryError: If the request could not be completed
+                or the destination responded with an error status which can be retried.
+
+        Returns:
+            None
+
+        """
+        try:
+            response = self.pool_manager.request(
+                "POST", callback_url, body=body, headers=DEFAULT_HEADERS
+            )
+        except urllib3.exceptions.HTTPError as error:
+            raise CallbackDeliveryError(f"Could not post to {callback_url}") from error
+
+        if response.status < 300:
+            return
+
+        message = f"{callback_url} responded with {response.status}"
+        if is_retryable_status(response.status):
+            raise CallbackDeliveryError(message)
+        raise CallbackRejectedError(message)
+
+
+_callback_client: Optional[CallbackClient] = None
+_callback_client_pid: Optional[int] = None
+_callback_client_lock = threading.Lock()
+
+
+def get_callback_client() -> CallbackClient:
+    """
+    Gets the `CallbackClient` for the current process.
+
+    A new `CallbackClient` is created after a fork,
+    so that Celery prefork workers never share pooled sockets with their parent.
+
+    Returns:
+        (CallbackClient) - The pooled client for this process.
+
+    """
+    global _callback_client, _callback_client_pid
+
+    with _callback_client_lock:
+        if _callback_client is None or _callback_client_pid != os.getpid():
+            _callback_client = CallbackClient()
+            _callback_client_pid = os.getpid()
+
+    return _callback_client
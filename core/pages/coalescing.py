@@ -0,0 +1,217 @@
+"""
+This module holds functionality for coalescing concurrent scrapes of the same URL.
+
+When many tasks scrape the same URL at once, only the first takes a lease in Redis
+and fetches the page. The others wait for its results instead of fetching the page again.
+If the lease holder fails or its lease expires, one of the waiting tasks takes over.
+
+Coalescing is only an optimisation, so if Redis cannot be reached the page is scraped alone.
+"""
+import collections
+import concurrent.futures
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+import redis
+
+from core.pages import parsers
+from core.pages.blob_store import BlobStore
+from core.pages.cache import (
+    PageTextStatistics,
+    build_results_variant,
+    get_cached_page_statistics,
+    normalize_url,
+)
+from core.pages.fetcher import FETCH_DEADLINE
+
+SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+SINGLE_FLIGHT_URL: str = os.getenv("SINGLE_FLIGHT_URL", "redis://localhost:6379/2")
+SINGLE_FLIGHT_LEASE_TTL: float = float(os.getenv("SINGLE_FLIGHT_LEASE_TTL", FETCH_DEADLINE + 30))
+SINGLE_FLIGHT_RESULT_TTL: float = float(os.getenv("SINGLE_FLIGHT_RESULT_TTL", 30))
+SINGLE_FLIGHT_WAIT_TIMEOUT: float = float(
+    os.getenv("SINGLE_FLIGHT_WAIT_TIMEOUT", SINGLE_FLIGHT_LEASE_TTL)
+)
+SINGLE_FLIGHT_POLL_INTERVAL: float = float(os.getenv("SINGLE_FLIGHT_POLL_INTERVAL", 0.1))
+SINGLE_FLIGHT_CONNECT_TIMEOUT: float = float(os.getenv("SINGLE_FLIGHT_CONNECT_TIMEOUT", 1))
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlightTimeoutError(Exception):
+    ...
+
+
+class SingleFlight:
+    """
+    Ensures that only 1 caller at a time computes the result for a given key.
+
+    Callers which find the lease taken wait for the result to be published
+    by the lease holder, for up to `wait_timeout` seconds.
+    Published results are kept for `result_ttl` seconds,
+    so callers which arrive just after the lease holder has finished also reuse them.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        lease_ttl: float = SINGLE_FLIGHT_LEASE_TTL,
+        result_ttl: float = SINGLE_FLIGHT_RESULT_TTL,
+        wait_timeout: float = SINGLE_FLIGHT_WAIT_TIMEOUT,
+        poll_interval: float = SINGLE_FLIGHT_POLL_INTERVAL,
+        prefix: str = "nate:single-flight:",
+    ):
+        self.client = client
+        self.lease_ttl = lease_ttl
+        self.result_ttl = result_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+
+    def _get_result(self, result_key: str) -> Optional[Dict]:
+        result = self.client.get(result_key)
+        if result is None:
+            return None
+        return json.loads(result)
+
+    def _release_lease(self, lease_key: str, token: str) -> None:
+        def delete_if_held(pipeline: redis.client.Pipeline) -> None:
+            held_token = pipeline.get(lease_key)
+            pipeline.multi()
+            if held_token is not None and held_token.decode() == token:
+                pipeline.delete(lease_key)
+
+        self.client.transaction(delete_if_held, lease_key)
+
+    def do(self, key: str, compute: Callable[[], Dict]) -> Dict:
+        """
+        Gets the result for the `key`, calling `compute` only if no other caller is.
+
+        Args:
+            key: Identifies the work being done, callers with the same key are coalesced.
+            compute: Callable which returns a JSON serializable result.
+
+        Raises:
+            SingleFlightTimeoutError: If no result was published within the `wait_timeout`.
+
+        Returns:
+            (dict) - The result computed by this caller or by the lease holder.
+
+        """
+        lease_key = f"{self.prefix}lease:{key}"
+        result_key = f"{self.prefix}result:{key}"
+        token = uuid.uuid4().hex
+        gives_up_at = time.monotonic() + self.wait_timeout
+
+        while True:
+            result = self._get_result(result_key)
+            if result is not None:
+                return result
+
+            if self.client.set(lease_key, token, nx=True, px=int(self.lease_ttl * 1000)):
+                try:
+                    result = compute()
+                    self.client.set(
+                        result_key, json.dumps(result), px=int(self.result_ttl * 1000)
+                    )
+                    return result
+                finally:
+                    self._release_lease(lease_key, token)
+
+            if time.monotonic() > gives_up_at:
+                raise SingleFlightTimeoutError(key)
+
+            time.sleep(self.poll_interval)
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """
+    Gets the `SingleFlight` for the current process.
+
+    Returns:
+        (SingleFlight) - The coalescer, None if `SINGLE_FLIGHT_ENABLED` is false.
+
+    """
+    global _single_flight
+
+    if not SINGLE_FLIGHT_ENABLED:
+        return None
+
+    with _single_flight_lock:
+        if _single_flight is None:
+            client = redis.Redis.from_url(
+                SINGLE_FLIGHT_URL, socket_connect_timeout=SINGLE_FLIGHT_CONNECT_TIMEOUT
+            )
+            _single_flight = SingleFlight(client=client)
+
+    return _single_flight
+
+
+def get_coalesced_page_statistics(
+    target_url: str,
+    parser: Optional[str] = None,
+    single_flight: Optional[SingleFlight] = None,
+    parse_executor: Optional[concurrent.futures.Executor] = None,
+    blob_store: Optional[BlobStore] = None,
+    max_vocabulary: Optional[int] = None,
+) -> PageTextStatistics:
+    """
+    Gets the text statistics of the `target_url`, coalescing concurrent scrapes of it.
+
+    If Redis cannot be reached, the page is scraped without being coalesced.
+
+    Args:
+        target_url: The URL to scrape text from.
+        parser: The name of the parser to use.
+        single_flight: The coalescer to use. Defaults to `get_single_flight()`.
+        parse_executor: The executor to parse the page on, see `get_cached_page_statistics()`.
+        blob_store: The store to write the html to, see `get_cached_page_statistics()`.
+        max_vocabulary: The maximum number of distinct words to hold whilst counting.
+
+    Returns:
+        (PageTextStatistics) - The word frequencies of the page and the hash of its content.
+
+    """
+    parser = parsers.select_parser(parser)
+    if single_flight is None:
+        single_flight = get_single_flight()
+
+    def compute() -> PageTextStatistics:
+        return get_cached_page_statistics(
+            target_url,
+            parser=parser,
+            parse_executor=parse_executor,
+            blob_store=blob_store,
+            max_vocabulary=max_vocabulary,
+        )
+
+    if single_flight is None:
+        return compute()
+
+    computed = []
+
+    def compute_and_keep() -> Dict:
+        page_statistics = compute()
+        computed.append(page_statistics)
+        return page_statistics._asdict()
+
+    key = f"{build_results_variant(parser, max_vocabulary)}:{normalize_url(target_url)}"
+    try:
+        result = single_flight.do(key, compute_and_keep)
+    except redis.RedisError:
+        # The page is not scraped again if it was scraped before Redis was lost,
+        # e.g. whilst publishing the result.
+        if computed:
+            return computed[0]
+        logger.warning("Could not coalesce the scrape of %s", target_url, exc_info=True)
+        return compute()
+
+    return PageTextStatistics(collections.Counter(result["results"]), result["content_hash"])
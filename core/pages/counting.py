@@ -0,0 +1,364 @@
+"""
+This module holds the strategies used to count the words of a page.
+
+Parsers which find whole blocks of visible text, e.g. the text nodes found by `BeautifulSoup`
+or by the `streaming` parser,
+can hand over the blocks rather than 1 word at a time.
+Blocks are joined into batches of around `COUNTING_BATCH_CHARACTERS`,
+each of which is split, filtered and counted by C level calls over a list.
+This means the Python overhead is paid per batch rather than per word,
+whilst memory stays bounded by the size of a batch however large the page is.
+Small blocks are batched together, whereas a block larger than a batch is counted on its own.
+
+The available strategies are:
+    - "tokens": Splits each block and counts the words 1 at a time.
+    - "batched": Joins blocks into batches and counts each batch as a list, the default.
+    - "numpy": As "batched", but counts each batch with `numpy.unique()`.
+        Requires the optional `numpy` package,
+        and is slower than `Counter` for short strings, see `benchmarks/counting.py`.
+
+The strategy can be forced with `COUNTING_STRATEGY`, which is checked when this module is imported.
+There is no selection by input size: in `benchmarks/counting.py`, "batched" counted faster
+than "tokens" on every fixture, from the small page up to millions of words.
+A page smaller than a batch is joined into 1 batch, which costs no more than splitting each block.
+
+Pages may bound the number of distinct words held in memory with a `max_vocabulary`,
+in which case words are counted with the Space-Saving heavy hitters algorithm,
+see `SpaceSavingCounter`. The stored results can also be cut down
+to the `top_k` most frequent words and the words occurring at least `min_count` times.
+"""
+import collections
+import heapq
+import importlib.util
+import itertools
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional
+
+COUNTING_STRATEGY: Optional[str] = os.getenv("COUNTING_STRATEGY")
+COUNTING_BATCH_CHARACTERS: int = int(os.getenv("COUNTING_BATCH_CHARACTERS", 256 * 1024))
+COUNTING_BATCH_WORDS: int = int(os.getenv("COUNTING_BATCH_WORDS", 32 * 1024))
+
+TextFilterPipeline = Callable[[Iterable[str]], Iterable[str]]
+
+
+class UnknownCountingStrategyError(ValueError):
+    ...
+
+
+def _apply_no_text_filters(words: Iterable[str]) -> Iterable[str]:
+    return words
+
+
+def iter_text_batches(
+    text_blocks: Iterable[str], batch_characters: int = COUNTING_BATCH_CHARACTERS
+) -> Iterator[str]:
+    """
+    Joins consecutive `text_blocks` into batches of at least `batch_characters`.
+
+    Blocks are joined with a space, so that words are never merged across blocks.
+    The last batch may be smaller.
+
+    Args:
+        text_blocks: Strings holding 1 or more whitespace separated words.
+        batch_characters: The number of characters at which a batch is yielded.
+
+    Returns:
+        (Generator) - Strings holding the words of several blocks.
+
+    """
+    pending_blocks: List[str] = []
+    pending_characters = 0
+
+    for text_block in text_blocks:
+        pending_blocks.append(text_block)
+        pending_characters += len(text_block)
+        if pending_characters >= batch_characters:
+            yield " ".join(pending_blocks)
+            pending_blocks, pending_characters = [], 0
+
+    if pending_blocks:
+        yield " ".join(pending_blocks)
+
+
+def count_words_one_at_a_time(
+    text_blocks: Iterable[str],
+    apply_text_filters: TextFilterPipeline = _apply_no_text_filters,
+    batch_characters: int = COUNTING_BATCH_CHARACTERS,
+) -> Dict[str, int]:
+    """
+    Splits each of the `text_blocks` and counts the words 1 at a time, the "tokens" strategy.
+
+    Args:
+        text_blocks: Strings holding 1 or more whitespace separated words.
+        apply_text_filters: Takes an iterable of words and returns the words to be counted.
+        batch_characters: Unused, since blocks are never batched.
+            Only accepted so that every strategy can be called in the same way.
+
+    Returns:
+        (Counter) - Keys are the words and values are the aggregated frequencies.
+
+    """
+    words = (word for text_block in text_blocks for word in text_block.split())
+    return collections.Counter(apply_text_filters(words))
+
+
+def count_words_in_batches(
+    text_blocks: Iterable[str],
+    apply_text_filters: TextFilterPipeline = _apply_no_text_filters,
+    batch_characters: int = COUNTING_BATCH_CHARACTERS,
+) -> Dict[str, int]:
+    """
+    Joins the `text_blocks` into batches and counts each batch as a list, the "batched" strategy.
+
+    Args:
+        text_blocks: Strings holding 1 or more whitespace separated words.
+        apply_text_filters: Takes an iterable of words and returns the words to be counted.
+        batch_characters: The number of characters to split and count at a time.
+
+    Returns:
+        (Counter) - Keys are the words and values are the aggregated frequencies.
+
+    """
+    word_counts = collections.Counter()
+    for text_batch in iter_text_batches(text_blocks, batch_characters=batch_characters):
+        word_counts.update(apply_text_filters(text_batch.split()))
+    return word_counts
+
+
+def count_words_in_batches_with_numpy(
+    text_blocks: Iterable[str],
+    apply_text_filters: TextFilterPipeline = _apply_no_text_filters,
+    batch_characters: int = COUNTING_BATCH_CHARACTERS,
+) -> Dict[str, int]:
+    """
+    Joins the `text_blocks` into batches and counts each with `numpy.unique()`,
+    the "numpy" strategy.
+
+    Args:
+        text_blocks: Strings holding 1 or more whitespace separated words.
+        apply_text_filters: Takes an iterable of words and returns the words to be counted.
+        batch_characters: The number of characters to split and count at a time.
+
+    Returns:
+        (Counter) - Keys are the words and values are the aggregated frequencies.
+
+    """
+    import numpy
+
+    word_counts = collections.Counter()
+    for text_batch in iter_text_batches(text_blocks, batch_characters=batch_characters):
+        words = list(apply_text_filters(text_batch.split()))
+        if not words:
+            continue
+
+        unique_words, counts = numpy.unique(numpy.array(words), return_counts=True)
+        word_counts.update(dict(zip(unique_words.tolist(), counts.tolist())))
+    return word_counts
+
+
+COUNTING_STRATEGIES: Dict[str, Callable[..., Dict[str, int]]] = {
+    "tokens": count_words_one_at_a_time,
+    "batched": count_words_in_batches,
+    "numpy": count_words_in_batches_with_numpy,
+}
+
+
+def is_counting_strategy_available(name: str) -> bool:
+    return name in COUNTING_STRATEGIES and (
+        name != "numpy" or importlib.util.find_spec("numpy") is not None
+    )
+
+
+def select_counting_strategy(name: Optional[str] = None) -> str:
+    """
+    Selects the strategy used to count words.
+
+    The `name` takes precedence, followed by the `COUNTING_STRATEGY` environment variable.
+    If neither is set, or the selected strategy cannot be used, "batched" is selected.
+
+    Args:
+        name: The name of the requested strategy.
+
+    Raises:
+        UnknownCountingStrategyError: If the requested strategy does not exist.
+
+    Returns:
+        (str) - The name of the selected strategy.
+
+    """
+    if name is None:
+        return DEFAULT_COUNTING_STRATEGY
+
+    if name not in COUNTING_STRATEGIES:
+        raise UnknownCountingStrategyError(name)
+
+    return name if is_counting_strategy_available(name) else "batched"
+
+
+# An unknown `COUNTING_STRATEGY` fails the worker on startup rather than every scrape.
+DEFAULT_COUNTING_STRATEGY: str = select_counting_strategy(COUNTING_STRATEGY or "batched")
+
+
+def count_words_in_text_blocks(
+    text_blocks: Iterable[str],
+    apply_text_filters: TextFilterPipeline = _apply_no_text_filters,
+    strategy: Optional[str] = None,
+    batch_characters: int = COUNTING_BATCH_CHARACTERS,
+) -> Dict[str, int]:
+    """
+    Splits the `text_blocks` into words, filters them and counts their frequencies.
+
+    The `apply_text_filters` are given a list of words at a time,
+    so they must not depend on words seen in earlier calls.
+    Filters composed by `statistics.compile_text_filters()`
+    from filters built by `string_utils.build_token_filter()` meet this.
+
+    Args:
+        text_blocks: Strings holding 1 or more whitespace separated words.
+        apply_text_filters: Takes an iterable of words and returns the words to be counted.
+        strategy: The name of the counting strategy, see `select_counting_strategy()`.
+        batch_characters: The number of characters to split and count at a time.
+
+    Returns:
+        (Counter) - Keys are the words and values are the aggregated frequencies.
+
+    """
+    count_words = COUNTING_STRATEGIES[select_counting_strategy(strategy)]
+    return count_words(
+        text_blocks, apply_text_filters=apply_text_filters, batch_characters=batch_characters
+    )
+
+
+class ResultOptions(NamedTuple):
+    top_k: Optional[int] = None
+    min_count: Optional[int] = None
+    max_vocabulary: Optional[int] = None
+
+
+def truncate_word_counts(
+    word_counts: Dict[str, int], top_k: Optional[int] = None, min_count: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Cuts the `word_counts` down to the words which are to be stored.
+
+    Args:
+        word_counts: Keys are the words and values are their frequencies.
+        top_k: Only the `top_k` most frequent words are kept.
+            Words tied on the lowest kept frequency are kept in the order they were counted.
+        min_count: Only words occurring at least `min_count` times are kept.
+
+    Returns:
+        (Counter) - The kept words and their frequencies.
+
+    """
+    if min_count is not None and min_count > 1:
+        word_counts = {word: count for word, count in word_counts.items() if count >= min_count}
+
+    if top_k is not None and top_k < len(word_counts):
+        return collections.Counter(
+            dict(heapq.nlargest(top_k, word_counts.items(), key=lambda item: item[1]))
+        )
+
+    return collections.Counter(word_counts)
+
+
+class SpaceSavingCounter:
+    """
+    Counts the most frequent words of a stream whilst holding at most `capacity` words.
+
+    This is the Space-Saving algorithm, applied to batches of pre-aggregated counts.
+    Counts are exact for as long as no more than `capacity` distinct words have been seen.
+    Once full, an unseen word replaces the least frequent word held
+    and inherits its count, which is recorded as the maximum overestimate of the new word.
+    Any word occurring more than `total / capacity` times is guaranteed to be held.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.overestimates: Dict[str, int] = {}
+
+    @property
+    def is_exact(self) -> bool:
+        return not self.overestimates
+
+    def update(self, batch_counts: Mapping[str, int]) -> None:
+        """
+        Adds the `batch_counts` to the words being held.
+
+        Args:
+            batch_counts: Keys are the words and values are their frequencies within the batch.
+
+        Returns:
+            None
+
+        """
+        unseen_words = []
+        for word, count in batch_counts.items():
+            if word in self.counts:
+                self.counts[word] += count
+            else:
+                unseen_words.append((count, word))
+
+        # The most frequent unseen words are placed first,
+        # so that they are the least likely to be replaced later within the batch.
+        unseen_words.sort(reverse=True)
+        free_capacity = self.capacity - len(self.counts)
+        for count, word in unseen_words[:free_capacity]:
+            self.counts[word] = count
+
+        remaining_words = unseen_words[max(free_capacity, 0):]
+        if not remaining_words:
+            return
+
+        heap = [(count, word) for word, count in self.counts.items()]
+        heapq.heapify(heap)
+        for count, word in remaining_words:
+            minimum_count, minimum_word = heap[0]
+            del self.counts[minimum_word]
+            self.overestimates.pop(minimum_word, None)
+
+            self.counts[word] = minimum_count + count
+            self.overestimates[word] = minimum_count
+            heapq.heapreplace(heap, (minimum_count + count, word))
+
+    def most_common(self) -> Dict[str, int]:
+        return collections.Counter(self.counts)
+
+
+def iter_word_batches(
+    words: Iterable[str], batch_words: int = COUNTING_BATCH_WORDS
+) -> Iterator[List[str]]:
+    words = iter(words)
+    while True:
+        word_batch = list(itertools.islice(words, batch_words))
+        if not word_batch:
+            return
+        yield word_batch
+
+
+def count_word_batches_with_space_saving(
+    word_batches: Iterable[Iterable[str]], max_vocabulary: int
+) -> Dict[str, int]:
+    """
+    Counts the `word_batches` whilst holding at most `max_vocabulary` distinct words.
+
+    Each batch is aggregated by `Counter` before being merged into a `SpaceSavingCounter`,
+    so memory is bounded by the size of a batch plus the `max_vocabulary`.
+
+    Args:
+        word_batches: Iterables of words, e.g. as returned by `iter_word_batches()`.
+        max_vocabulary: The maximum number of distinct words to hold.
+
+    Returns:
+        (Counter) - Keys are the words and values are their frequencies,
+            which may be overestimated if the page has more than `max_vocabulary` words.
+
+    """
+    space_saving_counter = SpaceSavingCounter(capacity=max_vocabulary)
+    for word_batch in word_batches:
+        space_saving_counter.update(collections.Counter(word_batch))
+    return space_saving_counter.most_common()
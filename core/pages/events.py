@@ -0,0 +1,298 @@
+"""
+This module holds the notifications sent when the status of a page changes.
+
+Status changes are published to Redis by `publish_page_statuses()`, on 1 channel per page,
+by the methods of `db.models.page.Page` which write the status.
+
+Each API process holds 1 `PageEventListener`, which subscribes to every page channel
+with a single pattern subscription and hands each event to the requests waiting on that page.
+This means a waiting request holds neither a database connection nor a Redis connection.
+
+Redis does not store published events, so events sent whilst the listener is disconnected are lost.
+Waiting requests therefore also read the status of the page
+every `PAGE_EVENTS_RECHECK_INTERVAL` seconds, which bounds how late they can be woken.
+"""
+import asyncio
+import collections
+import contextlib
+import json
+import logging
+import os
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, NamedTuple, Optional, Set
+
+import redis
+import redis.asyncio
+
+PAGE_EVENTS_ENABLED: bool = os.getenv("PAGE_EVENTS_ENABLED", "true").lower() == "true"
+PAGE_EVENTS_URL: str = os.getenv("PAGE_EVENTS_URL", "redis://localhost:6379/3")
+PAGE_EVENTS_RECHECK_INTERVAL: float = float(os.getenv("PAGE_EVENTS_RECHECK_INTERVAL", 10))
+PAGE_EVENTS_CONNECT_TIMEOUT: float = float(os.getenv("PAGE_EVENTS_CONNECT_TIMEOUT", 1))
+
+CHANNEL_PREFIX = "nate:page-events:"
+FINAL_STATUSES = {"DONE", "FAILED"}
+
+logger = logging.getLogger(__name__)
+
+
+class PageEvent(NamedTuple):
+    page_id: int
+    status: str
+
+
+def build_channel(page_id: int, prefix: str = CHANNEL_PREFIX) -> str:
+    return f"{prefix}{page_id}"
+
+
+class PageEventPublisher:
+    """
+    Publishes the status changes of pages, from the API or the Celery workers.
+    """
+
+    def __init__(self, client: redis.Redis, prefix: str = CHANNEL_PREFIX):
+        self.client = client
+        self.prefix = prefix
+
+    def publish(self, page_ids: List[int], status: str) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for page_id in page_ids:
+            event = PageEvent(page_id=page_id, status=status)
+            pipeline.publish(build_channel(page_id, self.prefix), json.dumps(event._asdict()))
+        pipeline.execute()
+
+
+_page_event_publisher: Optional[PageEventPublisher] = None
+_page_event_publisher_lock = threading.Lock()
+
+
+def get_page_event_publisher() -> Optional[PageEventPublisher]:
+    """
+    Gets the `PageEventPublisher` for the current process.
+
+    Returns:
+        (PageEventPublisher) - The publisher, None if `PAGE_EVENTS_ENABLED` is false.
+
+    """
+    global _page_event_publisher
+
+    if not PAGE_EVENTS_ENABLED:
+        return None
+
+    with _page_event_publisher_lock:
+        if _page_event_publisher is None:
+            client = redis.Redis.from_url(
+                PAGE_EVENTS_URL, socket_connect_timeout=PAGE_EVENTS_CONNECT_TIMEOUT
+            )
+            _page_event_publisher = PageEventPublisher(client=client)
+
+    return _page_event_publisher
+
+
+def publish_page_statuses(
+    page_ids: List[int], status: str, publisher: Optional[PageEventPublisher] = None
+) -> None:
+    """
+    Notifies the requests waiting on the `page_ids` that their status has changed.
+
+    This should only be called once the status has been committed.
+    Failing to publish is logged rather than raised,
+    since the status has already been written and waiting requests will read it in time.
+
+    Args:
+        page_ids: The IDs of the `Page` objects whose status has changed.
+        status: The new status of the pages.
+        publisher: The publisher to use. Defaults to `get_page_event_publisher()`.
+
+    Returns:
+        None
+
+    """
+    publisher = publisher or get_page_event_publisher()
+    if publisher is None or not page_ids:
+        return
+
+    try:
+        publisher.publish(page_ids, status)
+    except redis.RedisError:
+        logger.warning("Could not publish the %s status of %d pages", status, len(page_ids))
+
+
+class PageEventListener:
+    """
+    Receives the status changes of every page and hands them to the local subscribers.
+
+    The pattern subscription is made by the first call to `subscribe()`,
+    and is made again by the next call if the connection to Redis is lost.
+    Listeners are bound to the event loop on which they were first subscribed to.
+    """
+
+    def __init__(self, client: redis.asyncio.Redis, prefix: str = CHANNEL_PREFIX):
+        self.client = client
+        self.prefix = prefix
+        self._queues: Dict[int, Set[asyncio.Queue]] = collections.defaultdict(set)
+        self._reader: Optional[asyncio.Task] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    async def _start(self) -> None:
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self._reader is not None:
+                return
+
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{self.prefix}*")
+                # The confirmation is awaited, so that the subscriber cannot miss an event
+                # published after it has read the status of the page.
+                await pubsub.get_message(timeout=PAGE_EVENTS_CONNECT_TIMEOUT)
+            except redis.RedisError:
+                await pubsub.reset()
+                raise
+
+            self._reader = asyncio.create_task(self._read(pubsub))
+
+    async def _read(self, pubsub: redis.asyncio.client.PubSub) -> None:
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+
+                event = PageEvent(**json.loads(message["data"]))
+                for queue in self._queues.get(event.page_id, ()):
+                    queue.put_nowait(event)
+        except redis.RedisError:
+            logger.warning("Lost the subscription to page events", exc_info=True)
+        finally:
+            self._reader = None
+            await pubsub.reset()
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, page_id: int) -> AsyncIterator[asyncio.Queue]:
+        """
+        Receives the `PageEvent` of each status change of the page whilst the context is open.
+
+        If Redis cannot be reached, no events are received.
+
+        Args:
+            page_id: The ID of the `Page` object to receive events for.
+
+        Returns:
+            (asyncio.Queue) - The queue the events of the page are put on.
+
+        """
+        queue = asyncio.Queue()
+        self._queues[page_id].add(queue)
+        try:
+            try:
+                await self._start()
+            except redis.RedisError:
+                logger.warning("Could not subscribe to page events", exc_info=True)
+            yield queue
+        finally:
+            self._queues[page_id].discard(queue)
+            if not self._queues[page_id]:
+                del self._queues[page_id]
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reader
+
+
+_page_event_listener: Optional[PageEventListener] = None
+_page_event_listener_lock = threading.Lock()
+
+
+def get_page_event_listener() -> Optional[PageEventListener]:
+    """
+    Gets the `PageEventListener` for the current process.
+
+    Returns:
+        (PageEventListener) - The listener, None if `PAGE_EVENTS_ENABLED` is false.
+
+    """
+    global _page_event_listener
+
+    if not PAGE_EVENTS_ENABLED:
+        return None
+
+    with _page_event_listener_lock:
+        if _page_event_listener is None:
+            client = redis.asyncio.Redis.from_url(
+                PAGE_EVENTS_URL, socket_connect_timeout=PAGE_EVENTS_CONNECT_TIMEOUT
+            )
+            _page_event_listener = PageEventListener(client=client)
+
+    return _page_event_listener
+
+
+async def close_page_event_listener() -> None:
+    global _page_event_listener
+
+    if _page_event_listener is not None:
+        await _page_event_listener.close()
+        _page_event_listener = None
+
+
+@contextlib.asynccontextmanager
+async def _unsubscribed() -> AsyncIterator[asyncio.Queue]:
+    yield asyncio.Queue()
+
+
+async def iter_page_statuses(
+    page_id: int,
+    read_status: Callable[[], Awaitable[str]],
+    timeout: float,
+    listener: Optional[PageEventListener] = None,
+    recheck_interval: float = PAGE_EVENTS_RECHECK_INTERVAL,
+) -> AsyncIterator[Optional[str]]:
+    """
+    Yields the status of the page each time it changes, until it is final or `timeout` passes.
+
+    The page is subscribed to before its current status is read and yielded,
+    so that a change made in between is still seen.
+    Each change is yielded once, whether it was seen from an event or by reading the status.
+    The first status is None for pages which have not been fetched yet.
+    After that, None is yielded whenever `recheck_interval` seconds pass without a change,
+    e.g. so that event streams can send a keep-alive.
+
+    Args:
+        page_id: The ID of the `Page` object to follow.
+        read_status: Reads the current status of the page from the database.
+        timeout: The maximum number of seconds to follow the page for.
+        listener: The listener to receive events from.
+            If None, the status is only read every `recheck_interval` seconds.
+        recheck_interval: The number of seconds to wait for an event before reading the status.
+
+    Returns:
+        (AsyncGenerator) - The statuses of the page, with None for each interval without a change.
+
+    """
+    loop = asyncio.get_running_loop()
+    gives_up_at = loop.time() + timeout
+
+    subscription = _unsubscribed() if listener is None else listener.subscribe(page_id)
+    async with subscription as queue:
+        status = await read_status()
+        yield status
+
+        while status not in FINAL_STATUSES:
+            remaining = gives_up_at - loop.time()
+            if remaining <= 0:
+                return
+
+            try:
+                event = await asyncio.wait_for(queue.get(), min(remaining, recheck_interval))
+                new_status = event.status
+            except asyncio.TimeoutError:
+                new_status = await read_status()
+
+            if new_status == status:
+                yield None
+                continue
+
+            status = new_status
+            yield status
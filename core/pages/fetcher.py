@@ -0,0 +1,348 @@
+"""
+This module holds the functionality for fetching pages over HTTP.
+
+A single pooled client is kept per process so that TCP/TLS connections
+are kept alive and reused across pages fetched from the same host.
+The number of connections per host and the number of in-flight requests are bounded.
+
+The client is safe to share between threads, so it can be used directly
+within Celery tasks, and from the FastAPI event loop via `fetch_async()`
+which offloads the blocking call to a worker thread.
+
+Response bodies are read in chunks of `FETCH_CHUNK_SIZE`,
+so that parsing can begin before the whole page has been downloaded.
+A page is abandoned once it exceeds `FETCH_MAX_BODY_BYTES` or `FETCH_DEADLINE` seconds.
+
+The following metrics are registered with the default `prometheus_client` registry:
+    - `nate_fetch_seconds`: Time taken to fetch a page, from the request to the end of its body.
+    - `nate_fetch_bytes`: Decoded size of the fetched bodies.
+    - `nate_fetch_responses_total`: Fetches by response status, "error" if none was received.
+"""
+import contextlib
+import os
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+import anyio
+import urllib3
+from prometheus_client import Counter, Histogram
+
+from core.pages import profiling
+
+FETCH_CONNECT_TIMEOUT: float = float(os.getenv("FETCH_CONNECT_TIMEOUT", 5))
+FETCH_READ_TIMEOUT: float = float(os.getenv("FETCH_READ_TIMEOUT", 30))
+FETCH_MAX_CONNECTIONS_PER_HOST: int = int(os.getenv("FETCH_MAX_CONNECTIONS_PER_HOST", 4))
+FETCH_MAX_HOSTS: int = int(os.getenv("FETCH_MAX_HOSTS", 100))
+FETCH_MAX_CONCURRENCY: int = int(os.getenv("FETCH_MAX_CONCURRENCY", 32))
+FETCH_MAX_REDIRECTS: int = int(os.getenv("FETCH_MAX_REDIRECTS", 5))
+FETCH_CHUNK_SIZE: int = int(os.getenv("FETCH_CHUNK_SIZE", 64 * 1024))
+FETCH_MAX_BODY_BYTES: int = int(os.getenv("FETCH_MAX_BODY_BYTES", 20 * 1024 * 1024))
+FETCH_DEADLINE: float = float(os.getenv("FETCH_DEADLINE", 60))
+
+DEFAULT_HEADERS: Dict[str, str] = {
+    "User-Agent": "nate-crawler",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+FETCH_SECONDS = Histogram(
+    "nate_fetch_seconds",
+    "Time taken to fetch a page, from the request to the end of its body",
+    ["status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+FETCH_BYTES = Histogram(
+    "nate_fetch_bytes",
+    "Decoded size of fetched bodies",
+    buckets=(1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2e7),
+)
+FETCH_RESPONSES = Counter(
+    "nate_fetch_responses_total",
+    "Fetches by response status, or error if no response was received",
+    ["status"],
+)
+
+
+class FetchError(Exception):
+    ...
+
+
+class ResponseTooLargeError(FetchError):
+    ...
+
+
+class FetchDeadlineExceededError(FetchError):
+    ...
+
+
+def iter_response_chunks(
+    response: urllib3.HTTPResponse,
+    chunk_size: int = FETCH_CHUNK_SIZE,
+    max_body_bytes: int = FETCH_MAX_BODY_BYTES,
+    deadline: float = FETCH_DEADLINE,
+) -> Iterator[bytes]:
+    """
+    Reads the body of the `response` in chunks.
+
+    The `max_body_bytes` applies to the decoded body,
+    so compressed responses cannot be used to exceed it.
+    The `deadline` is checked between chunks,
+    so a single chunk may overrun it by at most the read timeout of the client.
+
+    Args:
+        response: The response whose body has not yet been read.
+        chunk_size: The number of bytes to read at a time.
+        max_body_bytes: The maximum number of bytes to read from the body.
+        deadline: The maximum number of seconds to spend reading the body.
+
+    Raises:
+        ResponseTooLargeError: If the body exceeds the `max_body_bytes`.
+        FetchDeadlineExceededError: If reading the body exceeds the `deadline`.
+        FetchError: If the body could not be read.
+
+    Returns:
+        (Generator) - Decoded chunks of the body.
+
+    """
+    declared_length = response.headers.get("Content-Length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > max_body_bytes:
+        raise ResponseTooLargeError(f"Body of {declared_length} bytes exceeds {max_body_bytes}")
+
+    expires_at = time.monotonic() + deadline
+    bytes_read = 0
+
+    try:
+        chunks = response.stream(chunk_size, decode_content=True)
+        for chunk in profiling.iter_stage(chunks, "fetch"):
+            bytes_read += len(chunk)
+            if bytes_read > max_body_bytes:
+                raise ResponseTooLargeError(f"Body exceeds {max_body_bytes} bytes")
+
+            if time.monotonic() > expires_at:
+                raise FetchDeadlineExceededError(f"Body was not read within {deadline}s")
+
+            yield chunk
+    except urllib3.exceptions.HTTPError as error:
+        raise FetchError("Could not read response body") from error
+
+
+class Fetcher:
+    """
+    A pooled HTTP client with keep-alive connections and bounded concurrency.
+
+    Connections are pooled per host, with at most `max_connections_per_host` open at a time.
+    Requests beyond that limit wait for a connection to be released
+    rather than opening new ones.
+    At most `max_concurrency` requests are in flight across all hosts.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = FETCH_CONNECT_TIMEOUT,
+        read_timeout: float = FETCH_READ_TIMEOUT,
+        max_connections_per_host: int = FETCH_MAX_CONNECTIONS_PER_HOST,
+        max_hosts: int = FETCH_MAX_HOSTS,
+        max_concurrency: int = FETCH_MAX_CONCURRENCY,
+        max_redirects: int = FETCH_MAX_REDIRECTS,
+    ):
+        self.pool_manager = urllib3.PoolManager(
+            num_pools=max_hosts,
+            maxsize=max_connections_per_host,
+            block=True,
+            timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+            retries=urllib3.Retry(total=None, connect=1, read=0, redirect=max_redirects),
+        )
+        self.semaphore = threading.BoundedSemaphore(max_concurrency)
+
+    @contextlib.contextmanager
+    def stream(
+        self, target_url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Iterator[urllib3.HTTPResponse]:
+        """
+        Sends a GET request to the `target_url` and yields the unread response.
+
+        The connection is returned to the pool once the context is exited.
+
+        Args:
+            target_url: The URL to fetch.
+            headers: Additional request headers.
+
+        Raises:
+            FetchError: If the request could not be completed.
+
+        Returns:
+            (HTTPResponse) - The response whose body has not yet been read.
+
+        """
+        with self.semaphore:
+            try:
+                with profiling.stage("fetch"):
+                    response = self.pool_manager.request(
+                        "GET",
+                        target_url,
+                        headers={**DEFAULT_HEADERS, **(headers or {})},
+                        preload_content=False,
+                    )
+            except urllib3.exceptions.HTTPError as error:
+                raise FetchError(f"Could not fetch {target_url}") from error
+
+            try:
+                yield response
+            except BaseException:
+                # The body may be partially read,
+                # so the connection cannot safely be reused.
+                response.close()
+                raise
+            finally:
+                response.release_conn()
+
+    def iter_chunks(
+        self,
+        target_url: str,
+        chunk_size: int = FETCH_CHUNK_SIZE,
+        max_body_bytes: int = FETCH_MAX_BODY_BYTES,
+        deadline: float = FETCH_DEADLINE,
+    ) -> Iterator[bytes]:
+        """
+        Fetches the body of the `target_url` in chunks.
+
+        The request is only sent once the first chunk is requested.
+        See `iter_response_chunks()` for how the body is bounded.
+        The time taken and the number of bytes read are recorded once the body has been read,
+        or once the fetch has been abandoned.
+
+        Args:
+            target_url: The URL to fetch.
+            chunk_size: The number of bytes to read at a time.
+            max_body_bytes: The maximum number of bytes to read from the body.
+            deadline: The maximum number of seconds to spend reading the body.
+
+        Raises:
+            FetchError: If the request could not be completed
+                or the response has an error status.
+
+        Returns:
+            (Generator) - Decoded chunks of the body.
+
+        """
+        started_at = time.perf_counter()
+        status = "error"
+        bytes_read = 0
+
+        try:
+            with self.stream(target_url) as response:
+                status = str(response.status)
+                if response.status >= 400:
+                    raise FetchError(f"{target_url} responded with {response.status}")
+
+                for chunk in iter_response_chunks(
+                    response,
+                    chunk_size=chunk_size,
+                    max_body_bytes=max_body_bytes,
+                    deadline=deadline,
+                ):
+                    bytes_read += len(chunk)
+                    yield chunk
+        finally:
+            FETCH_SECONDS.labels(status).observe(time.perf_counter() - started_at)
+            FETCH_BYTES.observe(bytes_read)
+            FETCH_RESPONSES.labels(status).inc()
+
+    def fetch(self, target_url: str) -> bytes:
+        """
+        Fetches the body of the `target_url`.
+
+        Args:
+            target_url: The URL to fetch.
+
+        Raises:
+            FetchError: If the request could not be completed
+                or the response has an error status.
+
+        Returns:
+            (bytes) - The decoded body of the response.
+
+        """
+        return b"".join(self.iter_chunks(target_url))
+
+    async def fetch_async(self, target_url: str) -> bytes:
+        """
+        Fetches the body of the `target_url` without blocking the running event loop.
+
+        Args:
+            target_url: The URL to fetch.
+
+        Returns:
+            (bytes) - The decoded body of the response.
+
+        """
+        return await anyio.to_thread.run_sync(self.fetch, target_url)
+
+
+_fetcher: Optional[Fetcher] = None
+_fetcher_pid: Optional[int] = None
+_fetcher_lock = threading.Lock()
+
+
+def get_fetcher() -> Fetcher:
+    """
+    Gets the `Fetcher` for the current process.
+
+    A new `Fetcher` is created after a fork,
+    so that Celery prefork workers never share pooled sockets with their parent.
+
+    Returns:
+        (Fetcher) - The pooled client for this process.
+
+    """
+    global _fetcher, _fetcher_pid
+
+    with _fetcher_lock:
+        if _fetcher is None or _fetcher_pid != os.getpid():
+            _fetcher = Fetcher()
+            _fetcher_pid = os.getpid()
+
+    return _fetcher
+
+
+def open_url(target_url: str) -> bytes:
+    """
+    Opens the `target_url` with the pooled client of the current process.
+
+    Args:
+        target_url: The URL to scrape text from.
+
+    Returns:
+        (bytes) - HTML opened from the `target_url`.
+
+    """
+    return get_fetcher().fetch(target_url)
+
+
+def iter_url_chunks(target_url: str) -> Iterator[bytes]:
+    """
+    Streams the body of the `target_url` with the pooled client of the current process.
+
+    Args:
+        target_url: The URL to scrape text from.
+
+    Returns:
+        (Generator) - Decoded chunks of HTML from the `target_url`.
+
+    """
+    return get_fetcher().iter_chunks(target_url)
+
+
+async def open_url_async(target_url: str) -> bytes:
+    """
+    Opens the `target_url` without blocking the running event loop.
+
+    Args:
+        target_url: The URL to scrape text from.
+
+    Returns:
+        (bytes) - HTML opened from the `target_url`.
+
+    """
+    return await get_fetcher().fetch_async(target_url)
@@ -0,0 +1,99 @@
+"""
+This module holds a spool for passing fetched html between processes by reference.
+
+The fetch stage writes the html of a page to the spool and passes on the returned reference,
+so that the body of the page never travels through the Celery broker.
+The parse stage reads the html by its reference and deletes it once the page has been parsed.
+
+The spool is a directory, set by `HTML_SPOOL_DIR`,
+which must be shared by the fetching and parsing workers, e.g. via a shared volume.
+"""
+import os
+import re
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional
+
+HTML_SPOOL_DIR: str = os.getenv(
+    "HTML_SPOOL_DIR", os.path.join(tempfile.gettempdir(), "nate-html-spool")
+)
+
+REFERENCE_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+class HtmlNotFoundError(Exception):
+    ...
+
+
+class HtmlSpool:
+    """
+    Stores html in files named by a random reference.
+
+    Files are written to a temporary name and then renamed,
+    so a reader never sees partially written html.
+    """
+
+    def __init__(self, directory: str = HTML_SPOOL_DIR):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _build_path(self, reference: str) -> Path:
+        if not REFERENCE_PATTERN.match(reference):
+            raise ValueError(f"Invalid html reference: {reference!r}")
+        return self.directory / f"{reference}.html"
+
+    def put(self, html: bytes) -> str:
+        """
+        Writes the `html` to the spool.
+
+        Args:
+            html: The raw html of the page.
+
+        Returns:
+            (str) - The reference to read the html back with.
+
+        """
+        reference = uuid.uuid4().hex
+        path = self._build_path(reference)
+        temporary_path = path.with_suffix(".tmp")
+        temporary_path.write_bytes(html)
+        os.replace(temporary_path, path)
+        return reference
+
+    def get(self, reference: str) -> bytes:
+        """
+        Reads the html written under the `reference`.
+
+        Args:
+            reference: The reference returned by `put()`.
+
+        Raises:
+            HtmlNotFoundError: If no html is held under the `reference`.
+
+        Returns:
+            (bytes) - The raw html of the page.
+
+        """
+        try:
+            return self._build_path(reference).read_bytes()
+        except FileNotFoundError as error:
+            raise HtmlNotFoundError(reference) from error
+
+    def delete(self, reference: str) -> None:
+        self._build_path(reference).unlink(missing_ok=True)
+
+
+_html_spool: Optional[HtmlSpool] = None
+_html_spool_lock = threading.Lock()
+
+
+def get_html_spool() -> HtmlSpool:
+    global _html_spool
+
+    with _html_spool_lock:
+        if _html_spool is None:
+            _html_spool = HtmlSpool()
+
+    return _html_spool
@@ -0,0 +1,221 @@
+"""
+This module holds a registry of html parser backends used to scrape text from pages.
+
+Each backend is a callable with the following interface:
+
+    Given an iterable of html byte chunks
+    When the backend is called with the chunks
+    Then an iterable of visible words is returned
+
+Backends may depend on optional packages, e.g. `lxml`.
+When a backend is requested but its package is not installed,
+the fastest installed backend is selected instead.
+"""
+import importlib.util
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from core.pages import beautiful_soup_crawler, fetcher, streaming_crawler
+
+ParserBackend = Callable[[Iterable[bytes]], Iterator[str]]
+
+
+class RegisteredParser(NamedTuple):
+    backend: ParserBackend
+    required_module: Optional[str]
+    text_block_backend: Optional[ParserBackend] = None
+
+
+PARSERS: Dict[str, RegisteredParser] = {}
+
+# Ordered from fastest to slowest, as measured by `benchmarks/parsers.py`.
+PARSER_PREFERENCE: List[str] = ["streaming", "lxml", "html.parser", "html5lib"]
+
+DEFAULT_PARSER: Optional[str] = os.getenv("HTML_PARSER")
+
+
+class UnknownParserError(ValueError):
+    ...
+
+
+def register_parser(
+    name: str,
+    backend: ParserBackend,
+    required_module: Optional[str] = None,
+    text_block_backend: Optional[ParserBackend] = None,
+) -> None:
+    """
+    Registers the `backend` under the given `name`.
+
+    Args:
+        name: The name used to select the backend.
+        backend: The callable which yields visible words from html byte chunks.
+        required_module: The name of a module which must be importable
+            for the backend to be considered available.
+        text_block_backend: An optional callable which yields whole blocks of visible text,
+            rather than single words, so that they can be counted in batches.
+
+    Returns:
+        None
+
+    """
+    PARSERS[name] = RegisteredParser(
+        backend=backend, required_module=required_module, text_block_backend=text_block_backend
+    )
+
+
+def is_parser_available(name: str) -> bool:
+    """
+    Checks if the parser registered under `name` can be used in this environment.
+
+    Args:
+        name: The name of the registered parser.
+
+    Returns:
+        (bool) - True if the parser is registered and its required module is installed,
+            False otherwise.
+
+    """
+    try:
+        required_module = PARSERS[name].required_module
+    except KeyError:
+        return False
+
+    return required_module is None or importlib.util.find_spec(required_module) is not None
+
+
+def get_available_parsers() -> List[str]:
+    """
+    Gets the names of the parsers which can be used in this environment.
+
+    Returns:
+        (list) - Parser names ordered by `PARSER_PREFERENCE`,
+            followed by any other registered parsers.
+
+    """
+    ordered_names = PARSER_PREFERENCE + [
+        name for name in PARSERS if name not in PARSER_PREFERENCE
+    ]
+    return [name for name in ordered_names if is_parser_available(name)]
+
+
+def select_parser(name: Optional[str] = None) -> str:
+    """
+    Selects the parser to be used.
+
+    The `name` takes precedence, followed by the `HTML_PARSER` environment variable.
+    If neither is set, or the selected parser is not installed,
+    then the fastest available parser is selected.
+
+    Args:
+        name: The name of the requested parser.
+
+    Raises:
+        UnknownParserError: If the requested parser has not been registered.
+
+    Returns:
+        (str) - The name of the selected parser.
+
+    """
+    name = name or DEFAULT_PARSER
+
+    if name is not None and name not in PARSERS:
+        raise UnknownParserError(name)
+
+    if name is not None and is_parser_available(name):
+        return name
+
+    return get_available_parsers()[0]
+
+
+def get_parser(name: Optional[str] = None) -> ParserBackend:
+    """
+    Gets the backend of the parser selected by `select_parser()`.
+
+    Args:
+        name: The name of the requested parser.
+
+    Returns:
+        (Callable) - The backend for the selected parser.
+
+    """
+    return PARSERS[select_parser(name)].backend
+
+
+def get_text_block_parser(name: Optional[str] = None) -> Optional[ParserBackend]:
+    """
+    Gets the text block backend of the parser selected by `select_parser()`.
+
+    Args:
+        name: The name of the requested parser.
+
+    Returns:
+        (Callable) - The text block backend for the selected parser,
+            None if it only yields single words.
+
+    """
+    return PARSERS[select_parser(name)].text_block_backend
+
+
+def _build_beautiful_soup_backend(features: str) -> ParserBackend:
+    def beautiful_soup_backend(html_chunks: Iterable[bytes]) -> Iterator[str]:
+        html = b"".join(html_chunks)
+        all_text = beautiful_soup_crawler.find_all_text_in_html(html, parser=features)
+        return beautiful_soup_crawler.filter_for_visible_text(all_text)
+
+    return beautiful_soup_backend
+
+
+def _build_beautiful_soup_text_block_backend(features: str) -> ParserBackend:
+    def beautiful_soup_text_block_backend(html_chunks: Iterable[bytes]) -> Iterator[str]:
+        html = b"".join(html_chunks)
+        all_text = beautiful_soup_crawler.find_all_text_in_html(html, parser=features)
+        return beautiful_soup_crawler.filter_for_visible_text_blocks(all_text)
+
+    return beautiful_soup_text_block_backend
+
+
+register_parser(
+    name="streaming",
+    backend=streaming_crawler.iter_visible_words,
+    text_block_backend=streaming_crawler.iter_visible_text_blocks,
+)
+register_parser(
+    name="lxml",
+    backend=_build_beautiful_soup_backend("lxml"),
+    required_module="lxml",
+    text_block_backend=_build_beautiful_soup_text_block_backend("lxml"),
+)
+register_parser(
+    name="html.parser",
+    backend=_build_beautiful_soup_backend("html.parser"),
+    text_block_backend=_build_beautiful_soup_text_block_backend("html.parser"),
+)
+register_parser(
+    name="html5lib",
+    backend=_build_beautiful_soup_backend("html5lib"),
+    required_module="html5lib",
+    text_block_backend=_build_beautiful_soup_text_block_backend("html5lib"),
+)
+
+
+def scrape_text_from_target_url(
+    target_url: str, parser: Optional[str] = None
+) -> Iterator[str]:
+    """
+    Scrapes visible text from the given `target_url` with the selected `parser`.
+
+    The page is downloaded in chunks which are fed to the parser as they arrive.
+
+    Args:
+        target_url: The URL to scrape text from.
+        parser: The name of the parser to use.
+            Defaults to the selection made by `select_parser()`.
+
+    Returns:
+        (Generator) - Strings which are visible on the page.
+
+    """
+    parser_backend = get_parser(parser)
+    html_chunks = fetcher.iter_url_chunks(target_url)
+    return parser_backend(html_chunks)
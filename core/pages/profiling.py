@@ -0,0 +1,321 @@
+"""
+This module holds the opt-in profiling of scrapes, to find out where the time of a slow page went.
+
+A `StageTimer` records the wall and CPU time spent in each stage of a scrape,
+i.e. "fetch", "parse", "filter_and_count" and "persist".
+The timer of the scrape is held in a context variable whilst `profile_scrape()` is open,
+so stages are entered with `stage()` wherever they run, without the timer being passed down.
+When no scrape is being profiled, `stage()` does nothing but look up the context variable.
+
+Stage times are exclusive, so time spent in a stage entered from within another
+is only counted for the inner stage, and the stages add up to the total of the scrape.
+For example, the body of a page is read as it is parsed,
+so the time spent waiting on the socket is counted as "fetch" rather than "parse".
+Time spent outside of any stage, e.g. reading the result cache, is counted as "other".
+
+CPU time is that of the current thread,
+so time spent by a `parse_executor` in another process is only counted as wall time.
+Pages scraped by the split pipeline are timed by its fetch and parse tasks in turn,
+the latter carrying on from the timings of the former, see `StageTimer.from_dict()`.
+
+A page is profiled if it was created with `profile` set,
+or at random for a `SCRAPE_PROFILING_SAMPLE_RATE` fraction of pages.
+If `SCRAPE_PROFILING_DUMP_DIR` is set, profiled pages are also run under `cProfile`,
+and `pstats` dumps of the `SCRAPE_PROFILING_DUMP_WORST` slowest are kept in that directory.
+"""
+import cProfile
+import collections
+import contextlib
+import contextvars
+import glob
+import logging
+import os
+import random
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, TypeVar
+
+SCRAPE_PROFILING_SAMPLE_RATE: float = float(os.getenv("SCRAPE_PROFILING_SAMPLE_RATE", 0))
+SCRAPE_PROFILING_DUMP_DIR: str = os.getenv("SCRAPE_PROFILING_DUMP_DIR", "")
+SCRAPE_PROFILING_DUMP_WORST: int = int(os.getenv("SCRAPE_PROFILING_DUMP_WORST", 10))
+
+OTHER_STAGE = "other"
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimer:
+    """
+    Records the exclusive wall and CPU time spent in each stage of 1 scrape.
+
+    A timer must only be used from the thread which started it.
+    """
+
+    def __init__(self):
+        self.wall_seconds: Dict[str, float] = collections.defaultdict(float)
+        self.cpu_seconds: Dict[str, float] = collections.defaultdict(float)
+        self._stages: List[str] = [OTHER_STAGE]
+        self._wall_mark = time.perf_counter()
+        self._cpu_mark = time.thread_time()
+
+    def _charge_elapsed(self) -> None:
+        wall, cpu = time.perf_counter(), time.thread_time()
+        self.wall_seconds[self._stages[-1]] += wall - self._wall_mark
+        self.cpu_seconds[self._stages[-1]] += cpu - self._cpu_mark
+        self._wall_mark, self._cpu_mark = wall, cpu
+
+    def start(self) -> None:
+        self._wall_mark = time.perf_counter()
+        self._cpu_mark = time.thread_time()
+
+    def stop(self) -> None:
+        self._charge_elapsed()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._charge_elapsed()
+        self._stages.append(name)
+        try:
+            yield
+        finally:
+            self._charge_elapsed()
+            self._stages.pop()
+
+    def add(self, name: str, wall_seconds: float, cpu_seconds: float) -> None:
+        self.wall_seconds[name] += wall_seconds
+        self.cpu_seconds[name] += cpu_seconds
+
+    @classmethod
+    def from_dict(cls, timings: Dict) -> "StageTimer":
+        """
+        Rebuilds a timer from the timings of a scrape, so that it can be carried on by another task.
+
+        Args:
+            timings: The timings built by `as_dict()`.
+
+        Returns:
+            (StageTimer) - A timer holding the time spent in each of the stages so far.
+
+        """
+        timer = cls()
+        for name, stage_timings in timings["stages"].items():
+            timer.add(name, **stage_timings)
+        return timer
+
+    @property
+    def total_wall_seconds(self) -> float:
+        return sum(self.wall_seconds.values())
+
+    def as_dict(self) -> Dict:
+        """
+        Builds the timings as they are stored on the `timings` field of the `Page`.
+
+        Returns:
+            (dict) - The total `wall_seconds` and `cpu_seconds` of the scrape,
+                and the `stages` holding the `wall_seconds` and `cpu_seconds` of each stage.
+
+        """
+        return {
+            "wall_seconds": round(self.total_wall_seconds, 6),
+            "cpu_seconds": round(sum(self.cpu_seconds.values()), 6),
+            "stages": {
+                name: {
+                    "wall_seconds": round(self.wall_seconds[name], 6),
+                    "cpu_seconds": round(self.cpu_seconds[name], 6),
+                }
+                for name in self.wall_seconds
+            },
+        }
+
+
+_current_stage_timer: contextvars.ContextVar[Optional[StageTimer]] = contextvars.ContextVar(
+    "stage_timer", default=None
+)
+
+
+@contextlib.contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Counts the time spent within the context towards the stage of the scrape being profiled.
+
+    Args:
+        name: The name of the stage, e.g. "parse".
+
+    Returns:
+        None
+
+    """
+    timer = _current_stage_timer.get()
+    if timer is None:
+        yield
+        return
+
+    with timer.stage(name):
+        yield
+
+
+def iter_stage(iterable: Iterable[T], name: str) -> Iterable[T]:
+    """
+    Counts the time spent producing each item of the `iterable` towards the stage.
+
+    This is used instead of `stage()` for generators which are consumed by a later stage,
+    so that the time spent by the consumer between items is not counted towards this stage.
+
+    Args:
+        iterable: The items to time, e.g. the chunks of a response body.
+        name: The name of the stage, e.g. "fetch".
+
+    Returns:
+        (Iterable) - The `iterable` itself if no scrape is being profiled.
+
+    """
+    timer = _current_stage_timer.get()
+    if timer is None:
+        return iterable
+    return _iter_timed(iter(iterable), name, timer)
+
+
+def _iter_timed(iterator: Iterator[T], name: str, timer: StageTimer) -> Iterator[T]:
+    while True:
+        with timer.stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+@contextlib.contextmanager
+def shared_stage(timers: Iterable[StageTimer], name: str) -> Iterator[None]:
+    """
+    Counts the time spent within the context towards the stage of each of the `timers`.
+
+    This is used for work done once for a batch of pages, e.g. a bulk update,
+    which is counted in full for each page of the batch.
+
+    Args:
+        timers: The timers of the pages the work is done for.
+        name: The name of the stage, e.g. "persist".
+
+    Returns:
+        None
+
+    """
+    wall_started_at, cpu_started_at = time.perf_counter(), time.thread_time()
+    try:
+        yield
+    finally:
+        wall_seconds = time.perf_counter() - wall_started_at
+        cpu_seconds = time.thread_time() - cpu_started_at
+        for timer in timers:
+            timer.add(name, wall_seconds=wall_seconds, cpu_seconds=cpu_seconds)
+
+
+def should_profile(page, sample_rate: float = SCRAPE_PROFILING_SAMPLE_RATE) -> bool:
+    return bool(page.profile) or (sample_rate > 0 and random.random() < sample_rate)
+
+
+def _read_dump_milliseconds(path: str) -> int:
+    return int(os.path.basename(path).split("ms-", 1)[0])
+
+
+def dump_worst_profile(
+    profiler: cProfile.Profile,
+    page_id: int,
+    wall_seconds: float,
+    dump_dir: str = SCRAPE_PROFILING_DUMP_DIR,
+    dump_worst: int = SCRAPE_PROFILING_DUMP_WORST,
+) -> Optional[str]:
+    """
+    Writes the `pstats` dump of the page if it is among the `dump_worst` slowest in `dump_dir`.
+
+    Dumps are named after the zero padded wall time of their scrape, so that sorting their names
+    sorts them by wall time, and they can be compared across processes without any shared state.
+    Dumps which are no longer among the slowest are deleted.
+
+    Args:
+        profiler: The profiler which ran the scrape of the page.
+        page_id: The ID of the `Page` object which was scraped.
+        wall_seconds: The wall time of the scrape.
+        dump_dir: The directory holding the dumps.
+        dump_worst: The number of dumps to keep.
+
+    Returns:
+        (str) - The path of the dump, None if the page was not among the slowest.
+
+    """
+    os.makedirs(dump_dir, exist_ok=True)
+    milliseconds = int(wall_seconds * 1000)
+
+    dumps = sorted(glob.glob(os.path.join(dump_dir, "*.pstats")), reverse=True)
+    if len(dumps) >= dump_worst and _read_dump_milliseconds(dumps[dump_worst - 1]) >= milliseconds:
+        return None
+
+    path = os.path.join(dump_dir, f"{milliseconds:010d}ms-page-{page_id}.pstats")
+    # The dump is written under another name first, so that it is never read half written.
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    profiler.dump_stats(temporary_path)
+    os.replace(temporary_path, path)
+
+    for stale_dump in sorted(glob.glob(os.path.join(dump_dir, "*.pstats")), reverse=True)[
+        dump_worst:
+    ]:
+        # Another process may have deleted the same dump already.
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(stale_dump)
+
+    return path
+
+
+@contextlib.contextmanager
+def profile_scrape(
+    timer: Optional[StageTimer],
+    page_id: int,
+    dump_dir: str = SCRAPE_PROFILING_DUMP_DIR,
+    dump_worst: int = SCRAPE_PROFILING_DUMP_WORST,
+) -> Iterator[None]:
+    """
+    Profiles the scrape of the page run within the context, on the current thread.
+
+    Args:
+        timer: The timer to record the stages of the scrape with.
+            If None, the page is not profiled.
+        page_id: The ID of the `Page` object being scraped.
+        dump_dir: The directory to keep the `pstats` dumps of the slowest pages in.
+            If empty, the scrape is not run under `cProfile`.
+        dump_worst: The number of dumps to keep.
+
+    Returns:
+        None
+
+    """
+    if timer is None:
+        yield
+        return
+
+    profiler = cProfile.Profile() if dump_dir else None
+    token = _current_stage_timer.set(timer)
+    timer.start()
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        timer.stop()
+        _current_stage_timer.reset(token)
+
+        if profiler is not None:
+            try:
+                dump_worst_profile(
+                    profiler,
+                    page_id=page_id,
+                    wall_seconds=timer.total_wall_seconds,
+                    dump_dir=dump_dir,
+                    dump_worst=dump_worst,
+                )
+            except OSError:
+                logger.warning("Could not write the profile of page %s", page_id, exc_info=True)
@@ -1,10 +1,36 @@
 """
 This module contains functionality for scraping text from web pages
+
+The following metrics are registered with the default `prometheus_client` registry:
+    - `nate_counted_words_total`: Words counted after the text filters have been applied.
+    - `nate_count_words_per_second`: The rate at which the words of each page were
+        filtered and counted. This also covers parsing for the `streaming` parser,
+        which parses as the words are counted.
+
+When a scrape is profiled, parsing is counted as its "parse" stage
+and the filtering and counting of the words as its "filter_and_count" stage,
+which likewise covers parsing for the `streaming` parser, see `profiling`.
 """
 import collections
-from typing import Callable, Dict, Iterator, List, Optional
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from prometheus_client import Counter, Histogram
+
+from core.pages import counting, parsers, profiling, string_utils
+from core.pages.blob_store import BlobStore, get_blob_store
 
-from core.pages import beautiful_soup_crawler, string_utils
+COUNTED_WORDS = Counter(
+    "nate_counted_words_total",
+    "Words counted after the text filters have been applied",
+    ["parser"],
+)
+COUNT_WORDS_PER_SECOND = Histogram(
+    "nate_count_words_per_second",
+    "Rate at which the words of a page were filtered and counted",
+    ["parser"],
+    buckets=(1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 2.5e7),
+)
 
 
 def get_page_text_statistics(
@@ -16,7 +42,8 @@ def get_page_text_statistics(
     Scrapes visible text elements from the `target_url` and returns a `Counter`.
 
     The `text_scraper` arg can be used to customize how text is scraped from the `target_url`.
-    Defaults to `fetch_text_from_page()` which leverages `BeautifulSoup`.
+    Defaults to `parsers.scrape_text_from_target_url()`
+    which uses the fastest installed parser backend.
     The interface to this would be the following:
 
         Given the `target_url`
@@ -27,6 +54,8 @@ def get_page_text_statistics(
     The default is 1 filter for removing strings which contain numbers.
     Note that if no text filtering is required
     then pass an empty list to the `text_filters` arg.
+    The filters are composed by `compile_text_filters()`,
+    see `string_utils.build_token_filter()` for writing filters which run without a Python loop.
 
     Args:
         target_url: The URL to scrape text from.
@@ -38,17 +67,164 @@ def get_page_text_statistics(
 
     """
     if not text_scraper:
-        text_scraper = beautiful_soup_crawler.scrape_text_from_target_url
+        text_scraper = parsers.scrape_text_from_target_url
 
-    text_from_page = text_scraper(target_url)
+    with profiling.stage("parse"):
+        text_from_page = text_scraper(target_url)
 
     if text_filters is None:
-        text_filters = [string_utils.filter_out_text_with_digits]
+        apply_text_filters = DEFAULT_TEXT_FILTERS
+    else:
+        apply_text_filters = compile_text_filters(text_filters)
+
+    with profiling.stage("filter_and_count"):
+        return count_word_frequencies(apply_text_filters(text_from_page))
+
+
+def compile_text_filters(
+    text_filters: List[Callable],
+) -> Callable[[Iterable[str]], Iterator[str]]:
+    """
+    Composes the `text_filters` into a single callable, applying them in their given order.
+
+    Args:
+        text_filters: A list of callables which can be used to filter the output text.
+
+    Returns:
+        (Callable) - Takes an iterable of text and returns the filtered iterator.
+
+    """
+
+    def apply_text_filters(text_items: Iterable[str]) -> Iterator[str]:
+        for text_filter in text_filters:
+            text_items = text_filter(text_items)
+        return text_items
+
+    return apply_text_filters
+
+
+DEFAULT_TEXT_FILTERS = compile_text_filters([string_utils.filter_out_text_with_digits])
+
+
+def get_html_text_statistics(
+    html: bytes, parser: Optional[str] = None, max_vocabulary: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Parses already fetched `html` and returns a `Counter` of its visible text.
+
+    This is a module level function so that it can be sent to a process pool.
+
+    Args:
+        html: The raw html of the page.
+        parser: The name of the parser to use.
+        max_vocabulary: The maximum number of distinct words to hold whilst counting.
+
+    Returns:
+        (Counter) - Keys are the items and values are the aggregated frequencies.
+
+    """
+    return get_html_chunks_text_statistics([html], parser=parser, max_vocabulary=max_vocabulary)
 
-    for text_filter in text_filters:
-        text_from_page = text_filter(text_from_page)
 
-    return count_word_frequencies(text_from_page)
+def get_html_chunks_text_statistics(
+    html_chunks: Iterable[bytes],
+    parser: Optional[str] = None,
+    max_vocabulary: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Parses the `html_chunks` with the default text filters and returns a `Counter`.
+
+    If the parser can hand over whole blocks of text,
+    they are counted in batches by `counting.count_words_in_text_blocks()`.
+    Otherwise words are counted 1 at a time as the parser finds them.
+
+    If a `max_vocabulary` is given, words are instead counted in batches
+    by `counting.count_word_batches_with_space_saving()`,
+    so that memory stays bounded however many distinct words the page holds.
+
+    Args:
+        html_chunks: An iterable of html byte chunks, e.g. as read from a socket.
+        parser: The name of the parser to use.
+        max_vocabulary: The maximum number of distinct words to hold whilst counting.
+
+    Returns:
+        (Counter) - Keys are the items and values are the aggregated frequencies.
+
+    """
+    parser = parsers.select_parser(parser)
+    text_block_parser = parsers.get_text_block_parser(parser)
+
+    # The `BeautifulSoup` parsers parse the whole page as they are called,
+    # so only the filtering and counting of their text is timed.
+    with profiling.stage("parse"):
+        if text_block_parser is None:
+            text = parsers.get_parser(parser)(html_chunks)
+        else:
+            text = text_block_parser(html_chunks)
+
+    started_at = time.perf_counter()
+    with profiling.stage("filter_and_count"):
+        results = _count_text(
+            text, is_text_blocks=text_block_parser is not None, max_vocabulary=max_vocabulary
+        )
+    _record_counting(parser, results, seconds=time.perf_counter() - started_at)
+    return results
+
+
+def _count_text(
+    text: Iterable[str], is_text_blocks: bool, max_vocabulary: Optional[int]
+) -> Dict[str, int]:
+    if max_vocabulary is not None:
+        if not is_text_blocks:
+            word_batches = counting.iter_word_batches(DEFAULT_TEXT_FILTERS(text))
+        else:
+            text_batches = counting.iter_text_batches(text)
+            word_batches = (DEFAULT_TEXT_FILTERS(text_batch.split()) for text_batch in text_batches)
+        return counting.count_word_batches_with_space_saving(word_batches, max_vocabulary)
+
+    if not is_text_blocks:
+        return count_word_frequencies(DEFAULT_TEXT_FILTERS(text))
+
+    return counting.count_words_in_text_blocks(text, apply_text_filters=DEFAULT_TEXT_FILTERS)
+
+
+def _record_counting(parser: str, results: Dict[str, int], seconds: float) -> None:
+    words = sum(results.values())
+    COUNTED_WORDS.labels(parser).inc(words)
+    if seconds > 0:
+        COUNT_WORDS_PER_SECOND.labels(parser).observe(words / seconds)
+
+
+def get_blob_text_statistics(
+    blob_key: str,
+    parser: Optional[str] = None,
+    blob_store: Optional[BlobStore] = None,
+    max_vocabulary: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Parses html held in the `blob_store` and returns a `Counter` of its visible text.
+
+    The blob is decompressed in chunks which are fed to the parser as they are read.
+    This is a module level function so that it can be sent to a process pool,
+    in which case the `blob_store` must be left as the default.
+
+    Args:
+        blob_key: The key of the stored html.
+        parser: The name of the parser to use.
+        blob_store: The store to read the html from. Defaults to `get_blob_store()`.
+        max_vocabulary: The maximum number of distinct words to hold whilst counting.
+
+    Raises:
+        BlobNotFoundError: If no html is stored under the `blob_key`.
+
+    Returns:
+        (Counter) - Keys are the items and values are the aggregated frequencies.
+
+    """
+    blob_store = blob_store or get_blob_store()
+    return get_html_chunks_text_statistics(
+        blob_store.iter_chunks(blob_key), parser=parser, max_vocabulary=max_vocabulary
+    )
 
 
 def count_word_frequencies(words: Iterator[str]) -> Dict[str, int]:
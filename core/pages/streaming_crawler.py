@@ -0,0 +1,389 @@
+"""
+This module holds the functionality for crawling pages with a streaming `HTMLParser`.
+
+Unlike `beautiful_soup_crawler`, no document tree is built.
+The html is tokenized incrementally and visible words are yielded as they are found,
+so memory is bounded by the size of the current text node rather than the whole page.
+"""
+import codecs
+import html.parser
+import re
+from html.entities import html5
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Union
+
+from core.pages import fetcher
+from core.pages.beautiful_soup_crawler import INVISIBLE_TAGS
+
+DEFAULT_CHUNK_SIZE: int = 64 * 1024
+
+DEFAULT_ENCODING: str = "utf-8"
+
+ROOT_TAG_NAME: str = "[document]"
+
+# Tags which `BeautifulSoup` closes as soon as they are opened.
+VOID_ELEMENTS: FrozenSet[str] = frozenset(
+    [
+        "area",
+        "base",
+        "basefont",
+        "bgsound",
+        "br",
+        "col",
+        "command",
+        "embed",
+        "frame",
+        "hr",
+        "image",
+        "img",
+        "input",
+        "isindex",
+        "keygen",
+        "link",
+        "menuitem",
+        "meta",
+        "nextid",
+        "param",
+        "source",
+        "spacer",
+        "track",
+        "wbr",
+    ]
+)
+
+REGEX_MATCH_FOR_META_CHARSET = re.compile(
+    rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_:.-]+)""", re.IGNORECASE
+)
+
+
+def _build_entity_lookup() -> Dict[str, str]:
+    entity_lookup = {}
+    for name_with_semicolon, character in sorted(html5.items()):
+        entity_lookup.setdefault(name_with_semicolon.rstrip(";"), character)
+    return entity_lookup
+
+
+ENTITY_TO_CHARACTER: Dict[str, str] = _build_entity_lookup()
+
+
+class VisibleTextParser(html.parser.HTMLParser):
+    """
+    An `HTMLParser` which collects visible words without building a document tree.
+
+    Only the names of the currently open tags are held,
+    which mirrors the rules `BeautifulSoup` applies with the "html.parser" features.
+    This means text is considered invisible if its direct parent tag
+    is one of the `invalid_tag_types`, exactly as `is_tag_valid()` would decide.
+
+    Words are buffered on the parser until they are drained with `pop_words()`.
+    If `text_blocks` is set, the visible text nodes are buffered whole instead,
+    so that they can be split and counted in batches, see `core.pages.counting`.
+    """
+
+    def __init__(
+        self,
+        invalid_tag_types: Optional[List[str]] = None,
+        encoding: Optional[str] = None,
+        text_blocks: bool = False,
+    ):
+        super().__init__(convert_charrefs=False)
+        if invalid_tag_types is None:
+            invalid_tag_types = INVISIBLE_TAGS
+
+        self.invalid_tag_types: FrozenSet[str] = frozenset(invalid_tag_types)
+        self.encoding = encoding
+        self.text_blocks = text_blocks
+        self.open_tags: List[str] = []
+        self.open_tag_counter: Dict[str, int] = {}
+        self.already_closed_empty_elements: List[str] = []
+        self.current_data: List[str] = []
+        self.words: List[str] = []
+
+    def pop_words(self) -> List[str]:
+        """
+        Drains the words which have been found since the last call.
+
+        Returns:
+            (list) - Visible words in the order they were found,
+                or visible text nodes if `text_blocks` is set.
+
+        """
+        words, self.words = self.words, []
+        return words
+
+    def close(self) -> None:
+        super().close()
+        self._end_data()
+
+    def _is_parent_valid(self) -> bool:
+        parent_name = self.open_tags[-1] if self.open_tags else ROOT_TAG_NAME
+        return parent_name not in self.invalid_tag_types
+
+    def _end_data(self) -> None:
+        if not self.current_data:
+            return
+
+        text = "".join(self.current_data)
+        self.current_data = []
+        if not self._is_parent_valid():
+            return
+
+        if self.text_blocks:
+            self.words.append(text)
+        else:
+            self.words.extend(text.split())
+
+    def _emit_text_node(self, text: str) -> None:
+        self._end_data()
+        self.current_data.append(text)
+        self._end_data()
+
+    def _push_tag(self, name: str) -> None:
+        self.open_tags.append(name)
+        self.open_tag_counter[name] = self.open_tag_counter.get(name, 0) + 1
+
+    def _pop_to_tag(self, name: str) -> None:
+        if not self.open_tag_counter.get(name):
+            return
+
+        while self.open_tags:
+            popped_name = self.open_tags.pop()
+            self.open_tag_counter[popped_name] -= 1
+            if popped_name == name:
+                return
+
+    def _start_tag(self, name: str, handle_empty_element: bool) -> None:
+        self._end_data()
+        self._push_tag(name)
+
+        if handle_empty_element and name in VOID_ELEMENTS:
+            self._end_tag(name, check_already_closed=False)
+            self.already_closed_empty_elements.append(name)
+
+    def _end_tag(self, name: str, check_already_closed: bool = True) -> None:
+        if check_already_closed and name in self.already_closed_empty_elements:
+            self.already_closed_empty_elements.remove(name)
+            return
+
+        self._end_data()
+        self._pop_to_tag(name)
+
+    def handle_starttag(self, tag, attrs):
+        self._start_tag(tag, handle_empty_element=True)
+
+    def handle_startendtag(self, tag, attrs):
+        self._start_tag(tag, handle_empty_element=False)
+        self._end_tag(tag)
+
+    def handle_endtag(self, tag):
+        self._end_tag(tag)
+
+    def handle_data(self, data):
+        self.current_data.append(data)
+
+    def handle_charref(self, name):
+        if name.startswith(("x", "X")):
+            code_point = int(name[1:], 16)
+        else:
+            code_point = int(name)
+
+        data = None
+        if code_point < 256:
+            for encoding in (self.encoding, "windows-1252"):
+                if not encoding:
+                    continue
+                try:
+                    data = bytearray([code_point]).decode(encoding)
+                except UnicodeDecodeError:
+                    pass
+
+        if not data:
+            try:
+                data = chr(code_point)
+            except (ValueError, OverflowError):
+                pass
+
+        self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name):
+        self.handle_data(ENTITY_TO_CHARACTER.get(name, f"&{name}"))
+
+    def handle_comment(self, data):
+        self._end_data()
+
+    def handle_decl(self, decl):
+        self._emit_text_node(decl[len("DOCTYPE "):])
+
+    def unknown_decl(self, data):
+        if data.upper().startswith("CDATA["):
+            data = data[len("CDATA["):]
+        self._emit_text_node(data)
+
+    def handle_pi(self, data):
+        self._emit_text_node(data)
+
+
+def detect_encoding(html_head: bytes, default: str = DEFAULT_ENCODING) -> str:
+    """
+    Detects the encoding of a html document from its first bytes.
+
+    A byte order mark takes precedence over a `<meta charset>` declaration.
+    If neither can be found or the declared encoding is unknown,
+    the `default` is returned.
+
+    Args:
+        html_head: The first bytes of the html document.
+        default: The encoding to fall back to.
+
+    Returns:
+        (str) - The name of the encoding.
+
+    """
+    if html_head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+
+    if html_head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+
+    match = REGEX_MATCH_FOR_META_CHARSET.search(html_head[:1024])
+    if match is None:
+        return default
+
+    declared_encoding = match.group(1).decode("ascii")
+    try:
+        return codecs.lookup(declared_encoding).name
+    except LookupError:
+        return default
+
+
+def iter_visible_words(
+    html_chunks: Iterable[Union[bytes, str]],
+    invalid_tag_types: Optional[List[str]] = None,
+    encoding: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Incrementally parses the `html_chunks` and yields visible words as they are found.
+
+    Byte chunks are decoded with an incremental decoder,
+    so multi-byte characters may be split across chunk boundaries.
+    If no `encoding` is given it is detected from the first chunk.
+
+    Args:
+        html_chunks: An iterable of html fragments, e.g. as read from a socket.
+        invalid_tag_types: A list of tag types whose direct text is invisible.
+            Defaults to `INVISIBLE_TAGS`.
+        encoding: The encoding of byte chunks.
+
+    Returns:
+        (Generator) - Strings of words which are visible on the page.
+
+    """
+    parser = VisibleTextParser(invalid_tag_types=invalid_tag_types, encoding=encoding)
+    return _iter_parsed_text(html_chunks, parser)
+
+
+def iter_visible_text_blocks(
+    html_chunks: Iterable[Union[bytes, str]],
+    invalid_tag_types: Optional[List[str]] = None,
+    encoding: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Incrementally parses the `html_chunks` and yields visible text nodes as they are found.
+
+    This finds the same words as `iter_visible_words()`,
+    but leaves each text node whole, so that the words can be split in batches.
+
+    Args:
+        html_chunks: An iterable of html fragments, e.g. as read from a socket.
+        invalid_tag_types: A list of tag types whose direct text is invisible.
+            Defaults to `INVISIBLE_TAGS`.
+        encoding: The encoding of byte chunks.
+
+    Returns:
+        (Generator) - Strings holding 0 or more whitespace separated visible words.
+
+    """
+    parser = VisibleTextParser(
+        invalid_tag_types=invalid_tag_types, encoding=encoding, text_blocks=True
+    )
+    return _iter_parsed_text(html_chunks, parser)
+
+
+def _iter_parsed_text(
+    html_chunks: Iterable[Union[bytes, str]], parser: VisibleTextParser
+) -> Iterator[str]:
+    decoder = None
+
+    for chunk in html_chunks:
+        if isinstance(chunk, bytes):
+            if decoder is None:
+                if parser.encoding is None:
+                    parser.encoding = detect_encoding(chunk)
+                decoder = codecs.getincrementaldecoder(parser.encoding)(errors="replace")
+            chunk = decoder.decode(chunk)
+
+        parser.feed(chunk)
+        yield from parser.pop_words()
+
+    if decoder is not None:
+        parser.feed(decoder.decode(b"", final=True))
+
+    parser.close()
+    yield from parser.pop_words()
+
+
+def iter_chunks(
+    html: Union[bytes, str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Union[bytes, str]]:
+    """
+    Slices the `html` into chunks of at most `chunk_size`.
+
+    Args:
+        html: The html doctype bytes object.
+        chunk_size: The maximum size of each chunk.
+
+    Returns:
+        (Generator) - Consecutive slices of the `html`.
+
+    """
+    return (
+        html[offset: offset + chunk_size] for offset in range(0, len(html), chunk_size)
+    )
+
+
+def find_visible_words_in_html(
+    html: Union[bytes, str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Gets all visible words within the given `html`.
+
+    The `html` is fed to the parser in slices of `chunk_size`
+    so that words can be consumed before the whole document has been tokenized.
+
+    Args:
+        html: The html doctype bytes object.
+        chunk_size: The size of each slice fed to the parser.
+
+    Returns:
+        (Generator) - Strings of words which are visible on the page.
+
+    """
+    return iter_visible_words(iter_chunks(html, chunk_size=chunk_size))
+
+
+def scrape_text_from_target_url(target_url: str) -> Iterator[str]:
+    """
+    Scrapes visible text from the given `target_url` without building a document tree.
+
+    This is a drop-in replacement for `beautiful_soup_crawler.scrape_text_from_target_url()`.
+    Chunks are parsed as they are read from the socket,
+    so the whole page is never held in memory.
+
+    Args:
+        target_url: The URL to scrape text from.
+
+    Returns:
+        (Generator) - Strings which are visible on the page.
+
+    """
+    html_chunks = fetcher.iter_url_chunks(target_url)
+    return iter_visible_words(html_chunks)
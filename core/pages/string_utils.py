@@ -1,24 +1,42 @@
 """
 This module contains utilities for working with strings
 """
+import itertools
 import re
-from typing import Iterator, Optional
+from typing import Any, Callable, Iterator, Optional
 
-REGEX_MATCH_FOR_DIGITS: str = "\d"
+REGEX_MATCH_FOR_DIGITS: str = r"\d"
 
+DIGITS_PATTERN: re.Pattern = re.compile(REGEX_MATCH_FOR_DIGITS)
 
-def filter_out_text_with_digits(text_items: Iterator[str]) -> Iterator[str]:
+TextFilter = Callable[[Iterator[str]], Iterator[str]]
+
+
+def build_token_filter(rejects: Callable[[str], Any]) -> TextFilter:
     """
-    Builds a generator object and filters out text containing digits.
+    Builds a text filter which drops each string for which `rejects` returns a truthy value.
+
+    The strings are dropped by `itertools.filterfalse()`, so the filter loops in C
+    rather than in a Python level generator.
+    Passing a builtin or a bound method of a compiled pattern is therefore the fastest option,
+    since `rejects` is then also called without entering Python code.
 
     Args:
-        text_items: Generator of strings to be filtered.
+        rejects: Callable which is given each string and decides if it should be dropped.
 
     Returns:
-        (Generator) - Strings which do not contain digits.
+        (Callable) - Text filter taking and returning an iterable of strings.
 
     """
-    return (text_item for text_item in text_items if not contains_numbers(text_item))
+
+    def token_filter(text_items: Iterator[str]) -> Iterator[str]:
+        return itertools.filterfalse(rejects, text_items)
+
+    return token_filter
+
+
+# Builds an iterator which filters out text containing digits.
+filter_out_text_with_digits: TextFilter = build_token_filter(DIGITS_PATTERN.search)
 
 
 def contains_numbers(text: str) -> Optional[re.Match]:
@@ -36,4 +54,4 @@ def contains_numbers(text: str) -> Optional[re.Match]:
         (re.Match) - If a match is found, None otherwise.
 
     """
-    return re.search(REGEX_MATCH_FOR_DIGITS, text)
+    return DIGITS_PATTERN.search(text)
@@ -0,0 +1,37 @@
+"""
+This module holds the asynchronous counterpart to `db.session`.
+
+It is used by the FastAPI handlers, so that waiting on the database
+does not block the event loop which is serving every other request.
+Synchronous callers, e.g. the Celery tasks, keep using `db.session`.
+
+Both connect to the same database as `DATABASE_URL`,
+with the asynchronous engine using the `asyncpg` driver.
+The pool of the asynchronous engine is configured from the same environment variables.
+"""
+import os
+from typing import AsyncIterator
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.pool import InstrumentedAsyncAdaptedQueuePool
+from db.session import DATABASE_URL, POOL_OPTIONS
+
+ASYNC_DATABASE_URL: str = os.getenv(
+    "ASYNC_DATABASE_URL",
+    str(make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")),
+)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncAdaptedQueuePool, **POOL_OPTIONS
+)
+AsyncSessionLocal = sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+async def yield_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
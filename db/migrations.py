@@ -0,0 +1,69 @@
+"""
+This module holds the migration of tables created by earlier releases to the current schema.
+
+`Base.metadata.create_all()` only creates the tables which are missing,
+so the columns and indexes added to a table which already exists,
+e.g. the `page` table held within the `postgres_data` volume of `docker-compose.yml`,
+are added by the statements here instead.
+Each statement does nothing if it has already been applied,
+so the migration is run every time the API starts.
+"""
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# Held whilst migrating, so that API processes starting together do not alter the tables at once.
+MIGRATION_LOCK_ID = 7_461_820
+
+PAGE_TABLE_MIGRATION: List[str] = [
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS parser VARCHAR",
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS has_word_counts BOOLEAN NOT NULL DEFAULT false",
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS html_blob_key VARCHAR(64)",
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS top_k INTEGER",
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS min_count INTEGER",
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS max_vocabulary INTEGER",
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS callback_url VARCHAR",
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS profile BOOLEAN NOT NULL DEFAULT false",
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS results_by_frequency BYTEA",
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS results_by_alphabetical BYTEA",
+    "ALTER TABLE page ADD COLUMN IF NOT EXISTS timings JSON",
+    "CREATE INDEX IF NOT EXISTS ix_page_created_at_id ON page (created_at, id)",
+    # Results were stored as `json` before they were compressed, see `db.types.CompressedJSON`.
+    # The JSON is kept as it is, uncompressed, which `CompressedJSON` still reads.
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'page'
+                AND column_name = 'results' AND data_type = 'json'
+        ) THEN
+            ALTER TABLE page
+                ALTER COLUMN results TYPE BYTEA USING convert_to(results::text, 'UTF8');
+        END IF;
+    END $$
+    """,
+]
+
+
+def migrate(bind: Engine) -> None:
+    """
+    Brings the tables created by earlier releases up to the current schema.
+
+    The statements are run within 1 transaction, so a migration which fails leaves no trace.
+    This must be run after `Base.metadata.create_all()`, which creates the tables themselves.
+
+    Args:
+        bind: The engine of the database to migrate.
+
+    Returns:
+        None
+
+    """
+    with bind.begin() as connection:
+        connection.execute(
+            text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID}
+        )
+        for statement in PAGE_TABLE_MIGRATION:
+            connection.execute(text(statement))
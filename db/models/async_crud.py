@@ -0,0 +1,75 @@
+import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from db.models.crud import (
+    PageNotFoundError,
+    build_ordered_results_options,
+    build_page_word_counts_statement,
+    build_pages_statement,
+)
+from db.models.page import Page
+
+
+async def get_page_by_id(
+    page_id: int, db: AsyncSession, ordering: Optional[str] = None, include_timings: bool = False
+) -> Page:
+    options = build_ordered_results_options(ordering)
+    if include_timings:
+        options.append(undefer(Page.timings))
+
+    page = await db.get(Page, page_id, options=options)
+
+    if page is None:
+        raise PageNotFoundError
+
+    return page
+
+
+async def get_page_status(page_id: int, db: AsyncSession) -> Optional[str]:
+    result = await db.execute(select(Page.status).filter(Page.id == page_id))
+    row = result.one_or_none()
+
+    if row is None:
+        raise PageNotFoundError
+
+    return row.status
+
+
+async def get_pages(
+    limit: int,
+    db: AsyncSession,
+    after: Optional[Tuple[datetime.datetime, int]] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime.datetime] = None,
+    created_before: Optional[datetime.datetime] = None,
+    include_results: bool = False,
+) -> List[Page]:
+    statement = build_pages_statement(
+        limit=limit,
+        after=after,
+        status=status,
+        created_after=created_after,
+        created_before=created_before,
+        include_results=include_results,
+    )
+    result = await db.execute(statement)
+    return result.scalars().all()
+
+
+async def get_page_word_counts(
+    page_id: int,
+    ordering: str,
+    limit: int,
+    db: AsyncSession,
+    offset: int = 0,
+    after: Optional[Dict] = None,
+) -> List[Tuple[str, int]]:
+    statement = build_page_word_counts_statement(
+        page_id=page_id, ordering=ordering, limit=limit, offset=offset, after=after
+    )
+    result = await db.execute(statement)
+    return result.all()
@@ -1,16 +1,20 @@
+import csv
+import datetime
+import io
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
-from typing import Optional, List
-
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, insert, or_, select, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session, defer, undefer
+from sqlalchemy.sql import Select
 
 from db.models.page import Page
-from db.session import yield_db
+from db.models.page_word_count import PageWordCount
+from db.session import provide_session
 
 
+@provide_session
 def get_page_by_id(page_id: int, db: Optional[Session] = None) -> Page:
-    if db is None:
-        db = yield_db()
-
     page = db.query(Page).get(page_id)
 
     if page is None:
@@ -19,11 +23,265 @@ def get_page_by_id(page_id: int, db: Optional[Session] = None) -> Page:
     return page
 
 
-def get_pages(db: Optional[Session] = None) -> List[Page]:
-    if db is None:
-        db = yield_db()
+def build_ordered_results_options(ordering: Optional[str] = None) -> List:
+    """
+    Builds the loader options which read the stored ordering of the results along with the page.
+
+    The stored orderings are deferred, so only the one which is to be returned is read.
+    This must be used to read an ordering with an asynchronous session,
+    which cannot load a deferred column when it is accessed.
+
+    Args:
+        ordering: One of "unordered", "frequency" or "alphabetical".
+
+    Returns:
+        (list) - The options to load the page with.
+
+    """
+    ordered_results_columns = {
+        "frequency": Page.results_by_frequency,
+        "alphabetical": Page.results_by_alphabetical,
+    }
+    ordered_results_column = ordered_results_columns.get((ordering or "").lower())
+    if ordered_results_column is None:
+        return []
+    return [undefer(ordered_results_column)]
+
+
+@provide_session
+def get_pages_by_ids(page_ids: List[int], db: Optional[Session] = None) -> List[Page]:
+    return db.execute(select(Page).filter(Page.id.in_(page_ids))).scalars().all()
+
+
+@provide_session
+def get_page_blob_keys(page_ids: List[int], db: Optional[Session] = None) -> List[Row]:
+    """
+    Gets the blob keys of the pages whose html has been stored.
+
+    Only the columns needed to reprocess the pages are loaded,
+    so that their results are not read from the database only to be replaced.
+
+    Args:
+        page_ids: The IDs of the `Page` objects to look up.
+        db: The session to query with.
+
+    Returns:
+        (list) - Rows of `id`, `parser`, `html_blob_key` and the result options of each page,
+            pages without a stored blob are left out.
+
+    """
+    statement = select(
+        Page.id,
+        Page.parser,
+        Page.html_blob_key,
+        Page.top_k,
+        Page.min_count,
+        Page.max_vocabulary,
+    ).filter(Page.id.in_(page_ids), Page.html_blob_key.isnot(None))
+    return db.execute(statement).all()
+
+
+@provide_session
+def get_page_callbacks(page_ids: List[int], db: Optional[Session] = None) -> List[Row]:
+    """
+    Gets the pages to be posted to their `callback_url`.
+
+    Args:
+        page_ids: The IDs of the `Page` objects to look up.
+        db: The session to query with.
+
+    Returns:
+        (list) - Rows of `id`, `target_url`, `status`, `created_at`, `results`
+            and `callback_url` of each page, pages without a `callback_url` are left out.
+
+    """
+    statement = select(
+        Page.id,
+        Page.target_url,
+        Page.status,
+        Page.created_at,
+        Page.results,
+        Page.callback_url,
+    ).filter(Page.id.in_(page_ids), Page.callback_url.isnot(None))
+    return db.execute(statement).all()
+
+
+@provide_session
+def get_page_ids_with_blobs(
+    limit: int, after: int = 0, db: Optional[Session] = None
+) -> List[int]:
+    """
+    Gets the IDs of the pages whose html has been stored, in ascending order.
+
+    Args:
+        limit: The maximum number of IDs to return.
+        after: Only IDs greater than this are returned,
+            pass the last ID of the previous call to get the next batch.
+        db: The session to query with.
+
+    Returns:
+        (list) - The page IDs.
+
+    """
+    statement = (
+        select(Page.id)
+        .filter(Page.id > after, Page.html_blob_key.isnot(None))
+        .order_by(Page.id)
+        .limit(limit)
+    )
+    return db.execute(statement).scalars().all()
+
+
+@provide_session
+def get_pages(
+    limit: int,
+    after: Optional[Tuple[datetime.datetime, int]] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime.datetime] = None,
+    created_before: Optional[datetime.datetime] = None,
+    include_results: bool = False,
+    db: Optional[Session] = None,
+) -> List[Page]:
+    statement = build_pages_statement(
+        limit=limit,
+        after=after,
+        status=status,
+        created_after=created_after,
+        created_before=created_before,
+        include_results=include_results,
+    )
+    return db.execute(statement).scalars().all()
+
+
+def build_pages_statement(
+    limit: int,
+    after: Optional[Tuple[datetime.datetime, int]] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime.datetime] = None,
+    created_before: Optional[datetime.datetime] = None,
+    include_results: bool = False,
+) -> Select:
+    statement = select(Page)
+
+    if not include_results:
+        statement = statement.options(defer(Page.results))
+
+    if after is not None:
+        statement = statement.filter(tuple_(Page.created_at, Page.id) < after)
+
+    statement = _filter_pages(
+        statement, status=status, created_after=created_after, created_before=created_before
+    )
+
+    return statement.order_by(Page.created_at.desc(), Page.id.desc()).limit(limit)
+
+
+def iter_pages_for_export(
+    db: Session,
+    status: Optional[str] = None,
+    created_after: Optional[datetime.datetime] = None,
+    created_before: Optional[datetime.datetime] = None,
+    batch_size: int = 1000,
+) -> Iterator[Row]:
+    query = db.query(Page.id, Page.target_url, Page.status, Page.created_at, Page.results)
+    query = _filter_pages(
+        query, status=status, created_after=created_after, created_before=created_before
+    )
+
+    return (
+        query.order_by(Page.created_at, Page.id)
+        .execution_options(stream_results=True)
+        .yield_per(batch_size)
+    )
+
+
+def _filter_pages(
+    query: Union[Query, Select],
+    status: Optional[str] = None,
+    created_after: Optional[datetime.datetime] = None,
+    created_before: Optional[datetime.datetime] = None,
+) -> Union[Query, Select]:
+    if status is not None:
+        query = query.filter(Page.status == status)
+
+    if created_after is not None:
+        query = query.filter(Page.created_at >= created_after)
+
+    if created_before is not None:
+        query = query.filter(Page.created_at < created_before)
+
+    return query
+
+
+@provide_session
+def replace_page_word_counts(
+    page_id: int, results: Dict[str, int], db: Optional[Session] = None
+) -> None:
+    db.execute(delete(PageWordCount).where(PageWordCount.page_id == page_id))
+
+    connection = db.connection()
+    if connection.dialect.driver != "psycopg2":
+        rows = [{"page_id": page_id, "word": word, "count": count} for word, count in results.items()]
+        if rows:
+            db.execute(insert(PageWordCount), rows)
+        return
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows((page_id, word, count) for word, count in results.items())
+    buffer.seek(0)
+
+    with connection.connection.cursor() as cursor:
+        cursor.copy_expert(
+            "COPY page_word_count (page_id, word, count) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+@provide_session
+def get_page_word_counts(
+    page_id: int,
+    ordering: str,
+    limit: int,
+    offset: int = 0,
+    after: Optional[Dict] = None,
+    db: Optional[Session] = None,
+) -> List[Tuple[str, int]]:
+    statement = build_page_word_counts_statement(
+        page_id=page_id, ordering=ordering, limit=limit, offset=offset, after=after
+    )
+    return db.execute(statement).all()
+
+
+def build_page_word_counts_statement(
+    page_id: int,
+    ordering: str,
+    limit: int,
+    offset: int = 0,
+    after: Optional[Dict] = None,
+) -> Select:
+    statement = select(PageWordCount.word, PageWordCount.count).filter(
+        PageWordCount.page_id == page_id
+    )
+
+    if ordering == "frequency":
+        if after is not None:
+            statement = statement.filter(
+                or_(
+                    PageWordCount.count < after["count"],
+                    and_(
+                        PageWordCount.count == after["count"],
+                        PageWordCount.word > after["word"],
+                    ),
+                )
+            )
+        statement = statement.order_by(PageWordCount.count.desc(), PageWordCount.word)
+    else:
+        if after is not None:
+            statement = statement.filter(PageWordCount.word > after["word"])
+        statement = statement.order_by(PageWordCount.word)
 
-    return db.query(Page).all()
+    return statement.offset(offset).limit(limit)
 
 
 class PageNotFoundError(Exception):
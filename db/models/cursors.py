@@ -0,0 +1,50 @@
+"""
+This module holds functionality for encoding opaque pagination cursors
+"""
+import base64
+import binascii
+import json
+from typing import Dict
+
+
+class InvalidCursorError(ValueError):
+    ...
+
+
+def encode_cursor(position: Dict) -> str:
+    """
+    Encodes the `position` of the last returned item into an opaque cursor.
+
+    Args:
+        position: JSON serializable values identifying the last returned item.
+
+    Returns:
+        (str) - A URL safe cursor.
+
+    """
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Dict:
+    """
+    Decodes a cursor created by `encode_cursor()`.
+
+    Args:
+        cursor: The cursor given by the client.
+
+    Raises:
+        InvalidCursorError: If the `cursor` was not created by `encode_cursor()`.
+
+    Returns:
+        (dict) - The position of the last returned item.
+
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError(cursor)
+
+    if not isinstance(position, dict):
+        raise InvalidCursorError(cursor)
+
+    return position
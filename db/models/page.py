@@ -1,10 +1,65 @@
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from sqlalchemy import Column, DateTime, Integer, String, JSON
-from sqlalchemy.orm import Session
+from prometheus_client import Histogram
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    JSON,
+    Integer,
+    String,
+    bindparam,
+    insert,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, deferred
+from sqlalchemy.sql.expression import Update
 from sqlalchemy.sql import func
 
-from db.session import Base, yield_db
+from core.pages.events import publish_page_statuses
+from db.session import Base, provide_session
+from db.types import CompressedJSON
+
+ResultItems = Iterable[Tuple[str, int]]
+
+PAGE_WRITE_SECONDS = Histogram(
+    "nate_page_write_seconds",
+    "Time taken to write and commit the status or results of pages",
+    ["operation"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+
+def order_results_by_frequency(results: Optional[Dict[str, int]]) -> List[Tuple[str, int]]:
+    return sorted((results or {}).items(), key=lambda item: item[1], reverse=True)
+
+
+def order_results_by_alphabetical(results: Optional[Dict[str, int]]) -> List[Tuple[str, int]]:
+    return sorted((results or {}).items(), key=lambda item: item[0])
+
+
+def build_ordered_results(results: Optional[Dict[str, int]]) -> Dict[str, List[Tuple[str, int]]]:
+    """
+    Sorts the `results` into each of the orderings which are stored alongside them.
+
+    Results are never changed once a page is done,
+    so they are sorted once as they are written rather than each time they are read.
+    The orderings are held as lists of `[word, count]` pairs,
+    which keep their order however the JSON is encoded.
+
+    Args:
+        results: Keys are the words and values are their frequencies.
+
+    Returns:
+        (dict) - The `results_by_frequency` and `results_by_alphabetical` of the page.
+
+    """
+    return {
+        "results_by_frequency": order_results_by_frequency(results),
+        "results_by_alphabetical": order_results_by_alphabetical(results),
+    }
 
 
 class Page(Base):
@@ -12,23 +67,60 @@ class Page(Base):
     id = Column(Integer, primary_key=True, index=True)
     target_url = Column(String)
     status = Column(String)
-    results = Column(JSON)
+    results = Column(CompressedJSON)
+    parser = Column(String, nullable=True)
+    has_word_counts = Column(Boolean, nullable=False, default=False)
+    html_blob_key = Column(String(64), nullable=True)
+    top_k = Column(Integer, nullable=True)
+    min_count = Column(Integer, nullable=True)
+    max_vocabulary = Column(Integer, nullable=True)
+    callback_url = Column(String, nullable=True)
+    profile = Column(Boolean, nullable=False, default=False)
+    results_by_frequency = deferred(Column(CompressedJSON, nullable=True))
+    results_by_alphabetical = deferred(Column(CompressedJSON, nullable=True))
+    timings = deferred(Column(JSON, nullable=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (Index("ix_page_created_at_id", created_at, id),)
+
     @classmethod
+    @provide_session
     def create(cls, db: Optional[Session] = None, **kwargs):
         page = cls(**kwargs)
         db.add(page)
         db.commit()
         return page
 
-    def _update_status(self, status: str, db: Optional[Session] = None) -> None:
-        if db is None:
-            db = yield_db()
-
-        self.status = status
-        db.add(self)
+    @classmethod
+    @provide_session
+    def bulk_create(cls, pages: List[Dict], db: Optional[Session] = None) -> List[int]:
+        statement = insert(cls).values(pages).returning(cls.id)
+        page_ids = db.execute(statement).scalars().all()
         db.commit()
+        return page_ids
+
+    @classmethod
+    async def create_async(cls, db: AsyncSession, **kwargs):
+        page = cls(**kwargs)
+        db.add(page)
+        await db.commit()
+        return page
+
+    @classmethod
+    async def bulk_create_async(cls, pages: List[Dict], db: AsyncSession) -> List[int]:
+        statement = insert(cls).values(pages).returning(cls.id)
+        result = await db.execute(statement)
+        page_ids = result.scalars().all()
+        await db.commit()
+        return page_ids
+
+    @provide_session
+    def _update_status(self, status: str, db: Optional[Session] = None) -> None:
+        with PAGE_WRITE_SECONDS.labels("update_status").time():
+            self.status = status
+            db.add(self)
+            db.commit()
+        publish_page_statuses(page_ids=[self.id], status=status)
 
     def update_status_to_started(self, db: Optional[Session] = None) -> None:
         return self._update_status(status="STARTED", db=db)
@@ -39,16 +131,178 @@ class Page(Base):
     def update_status_to_failed(self, db: Optional[Session] = None) -> None:
         return self._update_status(status="FAILED", db=db)
 
-    def get_results_ordered_by_frequency(self) -> Dict[str, int]:
-        try:
-            return dict(
-                sorted(self.results.items(), key=lambda item: item[1], reverse=True)
+    @classmethod
+    @provide_session
+    def update_statuses_by_ids(
+        cls, page_ids: List[int], status: str, db: Optional[Session] = None
+    ) -> None:
+        statement = (
+            update(cls)
+            .where(cls.id.in_(page_ids))
+            .values(status=status)
+            .execution_options(synchronize_session=False)
+        )
+        with PAGE_WRITE_SECONDS.labels("update_statuses").time():
+            db.execute(statement)
+            db.commit()
+        publish_page_statuses(page_ids=page_ids, status=status)
+
+    @classmethod
+    @provide_session
+    def update_results_and_status_to_done(
+        cls,
+        page_id: int,
+        results: Dict[str, int],
+        has_word_counts: bool = False,
+        html_blob_key: Optional[str] = None,
+        db: Optional[Session] = None,
+    ) -> None:
+        statement = (
+            update(cls)
+            .where(cls.id == page_id)
+            .values(
+                status="DONE",
+                results=results,
+                has_word_counts=has_word_counts,
+                html_blob_key=html_blob_key,
+                **build_ordered_results(results),
             )
-        except AttributeError:
-            return {}
+            .execution_options(synchronize_session=False)
+        )
+        with PAGE_WRITE_SECONDS.labels("update_results").time():
+            db.execute(statement)
+            db.commit()
+        publish_page_statuses(page_ids=[page_id], status="DONE")
+
+    @staticmethod
+    def _build_bulk_results_parameters(pages: List[Dict]) -> List[Dict]:
+        return [
+            {
+                "page_id": page["id"],
+                "page_results": page["results"],
+                "page_has_word_counts": page.get("has_word_counts", False),
+                "page_html_blob_key": page.get("html_blob_key"),
+                "page_results_by_frequency": order_results_by_frequency(page["results"]),
+                "page_results_by_alphabetical": order_results_by_alphabetical(page["results"]),
+            }
+            for page in pages
+        ]
+
+    @classmethod
+    def _build_bulk_results_statement(cls, **values) -> Update:
+        return (
+            update(cls)
+            .where(cls.id == bindparam("page_id"))
+            .values(
+                results=bindparam("page_results"),
+                has_word_counts=bindparam("page_has_word_counts"),
+                html_blob_key=bindparam("page_html_blob_key"),
+                results_by_frequency=bindparam("page_results_by_frequency"),
+                results_by_alphabetical=bindparam("page_results_by_alphabetical"),
+                **values,
+            )
+        )
+
+    @classmethod
+    @provide_session
+    def bulk_update_results_and_status_to_done(
+        cls, pages: List[Dict], db: Optional[Session] = None
+    ) -> None:
+        if not pages:
+            return
+
+        statement = cls._build_bulk_results_statement(status="DONE")
+        with PAGE_WRITE_SECONDS.labels("bulk_update_results").time():
+            db.execute(statement, cls._build_bulk_results_parameters(pages))
+            db.commit()
+        publish_page_statuses(page_ids=[page["id"] for page in pages], status="DONE")
+
+    @classmethod
+    @provide_session
+    def bulk_replace_results(cls, pages: List[Dict], db: Optional[Session] = None) -> None:
+        """
+        Writes new results for pages, leaving their statuses as they are.
+
+        No status changes are published, since the statuses of the pages are not written.
+
+        Args:
+            pages: The `id`, `results`, `has_word_counts` and `html_blob_key` of each page.
+            db: The session used to write the results.
+
+        Returns:
+            None
+
+        """
+        if not pages:
+            return
+
+        statement = cls._build_bulk_results_statement()
+        with PAGE_WRITE_SECONDS.labels("bulk_replace_results").time():
+            db.execute(statement, cls._build_bulk_results_parameters(pages))
+            db.commit()
+
+    @classmethod
+    @provide_session
+    def update_timings(cls, timings: Dict[int, Dict], db: Optional[Session] = None) -> None:
+        """
+        Writes the stage timings of profiled pages, see `core.pages.profiling`.
+
+        Args:
+            timings: Keys are the IDs of the `Page` objects and values are their timings.
+            db: The session used to write the timings.
+
+        Returns:
+            None
+
+        """
+        if not timings:
+            return
+
+        statement = (
+            update(cls)
+            .where(cls.id == bindparam("page_id"))
+            .values(timings=bindparam("page_timings"))
+        )
+        with PAGE_WRITE_SECONDS.labels("update_timings").time():
+            db.execute(
+                statement,
+                [
+                    {"page_id": page_id, "page_timings": page_timings}
+                    for page_id, page_timings in timings.items()
+                ],
+            )
+            db.commit()
+
+    def get_result_items(self, ordering: str = "unordered") -> ResultItems:
+        """
+        Gets the `(word, count)` pairs of the results in the given `ordering`.
+
+        The orderings stored when the page was done are used as they are.
+        Pages done before the orderings were stored are sorted instead.
+        Note that the stored orderings are deferred,
+        so they should be undeferred when the page is loaded by an asynchronous session.
+
+        Args:
+            ordering: One of "unordered", "frequency" or "alphabetical".
+
+        Returns:
+            (iterable) - The pairs of words and their frequencies.
+
+        """
+        if ordering == "frequency":
+            if self.results_by_frequency is not None:
+                return self.results_by_frequency
+            return order_results_by_frequency(self.results)
+
+        if ordering == "alphabetical":
+            if self.results_by_alphabetical is not None:
+                return self.results_by_alphabetical
+            return order_results_by_alphabetical(self.results)
+
+        return (self.results or {}).items()
+
+    def get_results_ordered_by_frequency(self) -> Dict[str, int]:
+        return dict(self.get_result_items(ordering="frequency"))
 
     def get_results_ordered_by_alphabetical(self) -> Dict[str, int]:
-        try:
-            return dict(sorted(self.results.items(), key=lambda item: item[0]))
-        except AttributeError:
-            return {}
+        return dict(self.get_result_items(ordering="alphabetical"))
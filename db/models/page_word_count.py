@@ -0,0 +1,16 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+
+from db.session import Base
+
+
+class PageWordCount(Base):
+    __tablename__ = "page_word_count"
+    page_id = Column(
+        Integer, ForeignKey("page.id", ondelete="CASCADE"), primary_key=True
+    )
+    word = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_page_word_count_page_id_count_word", page_id, count.desc(), word),
+    )
@@ -0,0 +1,56 @@
+"""
+This module holds connection pools which record how long callers wait for a connection.
+
+When every connection in the pool is checked out, callers queue for up to `pool_timeout`
+seconds. Time spent queueing shows up as request and task latency,
+so it is recorded to tell an undersized pool apart from slow queries.
+
+The following metrics are registered with the default `prometheus_client` registry:
+    - `nate_db_pool_checkout_wait_seconds`: Time taken to check out a connection.
+    - `nate_db_pool_checkout_timeouts_total`: Checkouts which gave up after `pool_timeout`.
+"""
+import time
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "nate_db_pool_checkout_wait_seconds",
+    "Time taken to check out a connection from the pool",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+POOL_CHECKOUT_TIMEOUTS = Counter(
+    "nate_db_pool_checkout_timeouts_total",
+    "Checkouts which timed out waiting for a connection",
+    ["pool"],
+)
+
+
+class CheckoutWaitMetricsMixin:
+    """
+    Records the time taken by each checkout, labelled with the `metrics_label` of the pool.
+    """
+
+    metrics_label: str = "sync"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.labels(self.metrics_label).inc()
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT_SECONDS.labels(self.metrics_label).observe(
+                time.perf_counter() - start
+            )
+
+
+class InstrumentedQueuePool(CheckoutWaitMetricsMixin, QueuePool):
+    metrics_label = "sync"
+
+
+class InstrumentedAsyncAdaptedQueuePool(CheckoutWaitMetricsMixin, AsyncAdaptedQueuePool):
+    metrics_label = "async"
@@ -1,21 +1,143 @@
+"""
+This module holds the database engine and the lifecycle of sessions bound to it.
+
+The connection pool is configured through the following environment variables:
+    - `DATABASE_POOL_SIZE`: The number of connections kept open.
+    - `DATABASE_MAX_OVERFLOW`: The number of extra connections opened under load.
+    - `DATABASE_POOL_TIMEOUT`: Seconds to wait for a connection before giving up.
+    - `DATABASE_POOL_RECYCLE`: Seconds after which a connection is replaced.
+    - `DATABASE_POOL_PRE_PING`: Whether to test connections as they are checked out.
+
+Each process holds its own pool, so Postgres receives up to
+`DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW` connections per API worker and per Celery process.
+Forked processes must call `dispose_engine()` before using the database,
+so that they never share sockets opened by their parent.
+"""
+import contextlib
+import functools
 import os
-from typing import Iterator, Optional
+from typing import Any, Callable, Dict, Iterator
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 
+from db.pool import InstrumentedQueuePool
+
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://nate:nate@db/nate")
+DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", 5))
+DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", 10))
+DATABASE_POOL_TIMEOUT: float = float(os.getenv("DATABASE_POOL_TIMEOUT", 30))
+DATABASE_POOL_RECYCLE: int = int(os.getenv("DATABASE_POOL_RECYCLE", 30 * 60))
+DATABASE_POOL_PRE_PING: bool = os.getenv("DATABASE_POOL_PRE_PING", "true").lower() == "true"
+
+POOL_OPTIONS: Dict[str, Any] = {
+    "pool_size": DATABASE_POOL_SIZE,
+    "max_overflow": DATABASE_MAX_OVERFLOW,
+    "pool_timeout": DATABASE_POOL_TIMEOUT,
+    "pool_recycle": DATABASE_POOL_RECYCLE,
+    "pool_pre_ping": DATABASE_POOL_PRE_PING,
+}
+
+
+def build_engine(database_url: str = DATABASE_URL) -> Engine:
+    """
+    Builds an engine whose pool is configured from the environment.
+
+    With `psycopg2`, statements executed with many parameter sets,
+    e.g. bulk updates, are sent to the server in pages rather than 1 row at a time.
+
+    Args:
+        database_url: The URL of the database to connect to.
+
+    Returns:
+        (Engine) - The engine, which opens connections lazily.
 
-engine = create_engine(DATABASE_URL)
+    """
+    engine_options = {}
+    if make_url(database_url).get_driver_name() == "psycopg2":
+        engine_options["executemany_mode"] = "values_plus_batch"
+
+    return create_engine(
+        database_url, poolclass=InstrumentedQueuePool, **POOL_OPTIONS, **engine_options
+    )
+
+
+engine = build_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
-def yield_db() -> Iterator[Session]:
-    db = SessionLocal()
+def dispose_engine() -> None:
+    """
+    Discards the connections inherited from a parent process.
+
+    The inherited connections are left open, since they are still in use by the parent,
+    and new connections are opened by this process as they are needed.
+
+    Returns:
+        None
+
+    """
+    engine.dispose(close=False)
+
+
+@contextlib.contextmanager
+def session_scope(**session_options) -> Iterator[Session]:
+    """
+    Provides a session which is always closed, returning its connection to the pool.
+
+    Uncommitted changes are rolled back if an exception is raised within the context.
+
+    Args:
+        session_options: Options which override those of `SessionLocal`.
+
+    Returns:
+        (Session) - The session to use within the context.
+
+    """
+    db = SessionLocal(**session_options)
     try:
         yield db
+    except BaseException:
+        db.rollback()
+        raise
     finally:
         db.close()
+
+
+def provide_session(function: Callable) -> Callable:
+    """
+    Decorates the `function` so that a session is provided if the caller did not pass a `db`.
+
+    The provided session is committed and closed once the `function` returns.
+    Its objects are not expired on commit,
+    so that those returned by the `function` can still be read.
+
+    Args:
+        function: A callable which takes a `db` keyword argument.
+
+    Returns:
+        (Callable) - The decorated `function`.
+
+    """
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if kwargs.get("db") is not None:
+            return function(*args, **kwargs)
+
+        kwargs.pop("db", None)
+        with session_scope(expire_on_commit=False) as db:
+            result = function(*args, db=db, **kwargs)
+            db.commit()
+            return result
+
+    return wrapper
+
+
+def yield_db() -> Iterator[Session]:
+    with session_scope() as db:
+        yield db
@@ -0,0 +1,110 @@
+"""
+This module holds column types for storing large values compactly.
+
+Values of `CompressedJSON` columns are encoded with `orjson`
+and compressed with `zstd` if the `zstandard` package is installed, otherwise with `zlib`.
+The codec can be forced with `RESULTS_COMPRESSION`.
+Each codec is recognised by the magic number at the start of a value,
+so values written with either codec can always be read back.
+
+Columns which still hold `json` written before results were compressed are read as they are,
+and `bytea` holding uncompressed JSON is decoded without decompressing it,
+so existing tables can be converted in place, see the README.
+
+Postgres already compresses large `json` values with `pglz` when it moves them out of line,
+but they are decompressed by the server and sent to the client in full.
+Values compressed by the client are instead sent over the wire as they are stored.
+"""
+import importlib.util
+import os
+import zlib
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+import orjson
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+RESULTS_COMPRESSION: str = os.getenv(
+    "RESULTS_COMPRESSION",
+    "zstd" if importlib.util.find_spec("zstandard") is not None else "zlib",
+)
+RESULTS_COMPRESSION_LEVEL: int = int(os.getenv("RESULTS_COMPRESSION_LEVEL", 3))
+
+ZSTD_MAGIC_NUMBER = b"\x28\xb5\x2f\xfd"
+# The first byte of a stream compressed by `zlib.compress()` with its default window size.
+ZLIB_MAGIC_NUMBER = b"\x78"
+
+
+class JsonCodec(NamedTuple):
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+
+def _build_zstd_codec() -> JsonCodec:
+    import zstandard
+
+    # Compressors are not thread safe, so 1 is made per value.
+    def compress(value: bytes) -> bytes:
+        return zstandard.ZstdCompressor(level=RESULTS_COMPRESSION_LEVEL).compress(value)
+
+    def decompress(value: bytes) -> bytes:
+        return zstandard.ZstdDecompressor().decompress(value)
+
+    return JsonCodec(compress=compress, decompress=decompress)
+
+
+CODECS: Dict[str, Callable[[], JsonCodec]] = {
+    "zlib": lambda: JsonCodec(
+        compress=lambda value: zlib.compress(value, RESULTS_COMPRESSION_LEVEL),
+        decompress=zlib.decompress,
+    ),
+    "zstd": _build_zstd_codec,
+}
+
+
+def is_compression_available(compression: str) -> bool:
+    return compression in CODECS and (
+        compression != "zstd" or importlib.util.find_spec("zstandard") is not None
+    )
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    Stores JSON serializable values as compressed `bytea`.
+
+    Dicts, including subclasses such as `Counter`, lists and tuples are encoded as JSON,
+    so values are read back as dicts and lists.
+    Values which the driver has already decoded, i.e. those of a `json` column, are returned as
+    they are, and JSON text is decoded, so that pages stored before compression can be read.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, compression: str = RESULTS_COMPRESSION, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.compression = compression
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return CODECS[self.compression]().compress(orjson.dumps(value))
+
+    def result_processor(self, dialect, coltype) -> Callable[[Any], Any]:
+        # `LargeBinary` would cast the values of `json` columns to bytes, so it is bypassed.
+        return lambda value: self.process_result_value(value, dialect)
+
+    def process_result_value(self, value: Any, dialect) -> Any:
+        if value is None:
+            return None
+
+        if isinstance(value, str):
+            return orjson.loads(value)
+        if not isinstance(value, (bytes, memoryview)):
+            return value
+
+        value = bytes(value)
+        if value.startswith(ZSTD_MAGIC_NUMBER):
+            return orjson.loads(CODECS["zstd"]().decompress(value))
+        if value.startswith(ZLIB_MAGIC_NUMBER):
+            return orjson.loads(CODECS["zlib"]().decompress(value))
+        return orjson.loads(value)
@@ -2,13 +2,43 @@
 This module holds the main FastAPI application instance
 """
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
+from async_execution.batcher import get_page_id_batcher
+from core.metrics.registry import METRICS_ENABLED
+from core.metrics.routes import RouteMetricsMiddleware
+from core.pages.events import close_page_event_listener
+from db.migrations import migrate
 from db.session import Base, engine
-from routers import health, pages
+from routers import health, metrics, pages
+from serializers.compression import RESPONSE_COMPRESSION_ENABLED, CompressionMiddleware
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
+
+if RESPONSE_COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Added last, so that the time taken to compress responses is included.
+if METRICS_ENABLED:
+    app.add_middleware(RouteMetricsMiddleware)
 
 Base.metadata.create_all(bind=engine)
+migrate(bind=engine)
 
 app.include_router(health.router)
 app.include_router(pages.router)
+
+if METRICS_ENABLED:
+    app.include_router(metrics.router)
+
+
+@app.on_event("shutdown")
+def dispatch_pending_pages() -> None:
+    page_id_batcher = get_page_id_batcher()
+    if page_id_batcher is not None:
+        page_id_batcher.close()
+
+
+@app.on_event("shutdown")
+async def close_page_events() -> None:
+    await close_page_event_listener()
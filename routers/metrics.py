@@ -0,0 +1,31 @@
+"""
+This module holds the API layer/endpoints for the `metrics` router
+"""
+import redis
+from fastapi import APIRouter, Response
+
+from celery_app import celery
+from core.metrics.celery_tasks import CeleryQueueDepthCollector
+from core.metrics.registry import build_metrics_registry, render_metrics
+
+router = APIRouter()
+
+registry = build_metrics_registry(
+    collectors=[
+        CeleryQueueDepthCollector(
+            client=redis.Redis.from_url(
+                celery.conf.broker_url, socket_connect_timeout=1, socket_timeout=1
+            )
+        )
+    ]
+)
+
+
+@router.get("/metrics", tags=["metrics"], include_in_schema=False)
+def get_metrics():
+    """
+    Gets the Prometheus metrics of the API, see `core.metrics.registry`.
+    """
+    content, content_type = render_metrics(registry)
+    # The content type is set as a header, since it already holds the charset.
+    return Response(content=content, headers={"Content-Type": content_type})
@@ -1,50 +1,201 @@
 """
 This module holds the API layer/endpoints for the `pages` router
 """
+import asyncio
+import datetime
+import functools
 from typing import Optional
 
 import schemas
 import serializers
-from async_execution.tasks import run_scrape_page_task
-from db.models import crud
+from async_execution.batcher import get_page_id_batcher
+from async_execution.tasks import (
+    dispatch_reprocess_page_tasks,
+    dispatch_scrape_page_tasks,
+    reprocess_all_pages_task,
+)
+from core.pages import events
+from db.async_session import AsyncSessionLocal, yield_async_db
+from db.models import async_crud, crud
+from db.models.cursors import InvalidCursorError, decode_cursor
 from db.models.page import Page
 from db.session import yield_db
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Header, Query, HTTPException
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 router = APIRouter()
 
+DEFAULT_RESULTS_LIMIT: int = 1000
+DEFAULT_PAGES_LIMIT: int = 100
+DEFAULT_WAIT_TIMEOUT: float = 30
+MAX_WAIT_TIMEOUT: float = 120
+DEFAULT_EVENTS_TIMEOUT: float = 300
+MAX_EVENTS_TIMEOUT: float = 3600
+
 
 @router.post("/pages/", tags=["pages"])
-async def create_page(page: schemas.PagePostSchema, db: Session = Depends(yield_db)):
+async def create_page(
+    page: schemas.PagePostSchema, db: AsyncSession = Depends(yield_async_db)
+):
     """
     Create a `Page` object and kick off an asynchronous task to scrape text from the page.
 
+    Pages created within a short window of each other are scraped together in 1 task.
+    Either way, the page is scraped by the pipeline selected with `SCRAPE_PIPELINE`.
+
     This endpoint will return the ID of the newly created `Page` object.
 
     The `GET /pages/{page_id}` endpoint must then be polled with the ID to see the results.
     """
-    page_model = Page.create(target_url=page.target_url, db=db)
+    page_model = await Page.create_async(**page.dict(), db=db)
 
-    run_scrape_page_task.si(page_id=page_model.id).apply_async()
+    page_id_batcher = get_page_id_batcher()
+    if page_id_batcher is None:
+        await asyncio.to_thread(dispatch_scrape_page_tasks, [page_model.id])
+    else:
+        page_id_batcher.add(page_model.id)
 
     return {"page_id": page_model.id}
 
 
+@router.post("/pages/batch", tags=["pages"])
+async def create_pages(
+    batch: schemas.PageBatchPostSchema, db: AsyncSession = Depends(yield_async_db)
+):
+    """
+    Create many `Page` objects at once and kick off asynchronous tasks to scrape them.
+
+    All pages are inserted with a single statement
+    and the scraping tasks are published to the broker in chunks.
+
+    This endpoint will return the IDs of the newly created `Page` objects,
+    in the same order as the given `pages`.
+    """
+    page_ids = await Page.bulk_create_async(
+        pages=[page.dict() for page in batch.pages],
+        db=db,
+    )
+
+    # Publishing blocks on the broker, so it is kept off the event loop.
+    await asyncio.to_thread(dispatch_scrape_page_tasks, page_ids)
+
+    return {"page_ids": page_ids}
+
+
+@router.post("/pages/reprocess", tags=["pages"])
+async def reprocess_pages(batch: schemas.PageReprocessPostSchema):
+    """
+    Kick off asynchronous tasks to recompute the results of pages from their stored html.
+
+    No pages are fetched again, so this picks up changes to how text is parsed and filtered
+    at the cost of CPU alone.
+    Pages scraped before their html was stored are skipped.
+
+    All pages with stored html are reprocessed if no `page_ids` are given.
+
+    This endpoint will return the given `page_ids`, or null if all pages are being reprocessed.
+    """
+    # Publishing blocks on the broker, so it is kept off the event loop.
+    if batch.page_ids is None:
+        await asyncio.to_thread(reprocess_all_pages_task.delay)
+    else:
+        await asyncio.to_thread(dispatch_reprocess_page_tasks, batch.page_ids)
+
+    return {"page_ids": batch.page_ids}
+
+
 @router.get(
     "/pages/",
     tags=["pages"],
 )
-async def read_pages(db: Session = Depends(yield_db)):
+async def read_pages(
+    limit: int = Query(
+        DEFAULT_PAGES_LIMIT, ge=1, le=1000, description="The maximum number of pages to return"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="The `next_cursor` returned with the previous pages"
+    ),
+    status: Optional[str] = Query(None, description="Only include pages with this status"),
+    created_after: Optional[datetime.datetime] = Query(
+        None, description="Only include pages created at or after this time"
+    ),
+    created_before: Optional[datetime.datetime] = Query(
+        None, description="Only include pages created before this time"
+    ),
+    include_results: bool = Query(
+        False, description="Whether to include the results of each page"
+    ),
+    db: AsyncSession = Depends(yield_async_db),
+):
     """
-    List information about the `Page` objects.
+    List information about the `Page` objects, newest first.
+
+    This includes the status of each page.
+    The results themselves are only included if `include_results` is set.
 
-    This includes the status of the page also include the results themselves.
+    The response includes a `next_cursor`,
+    which can be passed as the `cursor` to retrieve the following pages.
 
     To be able to order results for a particular page,
     hit the `GET /pages/{page_id}/` endpoint with the corresponding `page_id`.
     """
-    return crud.get_pages(db=db)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        pages, next_cursor = await serializers.paginate_pages_async(
+            limit=limit,
+            after=after,
+            status=status,
+            created_after=created_after,
+            created_before=created_before,
+            include_results=include_results,
+            db=db,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return ORJSONResponse(
+        {
+            "pages": [
+                serializers.PageSerializer(page=page).list_output(include_results=include_results)
+                for page in pages
+            ],
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@router.get("/pages/export", tags=["pages"])
+def export_pages(
+    status: Optional[str] = Query(None, description="Only include pages with this status"),
+    created_after: Optional[datetime.datetime] = Query(
+        None, description="Only include pages created at or after this time"
+    ),
+    created_before: Optional[datetime.datetime] = Query(
+        None, description="Only include pages created before this time"
+    ),
+    min_count: int = Query(
+        1, ge=1, description="Only include words which occur at least this many times"
+    ),
+    db: Session = Depends(yield_db),
+):
+    """
+    Export the results of the `Page` objects as newline delimited JSON, oldest first.
+
+    Each line holds the `id`, `target_url`, `status`, `created_at` and `results` of 1 page.
+
+    Rows are read from the database with a server-side cursor
+    and written to the response as they arrive,
+    so any number of pages can be exported.
+    """
+    rows = crud.iter_pages_for_export(
+        status=status, created_after=created_after, created_before=created_before, db=db
+    )
+    return StreamingResponse(
+        serializers.iter_ndjson_export(rows, min_count=min_count),
+        media_type="application/x-ndjson",
+    )
 
 
 ordering_examples = {
@@ -73,7 +224,22 @@ async def read_page(
         examples=ordering_examples,
         description="The ordering of which to display the results",
     ),
-    db: Session = Depends(yield_db),
+    limit: Optional[int] = Query(
+        None, ge=1, le=100_000, description="The maximum number of results to return"
+    ),
+    offset: int = Query(0, ge=0, description="The number of results to skip"),
+    cursor: Optional[str] = Query(
+        None, description="The `next_cursor` returned with the previous results"
+    ),
+    accept: Optional[str] = Header(
+        None, description="The format of the results, see `serializers.formats`"
+    ),
+    debug: Optional[str] = Query(
+        None,
+        regex="^timings$",
+        description="Pass `timings` to include the time spent in each stage of the scrape",
+    ),
+    db: AsyncSession = Depends(yield_async_db),
 ):
     """
     Retrieve the results from a page.
@@ -85,11 +251,163 @@ async def read_page(
     - `alphabetical`: Returns results ranked by alphabetical order, in descending order only.
 
     - `frequency`: Returns results ranked by frequency, in descending order only.
+
+    To paginate results pass a `limit` and optionally an `offset`.
+    The response will then include a `next_cursor`,
+    which can be passed as the `cursor` to retrieve the following results.
+
+    The results are returned as an object of words and their counts by default.
+    Pass `application/vnd.nate.columnar+json` or `application/msgpack` in the `Accept` header
+    to instead receive them as parallel `words` and `counts` arrays.
+
+    Pass `debug=timings` to include the wall and CPU time spent in each stage of the scrape,
+    which is null unless the page was profiled, see `core.pages.profiling`.
+    """
+    return await _build_page_response(
+        page_id=page_id,
+        ordering=ordering,
+        limit=limit,
+        offset=offset,
+        cursor=cursor,
+        media_type=serializers.select_media_type(accept),
+        db=db,
+        include_timings=debug == "timings",
+    )
+
+
+async def _build_page_response(
+    page_id: int,
+    ordering: str,
+    limit: Optional[int],
+    offset: int,
+    cursor: Optional[str],
+    media_type: str,
+    db: AsyncSession,
+    include_timings: bool = False,
+) -> Response:
+    try:
+        page_model = await async_crud.get_page_by_id(
+            page_id=page_id, ordering=ordering, include_timings=include_timings, db=db
+        )
+    except crud.PageNotFoundError:
+        raise HTTPException(status_code=404, detail="Page not found")
+
+    if limit is None and cursor is None:
+        page_serializer = serializers.PageSerializer(page=page_model, ordering=ordering)
+        return serializers.build_results_response(
+            page_serializer.retrieve_output(include_timings=include_timings), media_type
+        )
+
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        results, next_cursor = await serializers.paginate_page_results_async(
+            page=page_model,
+            ordering=ordering,
+            limit=limit or DEFAULT_RESULTS_LIMIT,
+            offset=offset,
+            after=after,
+            db=db,
+        )
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    page_serializer = serializers.PageSerializer(
+        page=page_model, ordering=ordering, results=results, next_cursor=next_cursor
+    )
+    return serializers.build_results_response(
+        page_serializer.retrieve_output(include_timings=include_timings), media_type
+    )
+
+
+async def _read_page_status(page_id: int) -> Optional[str]:
+    # Each read has a session of its own,
+    # so that no connection is held whilst waiting for the status to change.
+    async with AsyncSessionLocal() as db:
+        return await async_crud.get_page_status(page_id=page_id, db=db)
+
+
+@router.get("/pages/{page_id}/wait", tags=["pages"])
+async def wait_for_page(
+    page_id: int,
+    timeout: float = Query(
+        DEFAULT_WAIT_TIMEOUT,
+        ge=0,
+        le=MAX_WAIT_TIMEOUT,
+        description="The maximum number of seconds to wait for the page to be done",
+    ),
+    ordering: Optional[str] = Query(
+        "unordered",
+        examples=ordering_examples,
+        description="The ordering of which to display the results",
+    ),
+    accept: Optional[str] = Header(
+        None, description="The format of the results, see `serializers.formats`"
+    ),
+    db: AsyncSession = Depends(yield_async_db),
+):
+    """
+    Wait for a page to be done or to fail, then retrieve it as `GET /pages/{page_id}` does.
+
+    The response is sent as soon as the status of the page becomes `DONE` or `FAILED`,
+    or once `timeout` seconds have passed, in which case the page is returned as it is.
+    This should be used instead of polling `GET /pages/{page_id}`.
+    """
+    statuses = events.iter_page_statuses(
+        page_id=page_id,
+        read_status=functools.partial(_read_page_status, page_id),
+        timeout=timeout,
+        listener=events.get_page_event_listener(),
+    )
+    try:
+        async for status in statuses:
+            if status in events.FINAL_STATUSES:
+                break
+    except crud.PageNotFoundError:
+        raise HTTPException(status_code=404, detail="Page not found")
+    finally:
+        await statuses.aclose()
+
+    return await _build_page_response(
+        page_id=page_id,
+        ordering=ordering,
+        limit=None,
+        offset=0,
+        cursor=None,
+        media_type=serializers.select_media_type(accept),
+        db=db,
+    )
+
+
+@router.get("/pages/{page_id}/events", tags=["pages"])
+async def stream_page_events(
+    page_id: int,
+    timeout: float = Query(
+        DEFAULT_EVENTS_TIMEOUT,
+        ge=0,
+        le=MAX_EVENTS_TIMEOUT,
+        description="The maximum number of seconds to keep the stream open for",
+    ),
+):
+    """
+    Stream the status of a page as server-sent events, until it is done or fails.
+
+    A `status` event holding the `page_id` and `status` is sent straight away
+    and then once each time the status changes.
+    The stream is closed after the `DONE` or `FAILED` status has been sent,
+    or once `timeout` seconds have passed.
     """
     try:
-        page_model = crud.get_page_by_id(page_id=page_id, db=db)
+        await _read_page_status(page_id)
     except crud.PageNotFoundError:
         raise HTTPException(status_code=404, detail="Page not found")
 
-    page_serializer = serializers.PageSerializer(page=page_model, ordering=ordering)
-    return page_serializer.retrieve_output()
+    statuses = events.iter_page_statuses(
+        page_id=page_id,
+        read_status=functools.partial(_read_page_status, page_id),
+        timeout=timeout,
+        listener=events.get_page_event_listener(),
+    )
+    return StreamingResponse(
+        serializers.iter_server_sent_events(page_id, statuses),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
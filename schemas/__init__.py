@@ -1 +1 @@
-from schemas.pages import PagePostSchema
\ No newline at end of file
+from schemas.pages import PageBatchPostSchema, PagePostSchema, PageReprocessPostSchema
\ No newline at end of file
@@ -1,11 +1,54 @@
 """
 This module holds schema models for the `page` router
 """
-from pydantic import BaseModel
+from typing import List, Optional
+
+from pydantic import AnyHttpUrl, BaseModel, conint, conlist, validator
+
+from core.pages import parsers
 
 
 class PagePostSchema(BaseModel):
     """
     Schema model to receive on page creation.
+
+    The stored results can be cut down to the `top_k` most frequent words
+    and to the words occurring at least `min_count` times.
+    Setting a `max_vocabulary` bounds the number of distinct words held whilst counting,
+    in which case the counts of a page with more distinct words are approximate.
+
+    If a `callback_url` is given, the page is posted to it once it is done or has failed,
+    see `core.pages.callbacks`.
+
+    If `profile` is set, the time spent in each stage of the scrape is stored with the page,
+    see `core.pages.profiling`.
     """
     target_url: str
+    parser: Optional[str] = None
+    top_k: Optional[conint(ge=1)] = None
+    min_count: Optional[conint(ge=1)] = None
+    max_vocabulary: Optional[conint(ge=1)] = None
+    callback_url: Optional[AnyHttpUrl] = None
+    profile: bool = False
+
+    @validator("parser")
+    def parser_must_be_registered(cls, parser: Optional[str]) -> Optional[str]:
+        if parser is not None and parser not in parsers.PARSERS:
+            raise ValueError(f"parser must be one of {sorted(parsers.PARSERS)}")
+        return parser
+
+
+class PageBatchPostSchema(BaseModel):
+    """
+    Schema model to receive on batch page creation.
+    """
+    pages: conlist(PagePostSchema, min_items=1, max_items=10_000)
+
+
+class PageReprocessPostSchema(BaseModel):
+    """
+    Schema model to receive when reprocessing pages from their stored html.
+
+    All pages with stored html are reprocessed if no `page_ids` are given.
+    """
+    page_ids: Optional[conlist(int, min_items=1, max_items=10_000)] = None
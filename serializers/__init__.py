@@ -1 +1,10 @@
-from serializers.page import PageSerializer
\ No newline at end of file
+from serializers.formats import build_results_response, select_media_type
+from serializers.page import (
+    PageSerializer,
+    iter_ndjson_export,
+    iter_server_sent_events,
+    paginate_page_results,
+    paginate_page_results_async,
+    paginate_pages,
+    paginate_pages_async,
+)
@@ -0,0 +1,189 @@
+"""
+This module holds the middleware which compresses responses.
+
+The encoding is negotiated with the `Accept-Encoding` header of the request:
+    - "br": Brotli, which gives the smallest payloads.
+        Requires the optional `brotli` package.
+    - "gzip": Gzip, which every client supports.
+
+Brotli is preferred where the client gives both the same weight.
+Responses smaller than `RESPONSE_COMPRESSION_MINIMUM_SIZE` bytes are sent as they are,
+as are responses which are already encoded and event streams,
+whose events would otherwise be held back by the compressor.
+
+The middleware is added by `main.py` unless `RESPONSE_COMPRESSION_ENABLED` is `false`,
+e.g. when responses are compressed by a proxy in front of the API instead.
+"""
+import importlib.util
+import os
+import zlib
+from typing import Callable, Dict, NamedTuple, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from serializers.formats import parse_quality_values
+
+RESPONSE_COMPRESSION_ENABLED: bool = (
+    os.getenv("RESPONSE_COMPRESSION_ENABLED", "true").lower() == "true"
+)
+RESPONSE_COMPRESSION_MINIMUM_SIZE: int = int(os.getenv("RESPONSE_COMPRESSION_MINIMUM_SIZE", 1024))
+RESPONSE_COMPRESSION_GZIP_LEVEL: int = int(os.getenv("RESPONSE_COMPRESSION_GZIP_LEVEL", 6))
+RESPONSE_COMPRESSION_BROTLI_QUALITY: int = int(
+    os.getenv("RESPONSE_COMPRESSION_BROTLI_QUALITY", 4)
+)
+
+UNCOMPRESSED_MEDIA_TYPES = {"text/event-stream"}
+
+
+class Compressor(NamedTuple):
+    compress: Callable[[bytes], bytes]
+    finish: Callable[[], bytes]
+
+
+def _build_gzip_compressor() -> Compressor:
+    compressobj = zlib.compressobj(RESPONSE_COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return Compressor(compress=compressobj.compress, finish=compressobj.flush)
+
+
+def _build_brotli_compressor() -> Compressor:
+    import brotli
+
+    compressor = brotli.Compressor(quality=RESPONSE_COMPRESSION_BROTLI_QUALITY)
+    return Compressor(compress=compressor.process, finish=compressor.finish)
+
+
+# Ordered by preference, for when the client gives several encodings the same weight.
+CONTENT_ENCODINGS: Dict[str, Callable[[], Compressor]] = {
+    "br": _build_brotli_compressor,
+    "gzip": _build_gzip_compressor,
+}
+
+
+def is_content_encoding_available(content_encoding: str) -> bool:
+    return content_encoding in CONTENT_ENCODINGS and (
+        content_encoding != "br" or importlib.util.find_spec("brotli") is not None
+    )
+
+
+def select_content_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Selects the encoding to compress the response with from the `Accept-Encoding` header.
+
+    Args:
+        accept_encoding: The value of the `Accept-Encoding` header, e.g. "gzip, br;q=0.9".
+
+    Returns:
+        (str) - The name of the selected encoding,
+            or None if the client accepts no available encoding.
+
+    """
+    quality_values = dict(parse_quality_values(accept_encoding))
+    wildcard_quality = quality_values.get("*", 0.0)
+
+    weighted_encodings = [
+        (quality_values.get(content_encoding, wildcard_quality), content_encoding)
+        for content_encoding in CONTENT_ENCODINGS
+        if is_content_encoding_available(content_encoding)
+    ]
+    weighted_encodings = [
+        (quality, content_encoding) for quality, content_encoding in weighted_encodings if quality > 0
+    ]
+    if not weighted_encodings:
+        return None
+
+    # `max()` returns the first of the encodings with the highest weight.
+    return max(weighted_encodings, key=lambda weighted_encoding: weighted_encoding[0])[1]
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with the encoding negotiated by `select_content_encoding()`.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = RESPONSE_COMPRESSION_MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_encoding = select_content_encoding(headers.get("Accept-Encoding"))
+        if content_encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressionResponder(self.app, content_encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class CompressionResponder:
+    """
+    Compresses the body of 1 response as it is sent.
+
+    The start of the response is held back until the first part of the body has been seen,
+    since whether the response is compressed decides its headers.
+    """
+
+    def __init__(self, app: ASGIApp, content_encoding: str, minimum_size: int):
+        self.app = app
+        self.content_encoding = content_encoding
+        self.minimum_size = minimum_size
+        self.send: Optional[Send] = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.compressor: Optional[Compressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _should_compress(self, body: bytes, more_body: bool) -> bool:
+        headers = Headers(raw=self.initial_message["headers"])
+        media_type = headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if "Content-Encoding" in headers or media_type in UNCOMPRESSED_MEDIA_TYPES:
+            return False
+        return more_body or len(body) >= self.minimum_size
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.initial_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if self._should_compress(body, more_body):
+                self.compressor = CONTENT_ENCODINGS[self.content_encoding]()
+                message["body"] = self._compress(body, more_body)
+
+                headers = MutableHeaders(raw=self.initial_message["headers"])
+                headers["Content-Encoding"] = self.content_encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(message["body"]))
+
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        if self.compressor is not None:
+            message["body"] = self._compress(body, more_body)
+        await self.send(message)
+
+    def _compress(self, body: bytes, more_body: bool) -> bytes:
+        compressed_body = self.compressor.compress(body)
+        if not more_body:
+            compressed_body += self.compressor.finish()
+        return compressed_body
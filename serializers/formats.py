@@ -0,0 +1,126 @@
+"""
+This module holds the formats in which the results of a page can be returned.
+
+The format is negotiated with the `Accept` header of the request:
+    - "application/json": Results as an object mapping each word to its count, the default.
+    - "application/vnd.nate.columnar+json": Results as parallel `words` and `counts` arrays,
+        which repeat no keys and so are smaller and faster to decode for large pages.
+    - "application/msgpack": The columnar format encoded with MessagePack.
+        Requires the optional `msgpack` package.
+
+JSON is encoded with `orjson`, which handles `datetime` and `Counter` values itself,
+so outputs are returned as responses directly rather than through `jsonable_encoder()`.
+"""
+import datetime
+import importlib.util
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.responses import ORJSONResponse, Response
+
+JSON_MEDIA_TYPE = "application/json"
+COLUMNAR_JSON_MEDIA_TYPE = "application/vnd.nate.columnar+json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+MEDIA_TYPES: List[str] = [JSON_MEDIA_TYPE, COLUMNAR_JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]
+WILDCARD_MEDIA_TYPES = {"*/*", "application/*"}
+
+
+def parse_quality_values(header: Optional[str]) -> List[Tuple[str, float]]:
+    """
+    Parses a header such as `Accept` or `Accept-Encoding` into its values and their weights.
+
+    Args:
+        header: The value of the header, e.g. "application/json;q=0.5, application/msgpack".
+
+    Returns:
+        (list) - Pairs of each lowercased value and its weight, which defaults to 1.
+            Values with a malformed weight are given a weight of 0.
+
+    """
+    quality_values = []
+    for item in (header or "").split(","):
+        value, *parameters = item.split(";")
+        value = value.strip().lower()
+        if not value:
+            continue
+
+        quality = 1.0
+        for parameter in parameters:
+            name, _, parameter_value = parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(parameter_value)
+                except ValueError:
+                    quality = 0.0
+
+        quality_values.append((value, quality))
+    return quality_values
+
+
+def is_media_type_available(media_type: str) -> bool:
+    return media_type in MEDIA_TYPES and (
+        media_type != MSGPACK_MEDIA_TYPE or importlib.util.find_spec("msgpack") is not None
+    )
+
+
+def select_media_type(accept: Optional[str]) -> str:
+    """
+    Selects the format of the results from the `Accept` header.
+
+    The available format with the highest weight is selected,
+    with wildcards standing in for "application/json".
+    If no available format is accepted, "application/json" is selected.
+
+    Args:
+        accept: The value of the `Accept` header.
+
+    Returns:
+        (str) - The media type of the selected format.
+
+    """
+    selected_media_type, selected_quality = JSON_MEDIA_TYPE, 0.0
+    for media_type, quality in parse_quality_values(accept):
+        if media_type in WILDCARD_MEDIA_TYPES:
+            media_type = JSON_MEDIA_TYPE
+
+        if is_media_type_available(media_type) and quality > selected_quality:
+            selected_media_type, selected_quality = media_type, quality
+
+    return selected_media_type
+
+
+def to_columnar_results(results: Optional[Dict[str, int]]) -> Dict[str, List]:
+    results = results or {}
+    return {"words": list(results), "counts": list(results.values())}
+
+
+def _encode_msgpack_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value)} with MessagePack")
+
+
+def build_results_response(output: Dict[str, Any], media_type: str = JSON_MEDIA_TYPE) -> Response:
+    """
+    Encodes the `output` of a page, holding its `results`, in the given format.
+
+    Args:
+        output: The output of the page, e.g. from `PageSerializer.retrieve_output()`.
+        media_type: The format to encode the `output` in, see `select_media_type()`.
+
+    Returns:
+        (Response) - The encoded `output`, with the `Content-Type` of the format.
+
+    """
+    if media_type == JSON_MEDIA_TYPE:
+        return ORJSONResponse(output)
+
+    output = {**output, "results": to_columnar_results(output["results"])}
+    if media_type == COLUMNAR_JSON_MEDIA_TYPE:
+        return ORJSONResponse(output, media_type=COLUMNAR_JSON_MEDIA_TYPE)
+
+    import msgpack
+
+    return Response(
+        msgpack.packb(output, default=_encode_msgpack_value), media_type=MSGPACK_MEDIA_TYPE
+    )
@@ -1,14 +1,34 @@
-from typing import Dict, Union
+import datetime
+import itertools
+import json
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.models import async_crud, crud
+from db.models.cursors import InvalidCursorError, encode_cursor
 from db.models.page import Page
 
 
 class PageSerializer:
-    def __init__(self, page: Page, ordering: str = "unordered"):
+    def __init__(
+        self,
+        page: Page,
+        ordering: str = "unordered",
+        results: Optional[Dict[str, int]] = None,
+        next_cursor: Optional[str] = None,
+    ):
         self.page = page
         self.ordering = ordering.lower()
+        self.results = results
+        self.next_cursor = next_cursor
 
     def get_page_results(self) -> Dict[str, int]:
+        if self.results is not None:
+            return self.results
+
         if self.ordering == "alphabetical":
             return self.page.get_results_ordered_by_alphabetical()
 
@@ -17,10 +37,354 @@ class PageSerializer:
 
         return self.page.results
 
-    def retrieve_output(self) -> Dict[str, Union[str, Dict[str, int]]]:
-        return {
+    def retrieve_output(
+        self, include_timings: bool = False
+    ) -> Dict[str, Union[str, Dict[str, int]]]:
+        output = {
             "target_url": self.page.target_url,
             "created at": self.page.created_at,
             "status": self.page.status,
             "results": self.get_page_results(),
         }
+
+        if self.results is not None:
+            output["next_cursor"] = self.next_cursor
+
+        if include_timings:
+            output["timings"] = self.page.timings
+
+        return output
+
+    def list_output(self, include_results: bool = False) -> Dict[str, Union[str, Dict[str, int]]]:
+        output = {
+            "id": self.page.id,
+            "target_url": self.page.target_url,
+            "created_at": self.page.created_at,
+            "status": self.page.status,
+            "parser": self.page.parser,
+        }
+
+        if include_results:
+            output["results"] = self.get_page_results()
+
+        return output
+
+
+def paginate_page_results(
+    page: Page,
+    ordering: str,
+    limit: int,
+    offset: int = 0,
+    after: Optional[Dict] = None,
+    db: Optional[Session] = None,
+) -> Tuple[Dict[str, int], Optional[str]]:
+    """
+    Gets a slice of the results of the `page` along with the cursor for the next slice.
+
+    If the results have been stored in the `page_word_count` table,
+    the slice is read with an index scan and the cursor holds the last word returned.
+    Otherwise the slice is taken from the `results` field
+    and the cursor holds the position of the next slice.
+
+    Args:
+        page: The `Page` whose results are to be sliced.
+        ordering: One of "unordered", "frequency" or "alphabetical".
+        limit: The maximum number of results in the slice.
+        offset: The number of results to skip after the cursor.
+        after: The position decoded from the cursor of the previous slice.
+        db: The session used to read the `page_word_count` table.
+
+    Raises:
+        InvalidCursorError: If the `after` position is malformed.
+
+    Returns:
+        (tuple) - The slice of results and the cursor for the next slice,
+            which is None if there are no more results.
+
+    """
+    ordering = ordering.lower()
+
+    if page.has_word_counts:
+        rows = crud.get_page_word_counts(
+            page_id=page.id,
+            ordering=ordering,
+            limit=limit + 1,
+            offset=offset,
+            after=_decode_word_count_position(after),
+            db=db,
+        )
+        return _slice_word_count_rows(rows, limit)
+
+    return _slice_results_field(page, ordering, limit, offset, _decode_results_offset(after))
+
+
+async def paginate_page_results_async(
+    page: Page,
+    ordering: str,
+    limit: int,
+    db: AsyncSession,
+    offset: int = 0,
+    after: Optional[Dict] = None,
+) -> Tuple[Dict[str, int], Optional[str]]:
+    """
+    Gets a slice of the results of the `page` without blocking the running event loop.
+
+    See `paginate_page_results()` for how the slice is taken.
+
+    Args:
+        page: The `Page` whose results are to be sliced.
+        ordering: One of "unordered", "frequency" or "alphabetical".
+        limit: The maximum number of results in the slice.
+        db: The asynchronous session used to read the `page_word_count` table.
+        offset: The number of results to skip after the cursor.
+        after: The position decoded from the cursor of the previous slice.
+
+    Raises:
+        InvalidCursorError: If the `after` position is malformed.
+
+    Returns:
+        (tuple) - The slice of results and the cursor for the next slice,
+            which is None if there are no more results.
+
+    """
+    ordering = ordering.lower()
+
+    if page.has_word_counts:
+        rows = await async_crud.get_page_word_counts(
+            page_id=page.id,
+            ordering=ordering,
+            limit=limit + 1,
+            offset=offset,
+            after=_decode_word_count_position(after),
+            db=db,
+        )
+        return _slice_word_count_rows(rows, limit)
+
+    return _slice_results_field(page, ordering, limit, offset, _decode_results_offset(after))
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _decode_word_count_position(after: Optional[Dict]) -> Optional[Dict]:
+    if after is None:
+        return None
+
+    word, count = after.get("word"), after.get("count")
+    if not isinstance(word, str) or not _is_int(count):
+        raise InvalidCursorError("Cursor does not hold a word count position")
+    return {"word": word, "count": count}
+
+
+def _decode_results_offset(after: Optional[Dict]) -> int:
+    if after is None:
+        return 0
+
+    offset = after.get("offset")
+    if not _is_int(offset) or offset < 0:
+        raise InvalidCursorError("Cursor does not hold a results offset")
+    return offset
+
+
+def _slice_word_count_rows(
+    rows: List[Tuple[str, int]], limit: int
+) -> Tuple[Dict[str, int], Optional[str]]:
+    results = dict(rows[:limit])
+    if len(rows) <= limit:
+        return results, None
+
+    last_word, last_count = rows[limit - 1]
+    return results, encode_cursor({"word": last_word, "count": last_count})
+
+
+def _slice_results_field(
+    page: Page, ordering: str, limit: int, offset: int, after_offset: int
+) -> Tuple[Dict[str, int], Optional[str]]:
+    start = after_offset + offset
+    rows = list(itertools.islice(page.get_result_items(ordering), start, start + limit + 1))
+    results = dict(rows[:limit])
+    if len(rows) <= limit:
+        return results, None
+
+    return results, encode_cursor({"offset": start + limit})
+
+
+def paginate_pages(
+    limit: int,
+    after: Optional[Dict] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime.datetime] = None,
+    created_before: Optional[datetime.datetime] = None,
+    include_results: bool = False,
+    db: Optional[Session] = None,
+) -> Tuple[List[Page], Optional[str]]:
+    """
+    Gets a slice of the pages, newest first, along with the cursor for the next slice.
+
+    The cursor holds the `created_at` and `id` of the last page returned,
+    so each slice is read with an index scan no matter how deep into the listing it is.
+
+    Args:
+        limit: The maximum number of pages in the slice.
+        after: The position decoded from the cursor of the previous slice.
+        status: Only include pages with this status.
+        created_after: Only include pages created at or after this time.
+        created_before: Only include pages created before this time.
+        include_results: Whether to load the `results` of each page.
+        db: The session used to read the `page` table.
+
+    Raises:
+        InvalidCursorError: If the `after` position is malformed.
+
+    Returns:
+        (tuple) - The slice of pages and the cursor for the next slice,
+            which is None if there are no more pages.
+
+    """
+    pages = crud.get_pages(
+        limit=limit + 1,
+        after=_decode_page_position(after),
+        status=status,
+        created_after=created_after,
+        created_before=created_before,
+        include_results=include_results,
+        db=db,
+    )
+    return _slice_pages(pages, limit)
+
+
+async def paginate_pages_async(
+    limit: int,
+    db: AsyncSession,
+    after: Optional[Dict] = None,
+    status: Optional[str] = None,
+    created_after: Optional[datetime.datetime] = None,
+    created_before: Optional[datetime.datetime] = None,
+    include_results: bool = False,
+) -> Tuple[List[Page], Optional[str]]:
+    """
+    Gets a slice of the pages, newest first, without blocking the running event loop.
+
+    See `paginate_pages()` for how the slice is taken.
+
+    Args:
+        limit: The maximum number of pages in the slice.
+        db: The asynchronous session used to read the `page` table.
+        after: The position decoded from the cursor of the previous slice.
+        status: Only include pages with this status.
+        created_after: Only include pages created at or after this time.
+        created_before: Only include pages created before this time.
+        include_results: Whether to load the `results` of each page.
+
+    Raises:
+        InvalidCursorError: If the `after` position is malformed.
+
+    Returns:
+        (tuple) - The slice of pages and the cursor for the next slice,
+            which is None if there are no more pages.
+
+    """
+    pages = await async_crud.get_pages(
+        limit=limit + 1,
+        after=_decode_page_position(after),
+        status=status,
+        created_after=created_after,
+        created_before=created_before,
+        include_results=include_results,
+        db=db,
+    )
+    return _slice_pages(pages, limit)
+
+
+def _decode_page_position(after: Optional[Dict]) -> Optional[Tuple[datetime.datetime, int]]:
+    if after is None:
+        return None
+
+    try:
+        return datetime.datetime.fromisoformat(after["created_at"]), int(after["id"])
+    except (KeyError, TypeError, ValueError) as error:
+        raise InvalidCursorError("Cursor does not hold a page position") from error
+
+
+def _slice_pages(pages: List[Page], limit: int) -> Tuple[List[Page], Optional[str]]:
+    if len(pages) <= limit:
+        return pages, None
+
+    last_page = pages[limit - 1]
+    next_cursor = encode_cursor(
+        {"created_at": last_page.created_at.isoformat(), "id": last_page.id}
+    )
+    return pages[:limit], next_cursor
+
+
+def iter_ndjson_export(
+    rows: Iterable[Row], min_count: int = 1, buffer_size: int = 64 * 1024
+) -> Iterator[str]:
+    """
+    Serializes the exported `rows` as newline delimited JSON, 1 page per line.
+
+    Lines are buffered up to roughly `buffer_size` characters before being yielded,
+    so that the response is written in a few large chunks rather than 1 per page.
+
+    Args:
+        rows: The pages as yielded by `crud.iter_pages_for_export()`.
+        min_count: Only include words which occur at least this many times.
+        buffer_size: The number of characters to buffer before yielding.
+
+    Returns:
+        (Generator) - Chunks of newline delimited JSON.
+
+    """
+    buffer, buffered_size = [], 0
+
+    for row in rows:
+        results = {
+            word: count for word, count in (row.results or {}).items() if count >= min_count
+        }
+        line = json.dumps(
+            {
+                "id": row.id,
+                "target_url": row.target_url,
+                "status": row.status,
+                "created_at": row.created_at.isoformat() if row.created_at else None,
+                "results": results,
+            }
+        )
+        buffer.append(line)
+        buffered_size += len(line) + 1
+
+        if buffered_size >= buffer_size:
+            yield "\n".join(buffer) + "\n"
+            buffer, buffered_size = [], 0
+
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+
+async def iter_server_sent_events(
+    page_id: int, statuses: AsyncIterator[Optional[str]]
+) -> AsyncIterator[str]:
+    """
+    Serializes the changes to the status of a page as server-sent events.
+
+    Args:
+        page_id: The ID of the `Page` object being followed.
+        statuses: The statuses of the page, as yielded by `events.iter_page_statuses()`.
+            The first status is always sent as an event, since pages are created without a status.
+            After that, None is sent as a comment to keep the connection alive through proxies.
+
+    Returns:
+        (AsyncGenerator) - Chunks of the event stream, 1 per event.
+
+    """
+    is_first_status = True
+    async for status in statuses:
+        if status is None and not is_first_status:
+            yield ": keep-alive\n\n"
+            continue
+
+        is_first_status = False
+
+        data = json.dumps({"page_id": page_id, "status": status})
+        yield f"event: status\ndata: {data}\n\n"
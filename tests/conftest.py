@@ -0,0 +1,118 @@
+"""
+This module holds pytest fixtures shared across the test suite
+"""
+import http.server
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+import pytest
+
+
+class StubResponse(NamedTuple):
+    status: int = 200
+    body: bytes = b""
+    headers: Dict[str, str] = {"Content-Type": "text/html; charset=utf-8"}
+    delay: float = 0
+
+
+class QuietThreadingHTTPServer(http.server.ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients are expected to hang up early, e.g. when a body is too large.
+        ...
+
+
+class LocalHTTPServer:
+    """
+    A stand-in for remote web servers, served from a background thread on localhost.
+
+    Responses are registered per path with `add_response()`.
+    Every request is recorded on `requests`, along with the client address
+    so that connection reuse can be asserted upon.
+    """
+
+    def __init__(self):
+        self.responses: Dict[str, StubResponse] = {}
+        self.requests: List[Dict] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = QuietThreadingHTTPServer(("127.0.0.1", 0), self._build_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}{path}"
+
+    def add_response(self, path: str, **kwargs) -> None:
+        self.responses[path] = StubResponse(**kwargs)
+
+    def _build_handler(self) -> Callable:
+        local_server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                ...
+
+            def _respond(self):
+                content_length = int(self.headers.get("Content-Length", 0))
+                request_body = self.rfile.read(content_length) if content_length else b""
+
+                with local_server.lock:
+                    local_server.requests.append(
+                        {
+                            "method": self.command,
+                            "path": self.path,
+                            "headers": dict(self.headers),
+                            "body": request_body,
+                            "client_address": self.client_address,
+                        }
+                    )
+                    local_server.in_flight += 1
+                    local_server.peak_in_flight = max(
+                        local_server.peak_in_flight, local_server.in_flight
+                    )
+
+                try:
+                    response = local_server.responses.get(
+                        self.path, StubResponse(status=404)
+                    )
+                    time.sleep(response.delay)
+                    self.send_response(response.status)
+                    for header, value in response.headers.items():
+                        self.send_header(header, value)
+                    self.send_header("Content-Length", str(len(response.body)))
+                    self.end_headers()
+                    self.wfile.write(response.body)
+                finally:
+                    with local_server.lock:
+                        local_server.in_flight -= 1
+
+            do_GET = _respond
+            do_POST = _respond
+
+        return Handler
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def local_http_server():
+    server = LocalHTTPServer()
+    server.start()
+    yield server
+    server.stop()
@@ -0,0 +1,106 @@
+"""
+This module contains integration tests for the `deliver_page_callbacks_task`
+"""
+import datetime
+from typing import NamedTuple, Optional
+from unittest import mock
+
+import orjson
+import pytest
+
+from async_execution.tasks import deliver_page_callbacks_task
+from celery_app import celery
+
+CREATED_AT = datetime.datetime(2022, 4, 1, tzinfo=datetime.timezone.utc)
+
+
+class PageCallback(NamedTuple):
+    id: int
+    callback_url: Optional[str]
+    target_url: str = "https://example.com"
+    status: str = "DONE"
+    created_at: datetime.datetime = CREATED_AT
+    results: Optional[dict] = None
+
+
+@pytest.fixture
+def eager_celery():
+    celery.conf.task_always_eager = True
+    celery.conf.task_eager_propagates = True
+    yield celery
+    celery.conf.task_always_eager = False
+    celery.conf.task_eager_propagates = False
+
+
+class TestDeliverPageCallbacksTask:
+    def test_task_is_routed_to_io_queue(self):
+        """
+        Given the celery application
+        When the `deliver_page_callbacks_task` is routed
+        Then it goes to the `io` queue
+        """
+        # When
+        route = celery.amqp.router.route({}, deliver_page_callbacks_task.name)
+
+        # Then
+        assert route["queue"].name == "io"
+
+    @mock.patch("async_execution.tasks.CALLBACK_MAX_ATTEMPTS", 3)
+    @mock.patch("async_execution.tasks.compute_backoff", return_value=0)
+    @mock.patch("async_execution.tasks.crud.get_page_callbacks")
+    def test_pages_are_batched_per_destination_and_failures_retried(
+        self,
+        mocked_get_page_callbacks,
+        mocked_compute_backoff,
+        eager_celery,
+        local_http_server,
+    ):
+        """
+        Given 2 pages for a destination which accepts callbacks
+            and 1 page for a destination which is unavailable
+        When the `deliver_page_callbacks_task` is run
+        Then both pages are posted to the first destination in 1 request
+            and only the page of the unavailable destination is retried,
+            until `CALLBACK_MAX_ATTEMPTS` attempts have been made
+
+        Patches:
+            `CALLBACK_MAX_ATTEMPTS`: To bound the number of retries
+            `mocked_compute_backoff`: To retry without waiting
+            `mocked_get_page_callbacks`: To remove the database call
+        """
+        # Given
+        local_http_server.add_response("/ok", status=200)
+        local_http_server.add_response("/unavailable", status=503)
+        pages = [
+            PageCallback(id=1, callback_url=local_http_server.url("/ok"), results={"a": 1}),
+            PageCallback(id=2, callback_url=local_http_server.url("/unavailable")),
+            PageCallback(id=3, callback_url=local_http_server.url("/ok"), status="FAILED"),
+        ]
+        mocked_get_page_callbacks.side_effect = lambda page_ids, db: [
+            page for page in pages if page.id in page_ids
+        ]
+
+        # When
+        deliver_page_callbacks_task.delay([1, 2, 3])
+
+        # Then
+        ok_requests = [
+            request for request in local_http_server.requests if request["path"] == "/ok"
+        ]
+        assert len(ok_requests) == 1
+        delivered_pages = orjson.loads(ok_requests[0]["body"])["pages"]
+        assert [(page["id"], page["status"]) for page in delivered_pages] == [
+            (1, "DONE"),
+            (3, "FAILED"),
+        ]
+
+        unavailable_requests = [
+            request for request in local_http_server.requests if request["path"] == "/unavailable"
+        ]
+        assert len(unavailable_requests) == 3
+        assert [call.kwargs["page_ids"] for call in mocked_get_page_callbacks.call_args_list] == [
+            [1, 2, 3],
+            [2],
+            [2],
+        ]
+        assert [call.args[0] for call in mocked_compute_backoff.call_args_list] == [1, 2]
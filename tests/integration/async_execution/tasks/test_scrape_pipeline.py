@@ -0,0 +1,205 @@
+"""
+This module contains integration tests for the split fetch and parse pipeline
+"""
+import hashlib
+from unittest import mock
+
+import pytest
+
+from async_execution.tasks import fetch_pages_task, parse_page_task
+from celery_app import celery
+from core.pages.blob_store import BlobStore
+from core.pages.html_spool import HtmlSpool
+from db.models.page import Page
+
+
+@pytest.fixture
+def eager_celery():
+    celery.conf.task_always_eager = True
+    celery.conf.task_eager_propagates = True
+    yield celery
+    celery.conf.task_always_eager = False
+    celery.conf.task_eager_propagates = False
+
+
+class TestScrapePipeline:
+    def test_stages_are_routed_to_io_and_cpu_queues(self):
+        """
+        Given the celery application
+        When the fetch and parse tasks are routed
+        Then fetching goes to the `io` queue and parsing goes to the `cpu` queue
+        """
+        # When
+        fetch_route = celery.amqp.router.route({}, fetch_pages_task.name)
+        parse_route = celery.amqp.router.route({}, parse_page_task.name)
+
+        # Then
+        assert fetch_route["queue"].name == "io"
+        assert parse_route["queue"].name == "cpu"
+
+    @mock.patch("application.pages.scrape.BLOB_STORE_ENABLED", False)
+    @mock.patch("application.pages.scrape.Page.update_results_and_status_to_done")
+    @mock.patch("application.pages.scrape.Page.update_statuses_by_ids")
+    @mock.patch("async_execution.tasks.crud.get_pages_by_ids")
+    @mock.patch("application.pages.scrape.get_html_spool")
+    def test_fetched_html_is_parsed_by_reference(
+        self,
+        mocked_get_html_spool,
+        mocked_get_pages_by_ids,
+        mocked_update_statuses_by_ids,
+        mocked_update_results_and_status_to_done,
+        eager_celery,
+        local_http_server,
+        tmp_path,
+    ):
+        """
+        Given a page served by a local server, an eager celery application
+            and the blob store disabled
+        When the `fetch_pages_task` is run
+        Then the `parse_page_task` receives a reference rather than the html,
+            the results are written along with the `DONE` status
+            and the html is removed from the spool
+
+        Patches:
+            `BLOB_STORE_ENABLED`: To pass the html through the spool
+            `mocked_get_html_spool`: To use a temporary directory
+            `mocked_get_pages_by_ids`: To remove the database call
+            `mocked_update_statuses_by_ids`: For the main assertion
+            `mocked_update_results_and_status_to_done`: For the main assertion
+        """
+        # Given
+        local_http_server.add_response("/page", body=b"<p>hello hello world</p>")
+        mocked_get_html_spool.return_value = HtmlSpool(directory=str(tmp_path))
+        mocked_get_pages_by_ids.return_value = [
+            Page(id=1, target_url=local_http_server.url("/page"), parser="html.parser")
+        ]
+
+        # When
+        with mock.patch.object(
+            parse_page_task, "delay", wraps=parse_page_task.delay
+        ) as spied_parse_delay:
+            fetch_pages_task.delay([1])
+
+        # Then
+        parse_kwargs = spied_parse_delay.call_args.kwargs
+        assert parse_kwargs["page_id"] == 1
+        assert len(parse_kwargs["html_reference"]) == 32
+        mocked_update_statuses_by_ids.assert_called_once_with(
+            page_ids=[1], status="STARTED", db=mock.ANY
+        )
+        mocked_update_results_and_status_to_done.assert_called_once_with(
+            page_id=1,
+            results={"hello": 2, "world": 1},
+            has_word_counts=False,
+            html_blob_key=None,
+            db=mock.ANY,
+        )
+        assert list(tmp_path.iterdir()) == []
+
+    @mock.patch("application.pages.scrape.BLOB_STORE_ENABLED", True)
+    @mock.patch("application.pages.scrape.Page.update_results_and_status_to_done")
+    @mock.patch("application.pages.scrape.Page.update_statuses_by_ids")
+    @mock.patch("async_execution.tasks.crud.get_pages_by_ids")
+    @mock.patch("application.pages.scrape.get_blob_store")
+    def test_fetched_html_is_kept_in_the_blob_store(
+        self,
+        mocked_get_blob_store,
+        mocked_get_pages_by_ids,
+        mocked_update_statuses_by_ids,
+        mocked_update_results_and_status_to_done,
+        eager_celery,
+        local_http_server,
+        tmp_path,
+    ):
+        """
+        Given a page served by a local server, an eager celery application
+            and the blob store enabled
+        When the `fetch_pages_task` is run
+        Then the `parse_page_task` receives the blob key of the html,
+            the blob key is written along with the results
+            and the html is kept in the blob store
+
+        Patches:
+            `BLOB_STORE_ENABLED`: To pass the html through the blob store
+            `mocked_get_blob_store`: To use a temporary directory
+            `mocked_get_pages_by_ids`: To remove the database call
+            `mocked_update_statuses_by_ids`: To remove the database call
+            `mocked_update_results_and_status_to_done`: For the main assertion
+        """
+        # Given
+        html = b"<p>hello hello world</p>"
+        local_http_server.add_response("/page", body=html)
+        blob_store = BlobStore(directory=str(tmp_path))
+        mocked_get_blob_store.return_value = blob_store
+        mocked_get_pages_by_ids.return_value = [
+            Page(id=1, target_url=local_http_server.url("/page"), parser="html.parser")
+        ]
+
+        # When
+        fetch_pages_task.delay([1])
+
+        # Then
+        blob_key = hashlib.sha256(html).hexdigest()
+        mocked_update_results_and_status_to_done.assert_called_once_with(
+            page_id=1,
+            results={"hello": 2, "world": 1},
+            has_word_counts=False,
+            html_blob_key=blob_key,
+            db=mock.ANY,
+        )
+        assert blob_store.get(blob_key) == html
+
+    @mock.patch("application.pages.scrape.BLOB_STORE_ENABLED", False)
+    @mock.patch("application.pages.scrape.Page.update_results_and_status_to_done")
+    @mock.patch("application.pages.scrape.Page.update_statuses_by_ids")
+    @mock.patch("async_execution.tasks.crud.get_pages_by_ids")
+    @mock.patch("application.pages.scrape.get_html_spool")
+    def test_batch_of_fetched_pages_is_parsed(
+        self,
+        mocked_get_html_spool,
+        mocked_get_pages_by_ids,
+        mocked_update_statuses_by_ids,
+        mocked_update_results_and_status_to_done,
+        eager_celery,
+        local_http_server,
+        tmp_path,
+    ):
+        """
+        Given 2 pages served by a local server, an eager celery application
+            and the blob store disabled
+        When the `fetch_pages_task` is run for both pages
+        Then both pages are marked as started with 1 call
+            and the results of each are written along with the `DONE` status
+
+        Patches:
+            `BLOB_STORE_ENABLED`: To pass the html through the spool
+            `mocked_get_html_spool`: To use a temporary directory
+            `mocked_get_pages_by_ids`: To remove the database call
+            `mocked_update_statuses_by_ids`: For the main assertion
+            `mocked_update_results_and_status_to_done`: For the main assertion
+        """
+        # Given
+        local_http_server.add_response("/first", body=b"<p>hello world</p>")
+        local_http_server.add_response("/second", body=b"<p>goodbye world</p>")
+        mocked_get_html_spool.return_value = HtmlSpool(directory=str(tmp_path))
+        mocked_get_pages_by_ids.return_value = [
+            Page(id=1, target_url=local_http_server.url("/first"), parser="html.parser"),
+            Page(id=2, target_url=local_http_server.url("/second"), parser="html.parser"),
+        ]
+
+        # When
+        fetch_pages_task.delay([1, 2])
+
+        # Then
+        mocked_update_statuses_by_ids.assert_called_once_with(
+            page_ids=[1, 2], status="STARTED", db=mock.ANY
+        )
+        written_results = {
+            call.kwargs["page_id"]: call.kwargs["results"]
+            for call in mocked_update_results_and_status_to_done.call_args_list
+        }
+        assert written_results == {
+            1: {"hello": 1, "world": 1},
+            2: {"goodbye": 1, "world": 1},
+        }
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,110 @@
+"""
+This module contains integration tests for the `get_cached_page_text_statistics` function
+"""
+import hashlib
+
+import fakeredis
+
+from core.pages.blob_store import BlobStore
+from core.pages.cache import (
+    InProcessCacheBackend,
+    RedisCacheBackend,
+    ResultCache,
+    get_cached_page_statistics,
+    get_cached_page_text_statistics,
+)
+
+
+class TestGetCachedPageTextStatistics:
+    def test_fresh_results_are_reused_without_a_request(self, local_http_server):
+        """
+        Given a page which has just been scraped
+        When `get_cached_page_text_statistics()` is called again for the same page
+        Then the cached results are returned without sending another request
+        """
+        # Given
+        local_http_server.add_response("/page", body=b"<p>fake html html</p>")
+        result_cache = ResultCache(backend=InProcessCacheBackend(), fresh_for=60)
+        target_url = local_http_server.url("/page")
+        get_cached_page_text_statistics(target_url, result_cache=result_cache)
+
+        # When
+        page_text_statistics = get_cached_page_text_statistics(
+            target_url, result_cache=result_cache
+        )
+
+        # Then
+        assert page_text_statistics == {"fake": 1, "html": 2}
+        assert len(local_http_server.requests) == 1
+
+    def test_results_are_reused_on_not_modified(self, local_http_server):
+        """
+        Given a page which was scraped with an `ETag` and is no longer fresh
+        When `get_cached_page_text_statistics()` is called and the server responds with a 304
+        Then a conditional request is sent with the `ETag`
+            and the cached results are returned
+        """
+        # Given
+        local_http_server.add_response(
+            "/page", body=b"<p>fake html</p>", headers={"ETag": '"v1"'}
+        )
+        result_cache = ResultCache(
+            backend=RedisCacheBackend(client=fakeredis.FakeRedis()), fresh_for=0
+        )
+        target_url = local_http_server.url("/page")
+        get_cached_page_text_statistics(target_url, result_cache=result_cache)
+        local_http_server.add_response("/page", status=304, headers={"ETag": '"v1"'})
+
+        # When
+        page_text_statistics = get_cached_page_text_statistics(
+            target_url, result_cache=result_cache
+        )
+
+        # Then
+        assert local_http_server.requests[-1]["headers"]["If-None-Match"] == '"v1"'
+        assert page_text_statistics == {"fake": 1, "html": 1}
+
+    def test_pages_with_identical_content_share_results(self, local_http_server):
+        """
+        Given 2 URLs which respond with identical content
+        When `get_cached_page_text_statistics()` is called for each URL
+        Then the results are stored once under the content hash
+        """
+        # Given
+        for path in ["/first", "/second"]:
+            local_http_server.add_response(path, body=b"<p>fake html</p>")
+        backend = InProcessCacheBackend()
+        result_cache = ResultCache(backend=backend)
+
+        # When
+        for path in ["/first", "/second"]:
+            get_cached_page_text_statistics(
+                local_http_server.url(path), result_cache=result_cache
+            )
+
+        # Then
+        content_keys = [key for key in backend.entries if key.startswith("content:")]
+        assert len(content_keys) == 1
+
+    def test_fetched_html_is_written_to_the_blob_store(self, local_http_server, tmp_path):
+        """
+        Given a page which has not been scraped before
+        When `get_cached_page_statistics()` is called with a blob store
+        Then the html is stored under the content hash returned with the results
+        """
+        # Given
+        html = b"<p>fake html html</p>"
+        local_http_server.add_response("/page", body=html)
+        blob_store = BlobStore(directory=str(tmp_path))
+
+        # When
+        page_statistics = get_cached_page_statistics(
+            local_http_server.url("/page"),
+            result_cache=ResultCache(backend=InProcessCacheBackend()),
+            blob_store=blob_store,
+        )
+
+        # Then
+        assert page_statistics.results == {"fake": 1, "html": 2}
+        assert page_statistics.content_hash == hashlib.sha256(html).hexdigest()
+        assert blob_store.get(page_statistics.content_hash) == html
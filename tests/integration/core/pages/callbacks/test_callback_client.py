@@ -0,0 +1,69 @@
+"""
+This module contains integration tests for the `CallbackClient` class
+"""
+import pytest
+
+from core.pages.callbacks import CallbackClient, CallbackDeliveryError, CallbackRejectedError
+
+
+class TestCallbackClient:
+    def test_body_is_posted_over_1_connection(self, local_http_server):
+        """
+        Given a local server which accepts callbacks
+        When `post()` is called multiple times for the same destination
+        Then each body is posted as JSON over the same connection
+        """
+        # Given
+        local_http_server.add_response("/hook", status=204)
+        client = CallbackClient()
+
+        # When
+        for _ in range(3):
+            client.post(local_http_server.url("/hook"), b'{"pages": []}')
+
+        # Then
+        assert [request["body"] for request in local_http_server.requests] == [
+            b'{"pages": []}'
+        ] * 3
+        assert {request["method"] for request in local_http_server.requests} == {"POST"}
+        assert local_http_server.requests[0]["headers"]["Content-Type"] == "application/json"
+        client_addresses = {request["client_address"] for request in local_http_server.requests}
+        assert len(client_addresses) == 1
+
+    @pytest.mark.parametrize(
+        "status, expected_error",
+        [
+            (503, CallbackDeliveryError),
+            (429, CallbackDeliveryError),
+            (400, CallbackRejectedError),
+        ],
+    )
+    def test_error_statuses_are_raised(self, local_http_server, status, expected_error):
+        """
+        Given a local server which responds to callbacks with an error status
+        When `post()` is called
+        Then statuses which can be retried raise a `CallbackDeliveryError`
+            and any other error status raises a `CallbackRejectedError`
+        """
+        # Given
+        local_http_server.add_response("/hook", status=status)
+
+        # When / Then
+        with pytest.raises(expected_error) as error:
+            CallbackClient().post(local_http_server.url("/hook"), b"{}")
+
+        assert isinstance(error.value, CallbackRejectedError) == (status == 400)
+
+    def test_unreachable_destination_raises_delivery_error(self, local_http_server):
+        """
+        Given a destination which does not accept connections
+        When `post()` is called
+        Then a `CallbackDeliveryError` is raised, so that the delivery can be retried
+        """
+        # Given
+        callback_url = local_http_server.url("/hook")
+        local_http_server.stop()
+
+        # When / Then
+        with pytest.raises(CallbackDeliveryError):
+            CallbackClient(connect_timeout=0.5).post(callback_url, b"{}")
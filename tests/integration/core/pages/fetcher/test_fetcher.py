@@ -0,0 +1,198 @@
+"""
+This module contains integration tests for the `Fetcher` class
+"""
+import asyncio
+import concurrent.futures
+import time
+import tracemalloc
+from unittest import mock
+
+import pytest
+
+from core.pages.fetcher import (
+    Fetcher,
+    FetchDeadlineExceededError,
+    FetchError,
+    ResponseTooLargeError,
+    iter_response_chunks,
+)
+from core.pages.statistics import get_page_text_statistics
+
+
+class TestFetcher:
+    def test_fetch_returns_body(self, local_http_server):
+        """
+        Given a local server which responds with html
+        When `fetch()` is called with the URL of the page
+        Then the html is returned
+        """
+        # Given
+        local_http_server.add_response("/page", body=b"<p>fake html</p>")
+
+        # When
+        html = Fetcher().fetch(local_http_server.url("/page"))
+
+        # Then
+        assert html == b"<p>fake html</p>"
+
+    def test_connections_are_kept_alive_between_requests(self, local_http_server):
+        """
+        Given a local server which responds with html
+        When `fetch()` is called multiple times for the same host
+        Then every request is sent over the same connection
+        """
+        # Given
+        local_http_server.add_response("/page", body=b"<p>fake html</p>")
+        fetcher = Fetcher()
+
+        # When
+        for _ in range(3):
+            fetcher.fetch(local_http_server.url("/page"))
+
+        # Then
+        client_addresses = {request["client_address"] for request in local_http_server.requests}
+        assert len(client_addresses) == 1
+
+    def test_concurrent_requests_are_bounded(self, local_http_server):
+        """
+        Given a local server which responds slowly
+        When `fetch()` is called from more threads than the `max_concurrency`
+        Then no more than `max_concurrency` requests are in flight at once
+        """
+        # Given
+        local_http_server.add_response("/slow", body=b"<p>slow</p>", delay=0.1)
+        fetcher = Fetcher(max_concurrency=2, max_connections_per_host=10)
+
+        # When
+        with concurrent.futures.ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(fetcher.fetch, [local_http_server.url("/slow")] * 6))
+
+        # Then
+        assert local_http_server.peak_in_flight == 2
+
+    def test_raises_fetch_error_on_read_timeout(self, local_http_server):
+        """
+        Given a local server which responds slower than the `read_timeout`
+        When `fetch()` is called
+        Then a `FetchError` is raised
+        """
+        # Given
+        local_http_server.add_response("/slow", body=b"<p>slow</p>", delay=0.5)
+        fetcher = Fetcher(read_timeout=0.1)
+
+        # When / Then
+        with pytest.raises(FetchError):
+            fetcher.fetch(local_http_server.url("/slow"))
+
+    def test_raises_fetch_error_on_error_status(self, local_http_server):
+        """
+        Given a local server which responds with a 404
+        When `fetch()` is called
+        Then a `FetchError` is raised
+        """
+        # Given
+        missing_url = local_http_server.url("/missing")
+
+        # When / Then
+        with pytest.raises(FetchError):
+            Fetcher().fetch(missing_url)
+
+    def test_fetch_async_returns_body(self, local_http_server):
+        """
+        Given a local server which responds with html
+        When `fetch_async()` is awaited within an event loop
+        Then the html is returned
+        """
+        # Given
+        local_http_server.add_response("/page", body=b"<p>fake html</p>")
+
+        # When
+        html = asyncio.run(Fetcher().fetch_async(local_http_server.url("/page")))
+
+        # Then
+        assert html == b"<p>fake html</p>"
+
+    def test_iter_chunks_yields_body_in_chunks(self, local_http_server):
+        """
+        Given a local server which responds with a body larger than the `chunk_size`
+        When `iter_chunks()` is called
+        Then the body is yielded in chunks no larger than the `chunk_size`
+        """
+        # Given
+        body = b"x" * 10_000
+        local_http_server.add_response("/page", body=body)
+
+        # When
+        chunks = list(Fetcher().iter_chunks(local_http_server.url("/page"), chunk_size=1024))
+
+        # Then
+        assert b"".join(chunks) == body
+        assert max(len(chunk) for chunk in chunks) <= 1024
+
+    def test_iter_chunks_raises_error_when_declared_length_exceeds_cap(
+        self, local_http_server
+    ):
+        """
+        Given a local server which declares a body larger than the `max_body_bytes`
+        When `iter_chunks()` is called
+        Then a `ResponseTooLargeError` is raised before the body is read
+        """
+        # Given
+        local_http_server.add_response("/large", body=b"x" * 2048)
+
+        # When / Then
+        with pytest.raises(ResponseTooLargeError):
+            list(Fetcher().iter_chunks(local_http_server.url("/large"), max_body_bytes=1024))
+
+    def test_iter_response_chunks_raises_error_when_streamed_body_exceeds_cap(self):
+        """
+        Given a response which streams a body without a `Content-Length`
+        When `iter_response_chunks()` is called with a smaller `max_body_bytes`
+        Then a `ResponseTooLargeError` is raised once the cap is crossed
+        """
+        # Given
+        mocked_response = mock.Mock(headers={})
+        mocked_response.stream.return_value = iter([b"x" * 512] * 4)
+
+        # When / Then
+        with pytest.raises(ResponseTooLargeError):
+            list(iter_response_chunks(mocked_response, max_body_bytes=1024))
+
+    def test_iter_chunks_raises_error_when_deadline_is_exceeded(self, local_http_server):
+        """
+        Given a local server which responds with a body of many chunks
+        When `iter_chunks()` is called and the consumer is slower than the `deadline`
+        Then a `FetchDeadlineExceededError` is raised
+        """
+        # Given
+        local_http_server.add_response("/page", body=b"x" * 4096)
+        chunks = Fetcher().iter_chunks(
+            local_http_server.url("/page"), chunk_size=1024, deadline=0.05
+        )
+
+        # When / Then
+        with pytest.raises(FetchDeadlineExceededError):
+            for _ in chunks:
+                time.sleep(0.05)
+
+    def test_scraping_memory_does_not_grow_with_page_size(self, local_http_server):
+        """
+        Given a local server which responds with a small and a 4 times larger page
+        When `get_page_text_statistics()` is called for each page
+        Then the peak memory allocated for the larger page is about the same
+        """
+        # Given
+        paragraph = b"<p>" + b" ".join([b"alpha", b"beta", b"gamma", b"delta"] * 25) + b"</p>"
+        local_http_server.add_response("/small", body=paragraph * 1_000)
+        local_http_server.add_response("/large", body=paragraph * 4_000)
+
+        # When
+        peak_memories = {}
+        for path in ["/small", "/large"]:
+            tracemalloc.start()
+            get_page_text_statistics(local_http_server.url(path))
+            _, peak_memories[path] = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        # Then
+        assert peak_memories["/large"] < peak_memories["/small"] * 1.5
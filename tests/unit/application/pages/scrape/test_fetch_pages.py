@@ -0,0 +1,101 @@
+"""
+This module holds tests for the `fetch_pages` function
+"""
+from unittest import mock
+
+from application.pages.scrape import fetch_pages
+from core.pages.fetcher import FetchError
+from db.models.page import Page
+
+
+class TestFetchPages:
+    @mock.patch("application.pages.scrape.Page.update_statuses_by_ids")
+    @mock.patch("application.pages.scrape.fetcher.open_url")
+    def test_failed_page_does_not_fail_the_batch(
+        self, mocked_open_url, mocked_update_statuses_by_ids
+    ):
+        """
+        Given a batch of pages, 1 of which cannot be fetched
+        When `fetch_pages()` is called
+        Then all pages are marked as started with 1 call,
+            the html of the fetched pages is stored
+            and the failed page is marked as failed
+
+        Patches:
+            `mocked_open_url`: To fail for 1 URL
+            `mocked_update_statuses_by_ids`: For the main assertion
+        """
+        # Given
+        pages = [
+            Page(id=1, target_url="https://fake.com/1"),
+            Page(id=2, target_url="https://fake.com/broken"),
+        ]
+        mocked_db = mock.MagicMock()
+        mocked_blob_store = mock.MagicMock()
+        mocked_blob_store.put.return_value = "a" * 64
+
+        def fake_open_url(target_url):
+            if target_url.endswith("broken"):
+                raise FetchError(target_url)
+            return b"<p>fake</p>"
+
+        mocked_open_url.side_effect = fake_open_url
+
+        # When
+        parse_arguments, failed_page_ids = fetch_pages(
+            pages=pages, db=mocked_db, fetch_concurrency=2, blob_store=mocked_blob_store
+        )
+
+        # Then
+        assert parse_arguments == {1: {"blob_key": "a" * 64}}
+        assert failed_page_ids == [2]
+        mocked_blob_store.put.assert_called_once_with(b"<p>fake</p>")
+        assert mocked_update_statuses_by_ids.call_args_list == [
+            mock.call(page_ids=[1, 2], status="STARTED", db=mocked_db),
+            mock.call(page_ids=[2], status="FAILED", db=mocked_db),
+        ]
+
+    @mock.patch("application.pages.scrape.Page.update_timings")
+    @mock.patch("application.pages.scrape.Page.update_statuses_by_ids")
+    @mock.patch("application.pages.scrape.fetcher.open_url")
+    def test_fetch_timings_of_profiled_pages_are_handed_to_parse_stage(
+        self, mocked_open_url, mocked_update_statuses_by_ids, mocked_update_timings
+    ):
+        """
+        Given a batch of 3 pages created with `profile` set, 1 of which cannot be fetched,
+            and 1 page without `profile` set
+        When `fetch_pages()` is called
+        Then the fetch timings of the fetched profiled pages are returned for `parse_page()`
+            and the timings of the failed page alone are written
+
+        Patches:
+            `mocked_open_url`: To fail for 1 URL
+            `mocked_update_statuses_by_ids`: To remove the database call
+            `mocked_update_timings`: For the main assertion
+        """
+        # Given
+        pages = [
+            Page(id=1, target_url="https://fake.com/1", profile=True),
+            Page(id=2, target_url="https://fake.com/broken", profile=True),
+            Page(id=3, target_url="https://fake.com/3", profile=False),
+        ]
+        mocked_blob_store = mock.MagicMock()
+        mocked_blob_store.put.return_value = "a" * 64
+
+        def fake_open_url(target_url):
+            if target_url.endswith("broken"):
+                raise FetchError(target_url)
+            return b"<p>fake</p>"
+
+        mocked_open_url.side_effect = fake_open_url
+
+        # When
+        parse_arguments, _ = fetch_pages(
+            pages=pages, db=mock.MagicMock(), blob_store=mocked_blob_store
+        )
+
+        # Then
+        assert "persist" in parse_arguments[1]["fetch_timings"]["stages"]
+        assert "fetch_timings" not in parse_arguments[3]
+        written_timings = mocked_update_timings.call_args.kwargs["timings"]
+        assert set(written_timings) == {2}
@@ -0,0 +1,80 @@
+"""
+This module holds tests for the `parse_page` function
+"""
+from unittest import mock
+
+from application.pages.scrape import parse_page
+from core.pages.html_spool import HtmlSpool
+
+
+class TestParsePage:
+    @mock.patch("application.pages.scrape.Page.update_timings")
+    @mock.patch("application.pages.scrape.Page.update_results_and_status_to_done")
+    def test_timings_carry_on_from_the_fetch_stage(
+        self, mocked_update_results_and_status_to_done, mocked_update_timings, tmp_path
+    ):
+        """
+        Given a page which was profiled whilst it was fetched
+        When `parse_page()` is called with its fetch timings
+        Then its timings are written once it is done,
+            holding the fetch timings along with the parse and persist stages
+
+        Patches:
+            `mocked_update_results_and_status_to_done`: To remove the database call
+            `mocked_update_timings`: For the main assertion
+        """
+        # Given
+        html_spool = HtmlSpool(directory=str(tmp_path))
+        html_reference = html_spool.put(b"<p>fake html</p>")
+        fetch_timings = {
+            "wall_seconds": 3,
+            "cpu_seconds": 1,
+            "stages": {"fetch": {"wall_seconds": 3, "cpu_seconds": 1}},
+        }
+
+        # When
+        parse_page(
+            page_id=1,
+            html_reference=html_reference,
+            parser="html.parser",
+            db=mock.MagicMock(),
+            html_spool=html_spool,
+            fetch_timings=fetch_timings,
+        )
+
+        # Then
+        mocked_update_results_and_status_to_done.assert_called_once()
+        timings = mocked_update_timings.call_args.kwargs["timings"][1]
+        assert timings["stages"]["fetch"] == {"wall_seconds": 3, "cpu_seconds": 1}
+        assert {"parse", "persist"} <= set(timings["stages"])
+        assert timings["wall_seconds"] >= 3
+
+    @mock.patch("application.pages.scrape.Page.update_timings")
+    @mock.patch("application.pages.scrape.Page.update_results_and_status_to_done")
+    def test_does_not_write_timings_of_page_which_is_not_profiled(
+        self, mocked_update_results_and_status_to_done, mocked_update_timings, tmp_path
+    ):
+        """
+        Given a page which was not profiled whilst it was fetched
+        When `parse_page()` is called without fetch timings
+        Then no timings are written
+
+        Patches:
+            `mocked_update_results_and_status_to_done`: To remove the database call
+            `mocked_update_timings`: For the main assertion
+        """
+        # Given
+        html_spool = HtmlSpool(directory=str(tmp_path))
+        html_reference = html_spool.put(b"<p>fake html</p>")
+
+        # When
+        parse_page(
+            page_id=1,
+            html_reference=html_reference,
+            parser="html.parser",
+            db=mock.MagicMock(),
+            html_spool=html_spool,
+        )
+
+        # Then
+        mocked_update_timings.assert_not_called()
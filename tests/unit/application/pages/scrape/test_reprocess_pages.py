@@ -0,0 +1,64 @@
+"""
+This module holds tests for the `reprocess_pages` function
+"""
+from typing import NamedTuple, Optional
+from unittest import mock
+
+from application.pages.scrape import reprocess_pages
+from core.pages.blob_store import BlobStore
+
+
+class PageBlobKey(NamedTuple):
+    id: int
+    parser: Optional[str]
+    html_blob_key: str
+    top_k: Optional[int] = None
+    min_count: Optional[int] = None
+    max_vocabulary: Optional[int] = None
+
+
+class TestReprocessPages:
+    @mock.patch("application.pages.scrape.Page.update_statuses_by_ids")
+    @mock.patch("application.pages.scrape.Page.bulk_replace_results")
+    def test_results_are_recomputed_from_stored_html(
+        self,
+        mocked_bulk_replace_results,
+        mocked_update_statuses_by_ids,
+        tmp_path,
+    ):
+        """
+        Given 2 pages, 1 of which has its html in the blob store
+        When `reprocess_pages()` is called
+        Then the results of the stored page are written with 1 bulk update,
+            the missing page is returned without being marked as failed
+
+        Patches:
+            `mocked_bulk_replace_results`: For the main assertion
+            `mocked_update_statuses_by_ids`: To check no statuses are written
+        """
+        # Given
+        blob_store = BlobStore(directory=str(tmp_path))
+        blob_key = blob_store.put(b"<p>stored stored html</p>")
+        pages = [
+            PageBlobKey(id=1, parser="html.parser", html_blob_key=blob_key),
+            PageBlobKey(id=2, parser="html.parser", html_blob_key="f" * 64),
+        ]
+        mocked_db = mock.MagicMock()
+
+        # When
+        failed_page_ids = reprocess_pages(pages=pages, db=mocked_db, blob_store=blob_store)
+
+        # Then
+        assert failed_page_ids == [2]
+        mocked_bulk_replace_results.assert_called_once_with(
+            pages=[
+                {
+                    "id": 1,
+                    "results": {"stored": 2, "html": 1},
+                    "has_word_counts": False,
+                    "html_blob_key": blob_key,
+                }
+            ],
+            db=mocked_db,
+        )
+        mocked_update_statuses_by_ids.assert_not_called()
@@ -0,0 +1,156 @@
+"""
+This module holds tests for the `run_scrape_pages` function
+"""
+from unittest import mock
+
+from application.pages.scrape import run_scrape_pages
+from core.pages.cache import PageTextStatistics
+from db.models.page import Page
+
+
+class TestRunScrapePages:
+    @mock.patch("application.pages.scrape.Page.bulk_update_results_and_status_to_done")
+    @mock.patch("application.pages.scrape.Page.update_statuses_by_ids")
+    @mock.patch("application.pages.scrape.get_coalesced_page_statistics")
+    def test_failed_page_does_not_fail_the_batch(
+        self,
+        mocked_get_coalesced_page_statistics,
+        mocked_update_statuses_by_ids,
+        mocked_bulk_update_results_and_status_to_done,
+    ):
+        """
+        Given a batch of pages, 1 of which cannot be scraped
+        When `run_scrape_pages()` is called
+        Then all pages are marked as started with 1 call,
+            the successful pages are written with 1 bulk update along with their blob keys
+            and the failed page is marked as failed
+
+        Patches:
+            `mocked_get_coalesced_page_statistics`: To fail for 1 URL
+            `mocked_update_statuses_by_ids`: For the main assertion
+            `mocked_bulk_update_results_and_status_to_done`: For the main assertion
+        """
+        # Given
+        pages = [
+            Page(id=1, target_url="https://fake.com/1"),
+            Page(id=2, target_url="https://fake.com/broken"),
+            Page(id=3, target_url="https://fake.com/3"),
+        ]
+        mocked_db = mock.MagicMock()
+        mocked_blob_store = mock.MagicMock()
+        mocked_blob_store.exists.return_value = True
+
+        def fake_statistics(target_url, **kwargs):
+            if target_url.endswith("broken"):
+                raise ValueError
+            return PageTextStatistics(
+                results={target_url[-1]: 1}, content_hash=target_url[-1] * 64
+            )
+
+        mocked_get_coalesced_page_statistics.side_effect = fake_statistics
+
+        # When
+        failed_page_ids = run_scrape_pages(
+            pages=pages, db=mocked_db, fetch_concurrency=2, blob_store=mocked_blob_store
+        )
+
+        # Then
+        assert failed_page_ids == [2]
+        assert mocked_update_statuses_by_ids.call_args_list == [
+            mock.call(page_ids=[1, 2, 3], status="STARTED", db=mocked_db),
+            mock.call(page_ids=[2], status="FAILED", db=mocked_db),
+        ]
+        mocked_bulk_update_results_and_status_to_done.assert_called_once_with(
+            pages=[
+                {
+                    "id": 1,
+                    "results": {"1": 1},
+                    "has_word_counts": False,
+                    "html_blob_key": "1" * 64,
+                },
+                {
+                    "id": 3,
+                    "results": {"3": 1},
+                    "has_word_counts": False,
+                    "html_blob_key": "3" * 64,
+                },
+            ],
+            db=mocked_db,
+        )
+        assert [page.status for page in pages] == ["DONE", "FAILED", "DONE"]
+
+    @mock.patch("application.pages.scrape.Page.update_timings")
+    @mock.patch("application.pages.scrape.Page.bulk_update_results_and_status_to_done")
+    @mock.patch("application.pages.scrape.Page.update_statuses_by_ids")
+    @mock.patch("application.pages.scrape.get_coalesced_page_statistics")
+    def test_timings_are_written_for_profiled_pages_only(
+        self,
+        mocked_get_coalesced_page_statistics,
+        mocked_update_statuses_by_ids,
+        mocked_bulk_update_results_and_status_to_done,
+        mocked_update_timings,
+    ):
+        """
+        Given a batch of 2 pages, 1 of which was created with `profile` set
+        When `run_scrape_pages()` is called
+        Then the timings of the profiled page alone are written with 1 call,
+            including the writes of the batch as its "persist" stage
+
+        Patches:
+            `mocked_get_coalesced_page_statistics`: To remove the network call
+            `mocked_update_statuses_by_ids`: To remove the database call
+            `mocked_bulk_update_results_and_status_to_done`: To remove the database call
+            `mocked_update_timings`: For the main assertion
+        """
+        # Given
+        pages = [
+            Page(id=1, target_url="https://fake.com/1", profile=True),
+            Page(id=2, target_url="https://fake.com/2", profile=False),
+        ]
+        mocked_get_coalesced_page_statistics.return_value = PageTextStatistics(
+            results={"fake": 1}, content_hash="a" * 64
+        )
+
+        # When
+        run_scrape_pages(pages=pages, db=mock.MagicMock(), blob_store=mock.MagicMock())
+
+        # Then
+        timings = mocked_update_timings.call_args.kwargs["timings"]
+        assert set(timings) == {1}
+        assert "persist" in timings[1]["stages"]
+
+    @mock.patch("application.pages.scrape.Page.bulk_update_results_and_status_to_done")
+    @mock.patch("application.pages.scrape.Page.update_statuses_by_ids")
+    @mock.patch("application.pages.scrape.get_coalesced_page_statistics")
+    def test_truncates_results_with_the_page_options(
+        self,
+        mocked_get_coalesced_page_statistics,
+        mocked_update_statuses_by_ids,
+        mocked_bulk_update_results_and_status_to_done,
+    ):
+        """
+        Given a page created with a `top_k`, `min_count` and `max_vocabulary`
+        When `run_scrape_pages()` is called
+        Then the words are counted within the `max_vocabulary`
+            and only the truncated results are written
+
+        Patches:
+            `mocked_get_coalesced_page_statistics`: To remove the network call
+            `mocked_update_statuses_by_ids`: To remove the database call
+            `mocked_bulk_update_results_and_status_to_done`: For the main assertion
+        """
+        # Given
+        page = Page(
+            id=1, target_url="https://fake.com", top_k=2, min_count=2, max_vocabulary=100
+        )
+        mocked_get_coalesced_page_statistics.return_value = PageTextStatistics(
+            results={"fake": 5, "html": 3, "page": 2, "of": 1}, content_hash="a" * 64
+        )
+
+        # When
+        run_scrape_pages(pages=[page], db=mock.MagicMock(), blob_store=mock.MagicMock())
+
+        # Then
+        assert mocked_get_coalesced_page_statistics.call_args.kwargs["max_vocabulary"] == 100
+        written_pages = mocked_bulk_update_results_and_status_to_done.call_args.kwargs["pages"]
+        assert written_pages[0]["results"] == {"fake": 5, "html": 3}
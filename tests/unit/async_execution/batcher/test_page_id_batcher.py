@@ -0,0 +1,65 @@
+"""
+This module holds tests for the `PageIdBatcher` class
+"""
+import threading
+from unittest import mock
+
+from async_execution.batcher import PageIdBatcher
+
+
+class TestPageIdBatcher:
+    def test_dispatches_page_ids_added_within_window_together(self):
+        """
+        Given a batcher with a short window
+        When several page IDs are added within the window
+        Then they are dispatched together once the window has passed
+        """
+        # Given
+        dispatched = threading.Event()
+        mocked_dispatch = mock.Mock(side_effect=lambda page_ids: dispatched.set())
+        batcher = PageIdBatcher(dispatch=mocked_dispatch, window=0.05, max_size=100)
+
+        # When
+        for page_id in (1, 2, 3):
+            batcher.add(page_id)
+
+        # Then
+        assert dispatched.wait(timeout=5)
+        mocked_dispatch.assert_called_once_with([1, 2, 3])
+
+    def test_dispatches_full_batch_without_waiting_for_window(self):
+        """
+        Given a batcher with a long window and a `max_size` of 2
+        When 3 page IDs are added and the batcher is closed
+        Then the first 2 are dispatched as soon as the batch is full
+            and the last 1 is dispatched on close
+        """
+        # Given
+        mocked_dispatch = mock.Mock()
+        batcher = PageIdBatcher(dispatch=mocked_dispatch, window=60, max_size=2)
+
+        # When
+        for page_id in (1, 2, 3):
+            batcher.add(page_id)
+        batcher.close()
+
+        # Then
+        assert mocked_dispatch.call_args_list == [mock.call([1, 2]), mock.call([3])]
+
+    def test_failed_dispatch_does_not_stop_later_batches(self):
+        """
+        Given a dispatch which fails for the first batch
+        When 2 batches are dispatched
+        Then the second batch is still dispatched
+        """
+        # Given
+        mocked_dispatch = mock.Mock(side_effect=[ValueError, None])
+        batcher = PageIdBatcher(dispatch=mocked_dispatch, window=60, max_size=1)
+
+        # When
+        batcher.add(1)
+        batcher.add(2)
+        batcher.close()
+
+        # Then
+        assert mocked_dispatch.call_args_list == [mock.call([1]), mock.call([2])]
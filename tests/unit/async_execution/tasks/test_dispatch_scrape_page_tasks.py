@@ -0,0 +1,54 @@
+"""
+This module holds tests for the `dispatch_scrape_page_tasks` function
+"""
+from unittest import mock
+
+from async_execution.tasks import dispatch_scrape_page_tasks
+
+
+class TestDispatchScrapePageTasks:
+    @mock.patch("async_execution.tasks.run_scrape_pages_task")
+    def test_page_ids_are_dispatched_in_chunks(self, mocked_run_scrape_pages_task):
+        """
+        Given a list of fake page IDs
+        When `dispatch_scrape_page_tasks()` is called with a `chunk_size`
+        Then 1 batched task is published per chunk of page IDs
+
+        Patches:
+            `mocked_run_scrape_pages_task`: For the main assertion
+        """
+        # Given
+        fake_page_ids = [1, 2, 3]
+
+        # When
+        dispatch_scrape_page_tasks(fake_page_ids, chunk_size=2)
+
+        # Then
+        assert mocked_run_scrape_pages_task.delay.call_args_list == [
+            mock.call([1, 2]),
+            mock.call([3]),
+        ]
+
+    @mock.patch("async_execution.tasks.SCRAPE_PIPELINE", "split")
+    @mock.patch("async_execution.tasks.fetch_pages_task")
+    def test_page_ids_are_dispatched_in_chunks_to_split_pipeline(self, mocked_fetch_pages_task):
+        """
+        Given a list of fake page IDs and the split pipeline
+        When `dispatch_scrape_page_tasks()` is called with a `chunk_size`
+        Then 1 fetching task is published per chunk of page IDs
+
+        Patches:
+            `SCRAPE_PIPELINE`: To select the split pipeline
+            `mocked_fetch_pages_task`: For the main assertion
+        """
+        # Given
+        fake_page_ids = [1, 2, 3]
+
+        # When
+        dispatch_scrape_page_tasks(fake_page_ids, chunk_size=2)
+
+        # Then
+        assert mocked_fetch_pages_task.delay.call_args_list == [
+            mock.call([1, 2]),
+            mock.call([3]),
+        ]
@@ -0,0 +1,24 @@
+"""
+This module holds tests for the `run_scrape_page_task` function
+"""
+from unittest import mock
+
+from async_execution.tasks import run_scrape_page_task
+
+
+class TestRunScrapePageTask:
+    @mock.patch("async_execution.tasks.run_scrape_pages_task")
+    def test_queued_page_is_scraped_as_a_batch_of_1(self, mocked_run_scrape_pages_task):
+        """
+        Given a message for the deprecated `run_scrape_page_task` left on the queue
+        When the task is run
+        Then the page is scraped by the `run_scrape_pages_task` on its own
+
+        Patches:
+            `mocked_run_scrape_pages_task`: For the main assertion
+        """
+        # When
+        run_scrape_page_task(1)
+
+        # Then
+        mocked_run_scrape_pages_task.assert_called_once_with([1])
@@ -0,0 +1,48 @@
+"""
+This module holds tests for the `CeleryQueueDepthCollector` class
+"""
+from unittest import mock
+
+import fakeredis
+import redis
+
+from core.metrics.celery_tasks import CeleryQueueDepthCollector
+
+
+class TestCeleryQueueDepthCollector:
+    def test_depth_of_each_queue_is_collected(self):
+        """
+        Given a broker holding 2 messages on the `io` queue and none on the `cpu` queue
+        When the collector is collected from
+        Then the depth of each queue is reported
+        """
+        # Given
+        client = fakeredis.FakeRedis()
+        client.lpush("io", "fake message", "fake message")
+        collector = CeleryQueueDepthCollector(client=client, queues=["io", "cpu"])
+
+        # When
+        metrics = list(collector.collect())
+
+        # Then
+        assert [(sample.labels, sample.value) for sample in metrics[0].samples] == [
+            ({"queue": "io"}, 2),
+            ({"queue": "cpu"}, 0),
+        ]
+
+    def test_nothing_is_collected_if_broker_cannot_be_reached(self):
+        """
+        Given a broker which cannot be reached
+        When the collector is collected from
+        Then no metrics are collected rather than an error being raised
+        """
+        # Given
+        client = mock.Mock()
+        client.pipeline.return_value.execute.side_effect = redis.ConnectionError
+        collector = CeleryQueueDepthCollector(client=client, queues=["io"])
+
+        # When
+        metrics = list(collector.collect())
+
+        # Then
+        assert metrics == []
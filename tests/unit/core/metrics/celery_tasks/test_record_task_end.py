@@ -0,0 +1,38 @@
+"""
+This module holds tests for the `record_task_end` function
+"""
+from unittest import mock
+
+from prometheus_client import REGISTRY
+
+from core.metrics.celery_tasks import record_task_end, record_task_start
+
+
+def get_task_count(state: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "nate_celery_task_seconds_count", {"task": "fake_task", "state": state}
+        )
+        or 0.0
+    )
+
+
+class TestRecordTaskEnd:
+    def test_runtime_is_recorded_by_task_and_state(self):
+        """
+        Given a task which has started
+        When `record_task_end()` is called with its final state
+        Then its runtime is recorded once under its name and state
+        """
+        # Given
+        fake_task = mock.Mock()
+        fake_task.name = "fake_task"
+        count_before = get_task_count("SUCCESS")
+        record_task_start(task_id="fake-task-id")
+
+        # When
+        record_task_end(task_id="fake-task-id", task=fake_task, state="SUCCESS")
+        record_task_end(task_id="fake-task-id", task=fake_task, state="SUCCESS")
+
+        # Then
+        assert get_task_count("SUCCESS") == count_before + 1
@@ -0,0 +1,58 @@
+"""
+This module holds tests for the `build_metrics_registry` function
+"""
+import os
+import subprocess
+import sys
+from unittest import mock
+
+from prometheus_client import generate_latest
+
+from core.metrics.registry import build_metrics_registry
+from db.pool import POOL_CHECKOUT_WAIT_SECONDS
+
+
+class TestBuildMetricsRegistry:
+    def test_values_of_other_processes_are_summed_in_multiprocess_mode(self, tmp_path):
+        """
+        Given 2 processes which each counted within the same `PROMETHEUS_MULTIPROC_DIR`
+        When `build_metrics_registry()` is called with that directory
+        Then the registry exposes the sum of the values of both processes
+
+        Patches:
+            `PROMETHEUS_MULTIPROC_DIR`: To read the directory written by the processes
+        """
+        # Given
+        script = (
+            "from prometheus_client import Counter; "
+            "Counter('nate_fake_pages', 'Fake pages', ['pool']).labels('sync').inc(2)"
+        )
+        environment = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+        for _ in range(2):
+            subprocess.run([sys.executable, "-c", script], env=environment, check=True)
+
+        # When
+        with mock.patch("core.metrics.registry.PROMETHEUS_MULTIPROC_DIR", str(tmp_path)):
+            registry = build_metrics_registry()
+
+        # Then
+        assert registry.get_sample_value("nate_fake_pages_total", {"pool": "sync"}) == 4
+
+    def test_default_registry_and_collectors_are_exposed(self):
+        """
+        Given no `PROMETHEUS_MULTIPROC_DIR` and an additional collector
+        When `build_metrics_registry()` is called
+        Then the metrics of the default registry and of the collector are both exposed
+        """
+        # Given
+        collector = mock.Mock(spec=["collect"])
+        collector.collect.return_value = []
+
+        # When
+        with mock.patch("core.metrics.registry.PROMETHEUS_MULTIPROC_DIR", ""):
+            registry = build_metrics_registry(collectors=[collector])
+        exposition = generate_latest(registry).decode()
+
+        # Then
+        assert POOL_CHECKOUT_WAIT_SECONDS._name in exposition
+        collector.collect.assert_called_once()
@@ -0,0 +1,48 @@
+"""
+This module holds tests for the `RouteMetricsMiddleware` class
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from core.metrics.routes import RouteMetricsMiddleware
+
+
+def get_request_count(route: str, status: str) -> float:
+    return (
+        REGISTRY.get_sample_value(
+            "nate_http_request_seconds_count",
+            {"method": "GET", "route": route, "status": status},
+        )
+        or 0.0
+    )
+
+
+class TestRouteMetricsMiddleware:
+    def test_requests_are_labelled_with_route_template(self):
+        """
+        Given an app with a route which takes a path parameter
+        When requests are made for 2 different values of the parameter and for an unknown path
+        Then both requests are recorded under the path template of the route
+            and the unknown path is recorded as unmatched
+        """
+        # Given
+        app = FastAPI()
+        app.add_middleware(RouteMetricsMiddleware)
+
+        @app.get("/fake-items/{item_id}")
+        def read_fake_item(item_id: int):
+            return {"item_id": item_id}
+
+        route_count_before = get_request_count("/fake-items/{item_id}", "200")
+        unmatched_count_before = get_request_count("unmatched", "404")
+
+        # When
+        with TestClient(app) as client:
+            client.get("/fake-items/1")
+            client.get("/fake-items/2")
+            client.get("/fake-unknown")
+
+        # Then
+        assert get_request_count("/fake-items/{item_id}", "200") == route_count_before + 2
+        assert get_request_count("unmatched", "404") == unmatched_count_before + 1
@@ -0,0 +1,112 @@
+"""
+This module holds tests for the `BlobStore` class
+"""
+import hashlib
+
+import pytest
+
+from core.pages.blob_store import BlobNotFoundError, BlobStore, is_codec_available
+
+AVAILABLE_CODECS = [name for name in ("gzip", "zstd") if is_codec_available(name)]
+
+
+class TestBlobStore:
+    @pytest.mark.parametrize("compression", AVAILABLE_CODECS)
+    def test_html_is_read_back_by_the_hash_of_its_content(self, tmp_path, compression):
+        """
+        Given html which has been written to the store in small chunks
+        When it is read back by its key
+        Then the key is the SHA-256 hash of the html and the original html is returned
+        """
+        # Given
+        html = b"<p>" + b"fake html " * 1000 + b"</p>"
+        blob_store = BlobStore(directory=str(tmp_path), compression=compression, read_size=64)
+        with blob_store.open_writer() as blob_writer:
+            for start in range(0, len(html), 100):
+                blob_writer.write(html[start : start + 100])
+            key = blob_writer.commit()
+
+        # When
+        stored_html = blob_store.get(key)
+
+        # Then
+        assert key == hashlib.sha256(html).hexdigest()
+        assert stored_html == html
+
+    def test_identical_html_is_stored_once(self, tmp_path):
+        """
+        Given html which has already been written to the store
+        When the same html is written again
+        Then the same key is returned and only 1 blob is stored
+        """
+        # Given
+        blob_store = BlobStore(directory=str(tmp_path), compression="gzip")
+        key = blob_store.put(b"<p>fake html</p>")
+
+        # When
+        duplicate_key = blob_store.put(b"<p>fake html</p>")
+
+        # Then
+        assert duplicate_key == key
+        assert [path.name for path in tmp_path.rglob("*")] == [key[:2], f"{key}.gz"]
+
+    def test_uncommitted_writer_leaves_nothing_behind(self, tmp_path):
+        """
+        Given a writer which fails before being committed
+        When the writer is closed
+        Then no blob or temporary file is left in the store
+        """
+        # Given
+        blob_store = BlobStore(directory=str(tmp_path), compression="gzip")
+
+        # When
+        with pytest.raises(ValueError):
+            with blob_store.open_writer() as blob_writer:
+                blob_writer.write(b"<p>partial")
+                raise ValueError
+
+        # Then
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.skipif(not is_codec_available("zstd"), reason="zstandard is not installed")
+    def test_blobs_are_readable_after_changing_the_codec(self, tmp_path):
+        """
+        Given html which was stored with `gzip`
+        When it is read back by a store configured for `zstd`
+        Then the original html is returned
+        """
+        # Given
+        key = BlobStore(directory=str(tmp_path), compression="gzip").put(b"<p>fake</p>")
+
+        # When
+        html = BlobStore(directory=str(tmp_path), compression="zstd").get(key)
+
+        # Then
+        assert html == b"<p>fake</p>"
+
+    def test_raises_error_for_missing_blob(self, tmp_path):
+        """
+        Given a key for which no html has been stored
+        When it is used to read from the store
+        Then a `BlobNotFoundError` is raised before any chunk is requested
+        """
+        # Given
+        blob_store = BlobStore(directory=str(tmp_path))
+
+        # When / Then
+        with pytest.raises(BlobNotFoundError):
+            blob_store.iter_chunks("a" * 64)
+
+    @pytest.mark.parametrize("key", ["../../etc/passwd", "", "A" * 64])
+    def test_raises_error_for_key_not_made_by_store(self, tmp_path, key):
+        """
+        Given a key which is not a SHA-256 hex digest
+        When it is used to read from the store
+        Then a `ValueError` is raised rather than a path outside the store being read
+        """
+        # Given
+        blob_store = BlobStore(directory=str(tmp_path))
+
+        # When / Then
+        with pytest.raises(ValueError):
+            blob_store.get(key)
@@ -0,0 +1,23 @@
+"""
+This module holds tests for the `CacheBackend` class
+"""
+import pytest
+
+from core.pages.cache import CacheBackend
+
+
+class TestCacheBackend:
+    def test_incomplete_backend_cannot_be_created(self):
+        """
+        Given a backend which only implements `get()`
+        When it is created
+        Then a `TypeError` is raised rather than failing on the first `set()`
+        """
+        # Given
+        class IncompleteCacheBackend(CacheBackend):
+            def get(self, key):
+                return None
+
+        # When / Then
+        with pytest.raises(TypeError):
+            IncompleteCacheBackend()
@@ -0,0 +1,50 @@
+"""
+This module holds tests for the `InProcessCacheBackend` class
+"""
+from unittest import mock
+
+from core.pages.cache import InProcessCacheBackend
+
+
+class TestInProcessCacheBackend:
+    def test_least_recently_used_entry_is_evicted(self):
+        """
+        Given a backend with `max_entries` of 2 which holds 2 entries
+        When the first entry is read and then a third entry is set
+        Then the second entry is evicted
+        """
+        # Given
+        backend = InProcessCacheBackend(max_entries=2)
+        backend.set("first", {"a": 1}, ttl=60)
+        backend.set("second", {"b": 2}, ttl=60)
+
+        # When
+        backend.get("first")
+        backend.set("third", {"c": 3}, ttl=60)
+
+        # Then
+        assert backend.get("first") == {"a": 1}
+        assert backend.get("second") is None
+        assert backend.get("third") == {"c": 3}
+
+    @mock.patch("core.pages.cache.time.monotonic")
+    def test_expired_entry_is_not_returned(self, mocked_monotonic):
+        """
+        Given an entry set with a `ttl` of 60 seconds
+        When the entry is read 61 seconds later
+        Then None is returned
+
+        Patches:
+            `mocked_monotonic`: To move the clock forward
+        """
+        # Given
+        mocked_monotonic.return_value = 1000
+        backend = InProcessCacheBackend()
+        backend.set("key", {"a": 1}, ttl=60)
+
+        # When
+        mocked_monotonic.return_value = 1061
+        value = backend.get("key")
+
+        # Then
+        assert value is None
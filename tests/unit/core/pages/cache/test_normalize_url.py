@@ -0,0 +1,43 @@
+"""
+This module holds tests for the `normalize_url` function
+"""
+import pytest
+
+from core.pages.cache import normalize_url
+
+
+class TestNormalizeURL:
+    @pytest.mark.parametrize(
+        "target_url",
+        [
+            "https://Example.com",
+            "HTTPS://example.com:443/",
+            "https://example.com/#fragment",
+        ],
+    )
+    def test_equivalent_urls_are_normalized_to_the_same_url(self, target_url):
+        """
+        Given URLs which differ only by case, default port, path or fragment
+        When `normalize_url()` is called
+        Then the same normalized URL is returned
+        """
+        # Given / When
+        normalized_url = normalize_url(target_url)
+
+        # Then
+        assert normalized_url == "https://example.com/"
+
+    def test_query_parameters_are_sorted(self):
+        """
+        Given a URL with unsorted query parameters
+        When `normalize_url()` is called
+        Then the query parameters are sorted
+        """
+        # Given
+        target_url = "http://example.com:8080/search?q=nate&a=1"
+
+        # When
+        normalized_url = normalize_url(target_url)
+
+        # Then
+        assert normalized_url == "http://example.com:8080/search?a=1&q=nate"
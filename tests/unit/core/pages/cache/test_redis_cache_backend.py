@@ -0,0 +1,40 @@
+"""
+This module holds tests for the `RedisCacheBackend` class
+"""
+import fakeredis
+
+from core.pages.cache import RedisCacheBackend
+
+
+class TestRedisCacheBackend:
+    def test_value_is_round_tripped_with_ttl(self):
+        """
+        Given a backend with a fake Redis client
+        When a value is set with a `ttl`
+        Then the value can be read back and its key expires after the `ttl`
+        """
+        # Given
+        client = fakeredis.FakeRedis()
+        backend = RedisCacheBackend(client=client, prefix="test:")
+
+        # When
+        backend.set("key", {"a": 1}, ttl=60)
+
+        # Then
+        assert backend.get("key") == {"a": 1}
+        assert 0 < client.ttl("test:key") <= 60
+
+    def test_missing_key_returns_none(self):
+        """
+        Given a backend with an empty fake Redis client
+        When a key is read
+        Then None is returned
+        """
+        # Given
+        backend = RedisCacheBackend(client=fakeredis.FakeRedis())
+
+        # When
+        value = backend.get("missing")
+
+        # Then
+        assert value is None
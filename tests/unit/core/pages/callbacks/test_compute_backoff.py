@@ -0,0 +1,25 @@
+"""
+This module holds tests for the `compute_backoff` function
+"""
+from unittest import mock
+
+from core.pages.callbacks import compute_backoff
+
+
+class TestComputeBackoff:
+    @mock.patch("core.pages.callbacks.random.uniform", side_effect=lambda low, high: high)
+    def test_delay_doubles_up_to_maximum(self, mocked_uniform):
+        """
+        Given a `base` of 2 seconds and a `maximum` of 10 seconds
+        When `compute_backoff()` is called for successive attempts
+        Then the upper bound of the delay doubles with each attempt until it reaches the maximum
+
+        Patches:
+            `mocked_uniform`: To return the upper bound of the random delay
+        """
+        # When
+        delays = [compute_backoff(attempt, base=2, maximum=10) for attempt in range(1, 6)]
+
+        # Then
+        assert delays == [2, 4, 8, 10, 10]
+        assert all(call.args[0] == 0 for call in mocked_uniform.call_args_list)
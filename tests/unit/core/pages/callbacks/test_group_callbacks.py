@@ -0,0 +1,88 @@
+"""
+This module holds tests for the `group_callbacks` function
+"""
+import datetime
+from typing import NamedTuple, Optional
+
+import orjson
+
+from core.pages.callbacks import build_callback_payload, group_callbacks
+
+CREATED_AT = datetime.datetime(2022, 4, 1, tzinfo=datetime.timezone.utc)
+
+
+class PageCallback(NamedTuple):
+    id: int
+    callback_url: Optional[str]
+    target_url: str = "https://example.com"
+    status: str = "DONE"
+    created_at: datetime.datetime = CREATED_AT
+    results: Optional[dict] = None
+
+
+class TestGroupCallbacks:
+    def test_pages_are_grouped_by_destination_in_batches(self):
+        """
+        Given pages for 2 destinations and 1 page without a `callback_url`
+        When `group_callbacks()` is called with a `max_batch_size` of 2
+        Then the pages of each destination are split into batches of at most 2
+            and the page without a `callback_url` is left out
+        """
+        # Given
+        pages = [
+            PageCallback(id=1, callback_url="https://a.com/hook"),
+            PageCallback(id=2, callback_url="https://b.com/hook"),
+            PageCallback(id=3, callback_url="https://a.com/hook"),
+            PageCallback(id=4, callback_url=None),
+            PageCallback(id=5, callback_url="https://a.com/hook"),
+        ]
+
+        # When
+        batches = group_callbacks(pages, max_batch_size=2)
+
+        # Then
+        assert [
+            (callback_url, [page.id for page in callback_pages])
+            for callback_url, callback_pages in batches
+        ] == [
+            ("https://a.com/hook", [1, 3]),
+            ("https://a.com/hook", [5]),
+            ("https://b.com/hook", [2]),
+        ]
+
+    def test_payload_holds_results_of_done_pages_only(self):
+        """
+        Given a done page and a failed page which still holds earlier results
+        When `build_callback_payload()` is called
+        Then the results are only included for the done page
+        """
+        # Given
+        pages = [
+            PageCallback(id=1, callback_url="https://a.com/hook", results={"a": 1}),
+            PageCallback(
+                id=2, callback_url="https://a.com/hook", status="FAILED", results={"b": 1}
+            ),
+        ]
+
+        # When
+        payload = orjson.loads(build_callback_payload(pages))
+
+        # Then
+        assert payload == {
+            "pages": [
+                {
+                    "id": 1,
+                    "target_url": "https://example.com",
+                    "status": "DONE",
+                    "created_at": CREATED_AT.isoformat(),
+                    "results": {"a": 1},
+                },
+                {
+                    "id": 2,
+                    "target_url": "https://example.com",
+                    "status": "FAILED",
+                    "created_at": CREATED_AT.isoformat(),
+                    "results": None,
+                },
+            ]
+        }
@@ -0,0 +1,71 @@
+"""
+This module holds tests for the `get_coalesced_page_statistics` function
+"""
+from unittest import mock
+
+import fakeredis
+
+from core.pages.cache import PageTextStatistics
+from core.pages.coalescing import SingleFlight, get_coalesced_page_statistics
+
+
+class TestGetCoalescedPageStatistics:
+    @mock.patch("core.pages.coalescing.get_cached_page_statistics")
+    def test_page_is_scraped_alone_if_redis_cannot_be_reached(
+        self, mocked_get_cached_page_statistics
+    ):
+        """
+        Given a coalescer whose Redis server cannot be reached
+        When `get_coalesced_page_statistics()` is called
+        Then the page is scraped without being coalesced rather than an error being raised
+
+        Patches:
+            `mocked_get_cached_page_statistics`: To remove the network call
+        """
+        # Given
+        server = fakeredis.FakeServer()
+        server.connected = False
+        single_flight = SingleFlight(client=fakeredis.FakeRedis(server=server))
+        page_statistics = PageTextStatistics(results={"fake": 1}, content_hash="a" * 64)
+        mocked_get_cached_page_statistics.return_value = page_statistics
+
+        # When
+        result = get_coalesced_page_statistics(
+            "https://fake.com", parser="html.parser", single_flight=single_flight
+        )
+
+        # Then
+        assert result == page_statistics
+        mocked_get_cached_page_statistics.assert_called_once()
+
+    @mock.patch("core.pages.coalescing.get_cached_page_statistics")
+    def test_page_is_not_scraped_again_if_redis_is_lost_after_scraping(
+        self, mocked_get_cached_page_statistics
+    ):
+        """
+        Given a coalescer whose Redis server is lost whilst the page is being scraped
+        When `get_coalesced_page_statistics()` is called
+        Then the statistics of the 1 scrape are returned
+
+        Patches:
+            `mocked_get_cached_page_statistics`: To disconnect the server whilst scraping
+        """
+        # Given
+        server = fakeredis.FakeServer()
+        single_flight = SingleFlight(client=fakeredis.FakeRedis(server=server))
+        page_statistics = PageTextStatistics(results={"fake": 1}, content_hash="a" * 64)
+
+        def fake_statistics(target_url, **kwargs):
+            server.connected = False
+            return page_statistics
+
+        mocked_get_cached_page_statistics.side_effect = fake_statistics
+
+        # When
+        result = get_coalesced_page_statistics(
+            "https://fake.com", parser="html.parser", single_flight=single_flight
+        )
+
+        # Then
+        assert result == page_statistics
+        mocked_get_cached_page_statistics.assert_called_once()
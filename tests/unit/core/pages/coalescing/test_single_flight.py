@@ -0,0 +1,91 @@
+"""
+This module holds tests for the `SingleFlight` class
+"""
+import concurrent.futures
+import threading
+import time
+
+import fakeredis
+import pytest
+
+from core.pages.coalescing import SingleFlight, SingleFlightTimeoutError
+
+
+def build_single_flight(server: fakeredis.FakeServer, **kwargs) -> SingleFlight:
+    return SingleFlight(
+        client=fakeredis.FakeRedis(server=server), poll_interval=0.01, **kwargs
+    )
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_with_the_same_key_compute_once(self):
+        """
+        Given many callers sharing a fake Redis server
+        When `do()` is called concurrently by each caller with the same key
+        Then `compute` is only called once and every caller receives its result
+        """
+        # Given
+        server = fakeredis.FakeServer()
+        compute_calls = []
+
+        def compute():
+            compute_calls.append(threading.get_ident())
+            time.sleep(0.1)
+            return {"fake": 1}
+
+        # When
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(
+                executor.map(
+                    lambda _: build_single_flight(server).do("fake_key", compute), range(8)
+                )
+            )
+
+        # Then
+        assert len(compute_calls) == 1
+        assert results == [{"fake": 1}] * 8
+
+    def test_waiting_caller_takes_over_when_lease_holder_fails(self):
+        """
+        Given a lease holder whose `compute` raises an error
+        When another caller is waiting on the same key
+        Then the waiting caller computes the result itself
+        """
+        # Given
+        server = fakeredis.FakeServer()
+        lease_taken = threading.Event()
+
+        def failing_compute():
+            lease_taken.set()
+            time.sleep(0.05)
+            raise ValueError
+
+        def lease_holder():
+            with pytest.raises(ValueError):
+                build_single_flight(server).do("fake_key", failing_compute)
+
+        thread = threading.Thread(target=lease_holder)
+        thread.start()
+        lease_taken.wait()
+
+        # When
+        result = build_single_flight(server).do("fake_key", lambda: {"fake": 2})
+
+        # Then
+        thread.join()
+        assert result == {"fake": 2}
+
+    def test_raises_error_when_no_result_is_published_in_time(self):
+        """
+        Given a lease which is held by another caller
+        When `do()` is called with a short `wait_timeout`
+        Then a `SingleFlightTimeoutError` is raised
+        """
+        # Given
+        server = fakeredis.FakeServer()
+        fakeredis.FakeRedis(server=server).set("nate:single-flight:lease:fake_key", "other")
+        single_flight = build_single_flight(server, wait_timeout=0.05)
+
+        # When / Then
+        with pytest.raises(SingleFlightTimeoutError):
+            single_flight.do("fake_key", lambda: {"fake": 3})
@@ -0,0 +1,130 @@
+"""
+This module holds tests for the `count_words_in_text_blocks` function
+"""
+import importlib.util
+import os
+from unittest import mock
+
+import pytest
+
+from core.pages import counting
+from core.pages.statistics import (
+    DEFAULT_TEXT_FILTERS,
+    get_html_text_statistics,
+    get_page_text_statistics,
+)
+from core.pages.streaming_crawler import find_visible_words_in_html
+
+AVAILABLE_STRATEGIES = [
+    strategy
+    for strategy in counting.COUNTING_STRATEGIES
+    if counting.is_counting_strategy_available(strategy)
+]
+
+
+class TestCountWordsInTextBlocks:
+    @pytest.mark.parametrize("strategy", AVAILABLE_STRATEGIES)
+    def test_strategies_count_the_same_words(self, strategy):
+        """
+        Given text blocks which span several small batches
+        When `count_words_in_text_blocks()` is called with each strategy
+        Then the words are counted as if they were counted 1 at a time,
+            without words being merged across blocks
+        """
+        # Given
+        text_blocks = ["fake html", "html", "\n  page 1 of ", "page", "fake"] * 10
+
+        # When
+        word_counts = counting.count_words_in_text_blocks(
+            text_blocks,
+            apply_text_filters=DEFAULT_TEXT_FILTERS,
+            strategy=strategy,
+            batch_characters=16,
+        )
+
+        # Then
+        assert word_counts == {"fake": 20, "html": 20, "page": 20, "of": 10}
+
+    @mock.patch("core.pages.counting.importlib.util.find_spec")
+    def test_falls_back_to_batched_if_numpy_is_not_installed(self, mocked_find_spec):
+        """
+        Given the "numpy" strategy is requested but `numpy` is not installed
+        When `select_counting_strategy()` is called
+        Then the "batched" strategy is selected
+
+        Patches:
+            `mocked_find_spec`: To mark `numpy` as not installed
+        """
+        # Given
+        mocked_find_spec.return_value = None
+
+        # When
+        selected_strategy = counting.select_counting_strategy("numpy")
+
+        # Then
+        assert selected_strategy == "batched"
+
+    def test_raises_error_for_unknown_strategy(self):
+        """
+        Given a strategy which does not exist
+        When `select_counting_strategy()` is called with it
+        Then an `UnknownCountingStrategyError` is raised
+        """
+        # When / Then
+        with pytest.raises(counting.UnknownCountingStrategyError):
+            counting.select_counting_strategy("fake")
+
+    @mock.patch.dict(os.environ, {"COUNTING_STRATEGY": "fake"})
+    def test_raises_error_for_unknown_strategy_on_import(self):
+        """
+        Given `COUNTING_STRATEGY` names a strategy which does not exist
+        When the `counting` module is imported
+        Then an `UnknownCountingStrategyError` is raised
+
+        Patches:
+            `os.environ`: To set `COUNTING_STRATEGY`
+        """
+        # Given
+        spec = importlib.util.find_spec("core.pages.counting")
+        module = importlib.util.module_from_spec(spec)
+
+        # When / Then
+        with pytest.raises(ValueError, match="fake"):
+            spec.loader.exec_module(module)
+
+    @mock.patch("core.pages.counting.DEFAULT_COUNTING_STRATEGY", "tokens")
+    def test_selects_the_configured_strategy_by_default(self):
+        """
+        Given `COUNTING_STRATEGY` was set to "tokens"
+        When `select_counting_strategy()` is called without a name
+        Then the "tokens" strategy is selected
+
+        Patches:
+            `DEFAULT_COUNTING_STRATEGY`: To select "tokens" as if set by `COUNTING_STRATEGY`
+        """
+        # When
+        selected_strategy = counting.select_counting_strategy()
+
+        # Then
+        assert selected_strategy == "tokens"
+
+    def test_text_block_parser_counts_the_same_words_as_streaming_parser(self):
+        """
+        Given html with visible and invisible text
+        When `get_html_text_statistics()` is called with a parser which yields text blocks
+        Then the same words are counted as by the streaming parser, which yields single words
+        """
+        # Given
+        html = (
+            b"<html><head><title>Fake</title><script>var a = 1;</script></head>"
+            b"<body><p>fake html <b>page</b> 2</p><div>html\npage</div></body></html>"
+        )
+
+        # When
+        page_text_statistics = get_html_text_statistics(html, parser="html.parser")
+
+        # Then
+        assert page_text_statistics == get_page_text_statistics(
+            "", text_scraper=lambda _: find_visible_words_in_html(html)
+        )
+        assert page_text_statistics == {"fake": 1, "html": 2, "page": 2}
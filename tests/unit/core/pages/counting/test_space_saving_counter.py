@@ -0,0 +1,67 @@
+"""
+This module holds tests for the `SpaceSavingCounter` class
+"""
+import collections
+
+import pytest
+
+from core.pages import counting
+
+
+class TestSpaceSavingCounter:
+    def test_counts_are_exact_if_the_vocabulary_fits(self):
+        """
+        Given batches holding no more distinct words than the capacity
+        When they are added to a `SpaceSavingCounter`
+        Then the counts are exact
+        """
+        # Given
+        batches = [["fake", "html", "fake"], ["page", "fake", "html"]]
+        space_saving_counter = counting.SpaceSavingCounter(capacity=3)
+
+        # When
+        for batch in batches:
+            space_saving_counter.update(collections.Counter(batch))
+
+        # Then
+        assert space_saving_counter.most_common() == {"fake": 3, "html": 2, "page": 1}
+        assert space_saving_counter.is_exact
+
+    def test_keeps_heavy_hitters_when_over_capacity(self):
+        """
+        Given a stream of many distinct words and 2 frequent words
+        When it is counted with a capacity smaller than the vocabulary
+        Then no more than the capacity is held,
+            the frequent words are kept and their counts are never underestimated
+        """
+        # Given
+        words = []
+        for index in range(1_000):
+            words.extend(["fake", f"rare{index}"])
+            if index % 2 == 0:
+                words.append("html")
+        word_batches = counting.iter_word_batches(words, batch_words=64)
+
+        # When
+        word_counts = counting.count_word_batches_with_space_saving(
+            word_batches, max_vocabulary=10
+        )
+
+        # Then
+        assert len(word_counts) <= 10
+        assert word_counts["fake"] >= 1_000
+        assert word_counts["html"] >= 500
+        assert [word for word, _ in word_counts.most_common(2)] == ["fake", "html"]
+
+    def test_raises_for_capacity_below_1(self):
+        """
+        Given a capacity of 0
+        When a `SpaceSavingCounter` is created
+        Then a `ValueError` is raised
+        """
+        # Given
+        capacity = 0
+
+        # When / Then
+        with pytest.raises(ValueError):
+            counting.SpaceSavingCounter(capacity=capacity)
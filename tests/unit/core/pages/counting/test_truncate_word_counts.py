@@ -0,0 +1,38 @@
+"""
+This module holds tests for the `truncate_word_counts` function
+"""
+from core.pages import counting
+
+
+class TestTruncateWordCounts:
+    def test_keeps_the_top_k_words_above_the_min_count(self):
+        """
+        Given word counts
+        When `truncate_word_counts()` is called with a `top_k` and a `min_count`
+        Then only the most frequent words occurring at least `min_count` times are kept
+        """
+        # Given
+        word_counts = {"fake": 5, "html": 3, "page": 2, "of": 1}
+
+        # When
+        truncated_word_counts = counting.truncate_word_counts(
+            word_counts, top_k=2, min_count=3
+        )
+
+        # Then
+        assert truncated_word_counts == {"fake": 5, "html": 3}
+
+    def test_keeps_every_word_without_options(self):
+        """
+        Given word counts
+        When `truncate_word_counts()` is called without a `top_k` or a `min_count`
+        Then every word is kept
+        """
+        # Given
+        word_counts = {"fake": 5, "of": 1}
+
+        # When
+        truncated_word_counts = counting.truncate_word_counts(word_counts)
+
+        # Then
+        assert truncated_word_counts == word_counts
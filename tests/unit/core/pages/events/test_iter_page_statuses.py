@@ -0,0 +1,125 @@
+"""
+This module holds tests for the `iter_page_statuses` function of the `events` module
+"""
+import asyncio
+import time
+from typing import List, Optional
+
+import fakeredis
+import fakeredis.aioredis
+
+from core.pages import events
+
+
+def _collect(statuses) -> List[Optional[str]]:
+    async def collect():
+        return [status async for status in statuses]
+
+    return asyncio.run(collect())
+
+
+class TestIterPageStatuses:
+    def test_event_wakes_waiter_once(self):
+        """
+        Given a page which is pending and a listener subscribed to page events
+        When the page is marked as done and the event is published
+        Then the done status is yielded once, straight away, without reading the status again
+        """
+        # Given
+        server = fakeredis.FakeServer()
+        publisher = events.PageEventPublisher(client=fakeredis.FakeRedis(server=server))
+        reads = []
+
+        async def read_status():
+            reads.append(1)
+            return "PENDING"
+
+        async def wait():
+            listener = events.PageEventListener(
+                client=fakeredis.aioredis.FakeRedis(server=server)
+            )
+            statuses = events.iter_page_statuses(
+                page_id=1,
+                read_status=read_status,
+                timeout=5,
+                listener=listener,
+                recheck_interval=5,
+            )
+            results = [await statuses.__anext__()]
+
+            # When
+            publisher.publish([2], "DONE")
+            publisher.publish([1], "DONE")
+            results += [status async for status in statuses]
+            await listener.close()
+            return results
+
+        started_at = time.monotonic()
+        statuses = asyncio.run(wait())
+        elapsed = time.monotonic() - started_at
+
+        # Then
+        assert statuses == ["PENDING", "DONE"]
+        assert len(reads) == 1
+        assert elapsed < 5
+
+    def test_rechecks_status_without_listener(self):
+        """
+        Given a page which becomes done between 2 reads of its status and no listener
+        When the statuses are iterated with a short recheck interval
+        Then the pending and done statuses are each yielded once
+        """
+        # Given
+        read_statuses = iter(["PENDING", "PENDING", "DONE"])
+
+        async def read_status():
+            return next(read_statuses)
+
+        # When
+        statuses = _collect(
+            events.iter_page_statuses(
+                page_id=1, read_status=read_status, timeout=5, recheck_interval=0.01
+            )
+        )
+
+        # Then
+        assert statuses == ["PENDING", None, "DONE"]
+
+    def test_returns_immediately_for_final_status(self):
+        """
+        Given a page which has already failed
+        When the statuses are iterated
+        Then only the failed status is yielded
+        """
+        # Given
+        async def read_status():
+            return "FAILED"
+
+        # When
+        statuses = _collect(
+            events.iter_page_statuses(page_id=1, read_status=read_status, timeout=5)
+        )
+
+        # Then
+        assert statuses == ["FAILED"]
+
+    def test_stops_at_timeout(self):
+        """
+        Given a page which stays pending
+        When the statuses are iterated with a timeout shorter than the recheck interval
+        Then the pending status is yielded and the iteration stops at the timeout
+        """
+        # Given
+        async def read_status():
+            return "PENDING"
+
+        # When
+        statuses = _collect(
+            events.iter_page_statuses(
+                page_id=1, read_status=read_status, timeout=0.05, recheck_interval=1
+            )
+        )
+
+        # Then
+        assert statuses[0] == "PENDING"
+        assert set(statuses[1:]) <= {None}
@@ -0,0 +1,41 @@
+"""
+This module holds tests for the `publish_page_statuses` function of the `events` module
+"""
+from unittest import mock
+
+import redis
+
+from core.pages import events
+
+
+class TestPublishPageStatuses:
+    def test_publishes_1_event_per_page(self):
+        """
+        Given a publisher
+        When the statuses of 2 pages are published
+        Then 1 event is sent on the channel of each page
+        """
+        # Given
+        publisher = mock.Mock(spec=events.PageEventPublisher)
+
+        # When
+        events.publish_page_statuses([1, 2], "DONE", publisher=publisher)
+
+        # Then
+        publisher.publish.assert_called_once_with([1, 2], "DONE")
+
+    def test_redis_errors_are_not_raised(self, caplog):
+        """
+        Given a publisher which cannot reach Redis
+        When the status of a page is published
+        Then the error is logged rather than raised
+        """
+        # Given
+        publisher = mock.Mock(spec=events.PageEventPublisher)
+        publisher.publish.side_effect = redis.ConnectionError
+
+        # When
+        events.publish_page_statuses([1], "DONE", publisher=publisher)
+
+        # Then
+        assert "Could not publish the DONE status of 1 pages" in caplog.text
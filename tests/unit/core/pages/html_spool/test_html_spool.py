@@ -0,0 +1,42 @@
+"""
+This module holds tests for the `HtmlSpool` class
+"""
+import pytest
+
+from core.pages.html_spool import HtmlNotFoundError, HtmlSpool
+
+
+class TestHtmlSpool:
+    def test_html_is_read_back_by_reference_until_deleted(self, tmp_path):
+        """
+        Given html which has been written to the spool
+        When it is read back by its reference and then deleted
+        Then the original html is returned and can no longer be read
+        """
+        # Given
+        html_spool = HtmlSpool(directory=str(tmp_path))
+        reference = html_spool.put(b"<p>fake html</p>")
+
+        # When
+        html = html_spool.get(reference)
+        html_spool.delete(reference)
+
+        # Then
+        assert html == b"<p>fake html</p>"
+        with pytest.raises(HtmlNotFoundError):
+            html_spool.get(reference)
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.parametrize("reference", ["../../etc/passwd", "", "FAKE"])
+    def test_raises_error_for_reference_not_made_by_spool(self, tmp_path, reference):
+        """
+        Given a reference which was not returned by `put()`
+        When it is used to read from the spool
+        Then a `ValueError` is raised rather than a path outside the spool being read
+        """
+        # Given
+        html_spool = HtmlSpool(directory=str(tmp_path))
+
+        # When / Then
+        with pytest.raises(ValueError):
+            html_spool.get(reference)
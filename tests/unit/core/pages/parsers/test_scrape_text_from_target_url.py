@@ -0,0 +1,53 @@
+"""
+This module holds tests for the `scrape_text_from_target_url` function
+"""
+from unittest import mock
+
+import pytest
+
+from core.pages.parsers import get_available_parsers, scrape_text_from_target_url
+
+
+class TestScrapeTextFromTargetURL:
+    @mock.patch("core.pages.parsers.fetcher.iter_url_chunks")
+    def test_iter_url_chunks_is_called_with_target_url(self, mocked_iter_url_chunks):
+        """
+        Given a fake target url
+        When `scrape_text_from_target_url()` is called
+        Then `iter_url_chunks()` is called with the fake target url
+
+        Patches:
+            `mocked_iter_url_chunks`: For the main assertion
+        """
+        # Given
+        fake_target_url = "fake_target_url"
+        mocked_iter_url_chunks.return_value = [b"<p>fake html</p>"]
+
+        # When
+        scrape_text_from_target_url(fake_target_url)
+
+        # Then
+        mocked_iter_url_chunks.assert_called_once_with(fake_target_url)
+
+    @pytest.mark.parametrize("parser", get_available_parsers())
+    @mock.patch("core.pages.parsers.fetcher.iter_url_chunks")
+    def test_every_available_parser_returns_visible_words(self, mocked_iter_url_chunks, parser):
+        """
+        Given fake html containing visible and invisible text
+        When `scrape_text_from_target_url()` is called with each available parser
+        Then only the visible words are returned
+
+        Patches:
+            `mocked_iter_url_chunks`: So the return value can be set to the fake html
+        """
+        # Given
+        mocked_iter_url_chunks.return_value = [
+            b"<html><head><title>hidden</title></head>",
+            b"<body><p>fake html</p><script>hidden</script></body></html>",
+        ]
+
+        # When
+        visible_words = scrape_text_from_target_url(mock.Mock(), parser=parser)
+
+        # Then
+        assert list(visible_words) == ["fake", "html"]
@@ -0,0 +1,80 @@
+"""
+This module holds tests for the `select_parser` function
+"""
+from unittest import mock
+
+import pytest
+
+from core.pages.parsers import UnknownParserError, select_parser
+
+
+class TestSelectParser:
+    @mock.patch("core.pages.parsers.is_parser_available")
+    def test_returns_requested_parser_if_available(self, mocked_is_parser_available):
+        """
+        Given a requested parser which is installed
+        When `select_parser()` is called with the requested parser
+        Then the requested parser is returned
+
+        Patches:
+            `mocked_is_parser_available`: To mark the requested parser as installed
+        """
+        # Given
+        mocked_is_parser_available.return_value = True
+        requested_parser = "html5lib"
+
+        # When
+        selected_parser = select_parser(requested_parser)
+
+        # Then
+        assert selected_parser == requested_parser
+
+    @mock.patch("core.pages.parsers.importlib.util.find_spec")
+    def test_falls_back_to_fastest_parser_if_requested_is_not_installed(
+        self, mocked_find_spec
+    ):
+        """
+        Given a requested parser whose required module is not installed
+        When `select_parser()` is called with the requested parser
+        Then the fastest parser without a required module is returned
+
+        Patches:
+            `mocked_find_spec`: To mark every optional module as not installed
+        """
+        # Given
+        mocked_find_spec.return_value = None
+
+        # When
+        selected_parser = select_parser("lxml")
+
+        # Then
+        assert selected_parser == "streaming"
+
+    @mock.patch("core.pages.parsers.DEFAULT_PARSER", "html.parser")
+    def test_uses_configured_parser_if_none_is_requested(self):
+        """
+        Given a parser configured via the `HTML_PARSER` environment variable
+        When `select_parser()` is called without a requested parser
+        Then the configured parser is returned
+
+        Patches:
+            `DEFAULT_PARSER`: To simulate the configured parser
+        """
+        # Given / When
+        selected_parser = select_parser()
+
+        # Then
+        assert selected_parser == "html.parser"
+
+    def test_raises_error_for_unknown_parser(self):
+        """
+        Given the name of a parser which has not been registered
+        When `select_parser()` is called with that name
+        Then an `UnknownParserError` is raised
+        """
+        # Given
+        fake_parser = "fake_parser"
+
+        # When / Then
+        with pytest.raises(UnknownParserError):
+            select_parser(fake_parser)
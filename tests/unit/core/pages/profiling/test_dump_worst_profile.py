@@ -0,0 +1,67 @@
+"""
+This module holds tests for the `dump_worst_profile` function
+"""
+import cProfile
+import os
+
+from core.pages.profiling import dump_worst_profile
+
+
+def build_profiler() -> cProfile.Profile:
+    profiler = cProfile.Profile()
+    profiler.enable()
+    sum(range(10))
+    profiler.disable()
+    return profiler
+
+
+class TestDumpWorstProfile:
+    def test_only_slowest_dumps_are_kept(self, tmp_path):
+        """
+        Given a directory holding the dumps of 2 pages, with 2 dumps to be kept
+        When a page slower than both is dumped
+        Then the dump of the fastest page is deleted
+        """
+        # Given
+        dump_dir = str(tmp_path)
+        for page_id, wall_seconds in [(1, 1), (2, 3)]:
+            dump_worst_profile(
+                build_profiler(),
+                page_id=page_id,
+                wall_seconds=wall_seconds,
+                dump_dir=dump_dir,
+                dump_worst=2,
+            )
+
+        # When
+        path = dump_worst_profile(
+            build_profiler(), page_id=3, wall_seconds=10, dump_dir=dump_dir, dump_worst=2
+        )
+
+        # Then
+        assert path == os.path.join(dump_dir, "0000010000ms-page-3.pstats")
+        assert sorted(os.listdir(dump_dir)) == [
+            "0000003000ms-page-2.pstats",
+            "0000010000ms-page-3.pstats",
+        ]
+
+    def test_faster_page_is_not_dumped(self, tmp_path):
+        """
+        Given a directory holding as many dumps as are to be kept
+        When a page faster than all of them is dumped
+        Then nothing is written
+        """
+        # Given
+        dump_dir = str(tmp_path)
+        dump_worst_profile(
+            build_profiler(), page_id=1, wall_seconds=5, dump_dir=dump_dir, dump_worst=1
+        )
+
+        # When
+        path = dump_worst_profile(
+            build_profiler(), page_id=2, wall_seconds=1, dump_dir=dump_dir, dump_worst=1
+        )
+
+        # Then
+        assert path is None
+        assert os.listdir(dump_dir) == ["0000005000ms-page-1.pstats"]
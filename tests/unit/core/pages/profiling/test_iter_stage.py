@@ -0,0 +1,43 @@
+"""
+This module holds tests for the `iter_stage` function
+"""
+from core.pages.profiling import StageTimer, iter_stage, profile_scrape
+
+
+class TestIterStage:
+    def test_iterable_is_returned_as_it_is_when_not_profiling(self):
+        """
+        Given no scrape being profiled
+        When `iter_stage()` is called
+        Then the iterable is returned as it is
+        """
+        # Given
+        chunks = [b"fake", b"chunks"]
+
+        # When
+        timed_chunks = iter_stage(chunks, "fetch")
+
+        # Then
+        assert timed_chunks is chunks
+
+    def test_only_time_spent_producing_items_is_counted(self):
+        """
+        Given a scrape being profiled
+        When the items of the iterable are consumed from within another stage
+        Then all items are yielded, with the time spent producing them counted as "fetch"
+            and the time spent consuming them counted as "parse"
+        """
+        # Given
+        timer = StageTimer()
+        consumed = []
+
+        # When
+        with profile_scrape(timer, page_id=1, dump_dir=""):
+            chunks = iter_stage(iter([b"fake", b"chunks"]), "fetch")
+            with timer.stage("parse"):
+                for chunk in chunks:
+                    consumed.append(chunk)
+
+        # Then
+        assert consumed == [b"fake", b"chunks"]
+        assert set(timer.as_dict()["stages"]) == {"other", "parse", "fetch"}
@@ -0,0 +1,86 @@
+"""
+This module holds tests for the `StageTimer` class
+"""
+from unittest import mock
+
+from core.pages.profiling import StageTimer
+
+
+class TestStageTimer:
+    @mock.patch("core.pages.profiling.time.thread_time")
+    @mock.patch("core.pages.profiling.time.perf_counter")
+    def test_nested_stages_are_counted_exclusively(self, mocked_perf_counter, mocked_thread_time):
+        """
+        Given a timer with a "fetch" stage entered from within a "parse" stage
+        When the timings are built
+        Then the time spent in "fetch" is not counted towards "parse"
+            and the stages add up to the total
+
+        Patches:
+            `mocked_perf_counter`: To control the wall time
+            `mocked_thread_time`: To control the CPU time
+        """
+        # Given
+        mocked_perf_counter.side_effect = [0, 1, 2, 5, 6, 7]
+        mocked_thread_time.side_effect = [0, 0.5, 1, 1.5, 3, 3.5]
+        timer = StageTimer()
+
+        # When
+        with timer.stage("parse"):
+            with timer.stage("fetch"):
+                pass
+        timer.stop()
+        timings = timer.as_dict()
+
+        # Then
+        assert timings == {
+            "wall_seconds": 7,
+            "cpu_seconds": 3.5,
+            "stages": {
+                "other": {"wall_seconds": 2, "cpu_seconds": 1},
+                "parse": {"wall_seconds": 2, "cpu_seconds": 2},
+                "fetch": {"wall_seconds": 3, "cpu_seconds": 0.5},
+            },
+        }
+
+    def test_added_time_is_counted_towards_stage(self):
+        """
+        Given a stopped timer
+        When time spent on the page elsewhere is added to a stage
+        Then it is counted towards that stage and the total
+        """
+        # Given
+        timer = StageTimer()
+        timer.stop()
+
+        # When
+        timer.add("persist", wall_seconds=2, cpu_seconds=1)
+
+        # Then
+        assert timer.wall_seconds["persist"] == 2
+        assert timer.cpu_seconds["persist"] == 1
+        assert timer.total_wall_seconds >= 2
+
+    def test_timer_is_rebuilt_from_its_timings(self):
+        """
+        Given the timings of a page built by another task
+        When a timer is rebuilt from them and carried on
+        Then the stages so far are kept and the new stages are added to them
+        """
+        # Given
+        timings = {
+            "wall_seconds": 3,
+            "cpu_seconds": 1,
+            "stages": {"fetch": {"wall_seconds": 3, "cpu_seconds": 1}},
+        }
+
+        # When
+        timer = StageTimer.from_dict(timings)
+        timer.add("parse", wall_seconds=2, cpu_seconds=2)
+
+        # Then
+        assert timer.as_dict()["stages"] == {
+            "fetch": {"wall_seconds": 3, "cpu_seconds": 1},
+            "parse": {"wall_seconds": 2, "cpu_seconds": 2},
+        }
+        assert timer.total_wall_seconds == 5
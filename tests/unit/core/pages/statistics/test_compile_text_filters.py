@@ -0,0 +1,60 @@
+"""
+This module holds tests for the `compile_text_filters` function
+"""
+from core.pages import string_utils
+from core.pages.statistics import compile_text_filters, get_page_text_statistics
+
+
+class TestCompileTextFilters:
+    def test_token_filters_drop_rejected_strings(self):
+        """
+        Given a filter built from a `rejects` check
+        When the filters are compiled and applied
+        Then strings are dropped by the `rejects` check
+        """
+        # Given
+        token_filter = string_utils.build_token_filter(str.isupper)
+
+        # When
+        apply_text_filters = compile_text_filters([token_filter])
+        filtered_text = list(apply_text_filters(["keep", "DROP", "this"]))
+
+        # Then
+        assert filtered_text == ["keep", "this"]
+
+    def test_custom_filters_are_applied_in_order_with_token_filters(self):
+        """
+        Given a custom filter which maps strings, placed between 2 token filters
+        When the filters are compiled and applied
+        Then each filter sees the output of the filter before it
+        """
+        # Given
+        text_filters = [
+            string_utils.filter_out_text_with_digits,
+            lambda text_items: (text_item.upper() for text_item in text_items),
+            string_utils.build_token_filter(lambda text_item: text_item.startswith("B")),
+        ]
+
+        # When
+        apply_text_filters = compile_text_filters(text_filters)
+        filtered_text = list(apply_text_filters(["a1", "alpha", "beta", "gamma"]))
+
+        # Then
+        assert filtered_text == ["ALPHA", "GAMMA"]
+
+    def test_default_filters_drop_text_with_digits(self):
+        """
+        Given scraped text including strings with ascii and non-ascii digits
+        When `get_page_text_statistics()` is called with the default filters
+        Then only the strings without digits are counted
+        """
+        # Given
+        scraped_text = ["fake", "fake", "2022", "v1", "١٢", "html"]
+
+        # When
+        page_text_statistics = get_page_text_statistics(
+            "https://fake.com", text_scraper=lambda _: iter(scraped_text)
+        )
+
+        # Then
+        assert page_text_statistics == {"fake": 2, "html": 1}
@@ -0,0 +1,39 @@
+"""
+This module holds tests for the `get_html_chunks_text_statistics` function
+"""
+from unittest import mock
+
+from core.pages import counting, parsers
+from core.pages.statistics import get_html_chunks_text_statistics
+
+
+class TestGetHtmlChunksTextStatistics:
+    @mock.patch("core.pages.statistics.count_word_frequencies")
+    @mock.patch(
+        "core.pages.statistics.counting.count_words_in_text_blocks",
+        wraps=counting.count_words_in_text_blocks,
+    )
+    def test_default_parser_counts_text_blocks_in_batches(
+        self, spied_count_words_in_text_blocks, mocked_count_word_frequencies
+    ):
+        """
+        Given html chunks and no parser requested
+        When `get_html_chunks_text_statistics()` is called
+        Then the text blocks of the default parser are counted in batches
+            rather than 1 word at a time
+
+        Patches:
+            `spied_count_words_in_text_blocks`: For the main assertion
+            `mocked_count_word_frequencies`: To check words are not counted 1 at a time
+        """
+        # Given
+        html_chunks = [b"<html><body><p>fake html ", b"page</p><p>fake 2</p></body></html>"]
+
+        # When
+        results = get_html_chunks_text_statistics(html_chunks)
+
+        # Then
+        assert parsers.select_parser() == "streaming"
+        spied_count_words_in_text_blocks.assert_called_once()
+        mocked_count_word_frequencies.assert_not_called()
+        assert results == {"fake": 2, "html": 1, "page": 1}
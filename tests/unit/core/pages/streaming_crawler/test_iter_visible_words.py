@@ -0,0 +1,58 @@
+"""
+This module holds tests for the `iter_visible_words` function
+"""
+from core.pages.streaming_crawler import iter_visible_words
+
+
+class TestIterVisibleWords:
+    def test_uses_specified_invalid_tag_types(self):
+        """
+        Given html with text inside a `p` and a `span` tag
+        When `iter_visible_words()` is called with `invalid_tag_types` of `["span"]`
+        Then only the text within the `p` tag is returned
+        """
+        # Given
+        html_chunks = ["<body><p>shown</p><span>hidden</span></body>"]
+
+        # When
+        visible_words = iter_visible_words(html_chunks, invalid_tag_types=["span"])
+
+        # Then
+        assert list(visible_words) == ["shown"]
+
+    def test_decodes_characters_split_across_chunks(self):
+        """
+        Given a multi-byte character which is split across 2 byte chunks
+        When `iter_visible_words()` is called with an `encoding`
+        Then the character is decoded as a whole
+        """
+        # Given
+        encoded_word = "café".encode("utf-8")
+        html_chunks = [b"<p>" + encoded_word[:-1], encoded_word[-1:] + b"</p>"]
+
+        # When
+        visible_words = iter_visible_words(html_chunks, encoding="utf-8")
+
+        # Then
+        assert list(visible_words) == ["café"]
+
+    def test_yields_words_before_all_chunks_are_read(self):
+        """
+        Given a generator of html chunks
+        When the first word is taken from `iter_visible_words()`
+        Then the remaining chunks have not been read
+        """
+        # Given
+        chunks_read = []
+
+        def html_chunks():
+            for chunk in ["<p>first</p>", "<p>second</p>", "<p>third</p>"]:
+                chunks_read.append(chunk)
+                yield chunk
+
+        # When
+        first_word = next(iter_visible_words(html_chunks()))
+
+        # Then
+        assert first_word == "first"
+        assert len(chunks_read) == 1
@@ -0,0 +1,88 @@
+"""
+This module holds parity tests between the `streaming_crawler` and the `beautiful_soup_crawler`
+"""
+import pytest
+
+from core.pages.beautiful_soup_crawler import (
+    filter_for_visible_text,
+    find_all_text_in_html,
+)
+from core.pages.streaming_crawler import (
+    find_visible_words_in_html,
+    iter_chunks,
+    iter_visible_text_blocks,
+)
+
+HTML_DOCUMENTS = [
+    "<html><head><title>Title text</title></head><body><p>Hello world</p></body></html>",
+    "<!DOCTYPE html><html><body>Some <b>bold</b> and <i>italic</i> text</body></html>",
+    "<body><script>var a = '<p>not text</p>';</script><style>p {}</style>Visible</body>",
+    "<body><!-- a comment --><p>after comment</p></body>",
+    "<head><meta charset='utf-8'><meta name='x' content='y' /><noscript>Shown</noscript></head>",
+    "<body><p>unclosed <div>nested </p> closing </div> tail</body>",
+    "<body>line<br>break<br/>and<br></br>again</body>",
+    "<body><p>split&amp;joined &copy 2022 &#150; &#x41;&foo;</p></body>",
+    "<body><![CDATA[cdata text]]><?php processing ?></body>",
+    "text before any tag <p>inside</p> text after </html>",
+    "<title><b>bold title</b></title><head>orphaned head text</head>",
+    "<body><template>template text</template><textarea>area text</textarea></body>",
+    "",
+]
+
+
+class TestParityWithBeautifulSoup:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+    @pytest.mark.parametrize("html", HTML_DOCUMENTS)
+    def test_visible_words_match_beautiful_soup(self, html, chunk_size):
+        """
+        Given a html document
+        When `find_visible_words_in_html()` is called with any `chunk_size`
+        Then the same words are returned in the same order
+            as the `BeautifulSoup` based crawler
+        """
+        # Given
+        expected_words = list(filter_for_visible_text(find_all_text_in_html(html)))
+
+        # When
+        visible_words = list(find_visible_words_in_html(html, chunk_size=chunk_size))
+
+        # Then
+        assert visible_words == expected_words
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+    @pytest.mark.parametrize("html", HTML_DOCUMENTS)
+    def test_visible_text_blocks_hold_the_same_words(self, html, chunk_size):
+        """
+        Given a html document
+        When `iter_visible_text_blocks()` is called with any `chunk_size`
+        Then the blocks hold the same words in the same order
+            as the `BeautifulSoup` based crawler
+        """
+        # Given
+        expected_words = list(filter_for_visible_text(find_all_text_in_html(html)))
+
+        # When
+        text_blocks = list(iter_visible_text_blocks(iter_chunks(html, chunk_size=chunk_size)))
+
+        # Then
+        assert " ".join(text_blocks).split() == expected_words
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 64 * 1024])
+    def test_visible_words_match_beautiful_soup_for_encoded_html(self, chunk_size):
+        """
+        Given a utf-8 encoded html document which declares its charset
+        When `find_visible_words_in_html()` is called with any `chunk_size`
+        Then the same words are returned as the `BeautifulSoup` based crawler
+        """
+        # Given
+        html = (
+            "<html><head><meta charset='utf-8'></head>"
+            "<body><p>Café déjà vu – naïve résumé</p></body></html>"
+        ).encode("utf-8")
+        expected_words = list(filter_for_visible_text(find_all_text_in_html(html)))
+
+        # When
+        visible_words = list(find_visible_words_in_html(html, chunk_size=chunk_size))
+
+        # Then
+        assert visible_words == expected_words
@@ -0,0 +1,40 @@
+"""
+This module holds tests for the `migrate` function
+"""
+from unittest import mock
+
+from db.migrations import PAGE_TABLE_MIGRATION, migrate
+
+
+class TestMigrate:
+    def test_statements_are_run_in_1_transaction_under_a_lock(self):
+        """
+        Given an engine
+        When `migrate()` is called
+        Then the migration lock is taken first
+            and then every statement is run within the same transaction
+        """
+        # Given
+        mocked_engine = mock.MagicMock()
+        mocked_connection = mocked_engine.begin.return_value.__enter__.return_value
+
+        # When
+        migrate(bind=mocked_engine)
+
+        # Then
+        mocked_engine.begin.assert_called_once()
+        executed_statements = [
+            str(call.args[0]) for call in mocked_connection.execute.call_args_list
+        ]
+        assert executed_statements[0] == "SELECT pg_advisory_xact_lock(:lock_id)"
+        assert executed_statements[1:] == PAGE_TABLE_MIGRATION
+
+    def test_statements_only_add_what_is_missing(self):
+        """
+        Given the statements of the migration
+        When they are checked
+        Then each of them does nothing if it has already been applied
+        """
+        # When / Then
+        for statement in PAGE_TABLE_MIGRATION:
+            assert "IF NOT EXISTS" in statement or "IF EXISTS" in statement
@@ -0,0 +1,35 @@
+"""
+This module holds tests for the `decode_cursor` function
+"""
+import pytest
+
+from db.models.cursors import InvalidCursorError, decode_cursor, encode_cursor
+
+
+class TestDecodeCursor:
+    def test_returns_position_given_to_encode_cursor(self):
+        """
+        Given a cursor encoded from a position
+        When `decode_cursor()` is called with the cursor
+        Then the original position is returned
+        """
+        # Given
+        position = {"word": "fake", "count": 3}
+        cursor = encode_cursor(position)
+
+        # When
+        decoded_position = decode_cursor(cursor)
+
+        # Then
+        assert decoded_position == position
+
+    @pytest.mark.parametrize("cursor", ["!!", "bm90IGpzb24=", "WzFd"])
+    def test_raises_error_for_invalid_cursor(self, cursor):
+        """
+        Given a cursor which is not base64, not JSON or not a JSON object
+        When `decode_cursor()` is called with the cursor
+        Then an `InvalidCursorError` is raised
+        """
+        # Given / When / Then
+        with pytest.raises(InvalidCursorError):
+            decode_cursor(cursor)
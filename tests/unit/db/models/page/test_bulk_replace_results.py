@@ -0,0 +1,35 @@
+"""
+This module holds tests for the `Page.bulk_replace_results` method
+"""
+from unittest import mock
+
+from db.models.page import Page
+
+
+class TestBulkReplaceResults:
+    @mock.patch("db.models.page.publish_page_statuses")
+    def test_status_is_not_written_or_published(self, mocked_publish_page_statuses):
+        """
+        Given a page with new results
+        When `Page.bulk_replace_results()` is called
+        Then the results and their orderings are written without the status
+            and no status change is published
+
+        Patches:
+            `mocked_publish_page_statuses`: For the main assertion
+        """
+        # Given
+        mocked_db = mock.MagicMock()
+        pages = [{"id": 1, "results": {"a": 1, "b": 2}, "html_blob_key": "a" * 64}]
+
+        # When
+        Page.bulk_replace_results(pages=pages, db=mocked_db)
+
+        # Then
+        statement, parameters = mocked_db.execute.call_args.args
+        written_columns = {column.key for column in statement._values}
+        assert "status" not in written_columns
+        assert {"results", "results_by_frequency"} <= written_columns
+        assert parameters[0]["page_results_by_frequency"] == [("b", 2), ("a", 1)]
+        mocked_db.commit.assert_called_once()
+        mocked_publish_page_statuses.assert_not_called()
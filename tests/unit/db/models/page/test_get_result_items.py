@@ -0,0 +1,66 @@
+"""
+This module holds tests for the `get_result_items` method of the `Page` model
+"""
+import pytest
+
+from db.models.page import Page, build_ordered_results
+
+
+class TestGetResultItems:
+    @pytest.mark.parametrize(
+        "ordering, expected_result_items",
+        [
+            ("frequency", [["b", 3], ["c", 2], ["a", 1]]),
+            ("alphabetical", [["a", 1], ["b", 3], ["c", 2]]),
+        ],
+    )
+    def test_returns_stored_orderings_without_sorting(self, ordering, expected_result_items):
+        """
+        Given a page whose orderings were stored when it was done
+        When `get_result_items()` is called with each ordering
+        Then the stored ordering is returned as it is
+        """
+        # Given
+        page = Page(
+            results={"a": 1, "b": 3, "c": 2},
+            results_by_frequency=[["b", 3], ["c", 2], ["a", 1]],
+            results_by_alphabetical=[["a", 1], ["b", 3], ["c", 2]],
+        )
+
+        # When
+        result_items = page.get_result_items(ordering=ordering)
+
+        # Then
+        assert result_items == expected_result_items
+
+    def test_sorts_results_if_orderings_were_not_stored(self):
+        """
+        Given a page which was done before orderings were stored
+        When the results are ordered by frequency and alphabetically
+        Then the results are sorted as they would have been stored
+        """
+        # Given
+        results = {"a": 1, "b": 3, "c": 2}
+        page = Page(results=results)
+        ordered_results = build_ordered_results(results)
+
+        # When
+        results_by_frequency = page.get_results_ordered_by_frequency()
+        results_by_alphabetical = page.get_results_ordered_by_alphabetical()
+
+        # Then
+        assert results_by_frequency == dict(ordered_results["results_by_frequency"])
+        assert list(results_by_frequency) == ["b", "c", "a"]
+        assert list(results_by_alphabetical) == ["a", "b", "c"]
+
+    def test_returns_no_items_for_a_page_without_results(self):
+        """
+        Given a page which has not been scraped
+        When the results are ordered by frequency
+        Then an empty dict is returned
+        """
+        # Given
+        page = Page(results=None)
+
+        # When / Then
+        assert page.get_results_ordered_by_frequency() == {}
@@ -0,0 +1,62 @@
+"""
+This module holds tests for the `InstrumentedQueuePool` class
+"""
+from unittest import mock
+
+import pytest
+from sqlalchemy import exc
+
+from db.pool import POOL_CHECKOUT_TIMEOUTS, POOL_CHECKOUT_WAIT_SECONDS, InstrumentedQueuePool
+
+
+def get_sample_value(metric, name: str) -> float:
+    for collected_metric in metric.collect():
+        for sample in collected_metric.samples:
+            if sample.name == name and sample.labels.get("pool") == "sync":
+                return sample.value
+    return 0.0
+
+
+class TestInstrumentedQueuePool:
+    def test_records_wait_of_each_checkout(self):
+        """
+        Given an instrumented pool
+        When a connection is checked out
+        Then the wait is recorded in the checkout histogram
+        """
+        # Given
+        pool = InstrumentedQueuePool(creator=mock.Mock, pool_size=1, max_overflow=0)
+        checkouts_before = get_sample_value(
+            POOL_CHECKOUT_WAIT_SECONDS, "nate_db_pool_checkout_wait_seconds_count"
+        )
+
+        # When
+        pool.connect().close()
+
+        # Then
+        checkouts_after = get_sample_value(
+            POOL_CHECKOUT_WAIT_SECONDS, "nate_db_pool_checkout_wait_seconds_count"
+        )
+        assert checkouts_after == checkouts_before + 1
+
+    def test_counts_checkouts_which_time_out(self):
+        """
+        Given an instrumented pool whose only connection is checked out
+        When another connection is requested
+        Then the checkout times out and is counted
+        """
+        # Given
+        pool = InstrumentedQueuePool(creator=mock.Mock, pool_size=1, max_overflow=0, timeout=0.01)
+        held_connection = pool.connect()
+        timeouts_before = get_sample_value(
+            POOL_CHECKOUT_TIMEOUTS, "nate_db_pool_checkout_timeouts_total"
+        )
+
+        # When
+        with pytest.raises(exc.TimeoutError):
+            pool.connect()
+
+        # Then
+        timeouts_after = get_sample_value(POOL_CHECKOUT_TIMEOUTS, "nate_db_pool_checkout_timeouts_total")
+        assert timeouts_after == timeouts_before + 1
+        held_connection.close()
@@ -0,0 +1,84 @@
+"""
+This module holds tests for the `provide_session` decorator
+"""
+from unittest import mock
+
+import pytest
+
+from db.session import provide_session
+
+
+@provide_session
+def fake_query(value, db=None):
+    return value, db
+
+
+class TestProvideSession:
+    @mock.patch("db.session.SessionLocal")
+    def test_uses_given_session_without_closing_it(self, mocked_session_local):
+        """
+        Given a caller which passes its own `db`
+        When the decorated function is called
+        Then that session is used and is left open for the caller
+
+        Patches:
+            `mocked_session_local`: To check that no session is created
+        """
+        # Given
+        mocked_db = mock.Mock()
+
+        # When
+        value, db = fake_query(1, db=mocked_db)
+
+        # Then
+        assert db == mocked_db
+        mocked_session_local.assert_not_called()
+        mocked_db.close.assert_not_called()
+
+    @mock.patch("db.session.SessionLocal")
+    def test_provides_session_which_is_committed_and_closed(self, mocked_session_local):
+        """
+        Given a caller which does not pass a `db`
+        When the decorated function is called
+        Then a session is provided, committed once the function returns and then closed
+
+        Patches:
+            `mocked_session_local`: For the main assertion
+        """
+        # Given
+        mocked_db = mocked_session_local.return_value
+
+        # When
+        value, db = fake_query(1)
+
+        # Then
+        assert (value, db) == (1, mocked_db)
+        mocked_session_local.assert_called_once_with(expire_on_commit=False)
+        mocked_db.commit.assert_called_once()
+        mocked_db.close.assert_called_once()
+
+    @mock.patch("db.session.SessionLocal")
+    def test_rolls_back_and_closes_provided_session_on_error(self, mocked_session_local):
+        """
+        Given a decorated function which raises an error
+        When it is called without a `db`
+        Then the provided session is rolled back and closed, and the error is raised
+
+        Patches:
+            `mocked_session_local`: For the main assertion
+        """
+        # Given
+        mocked_db = mocked_session_local.return_value
+
+        @provide_session
+        def failing_query(db=None):
+            raise ValueError
+
+        # When
+        with pytest.raises(ValueError):
+            failing_query()
+
+        # Then
+        mocked_db.commit.assert_not_called()
+        mocked_db.rollback.assert_called_once()
+        mocked_db.close.assert_called_once()
@@ -0,0 +1,70 @@
+"""
+This module holds tests for the `CompressedJSON` column type
+"""
+import collections
+
+import pytest
+
+from db.types import CompressedJSON, is_compression_available
+
+
+class TestCompressedJSON:
+    @pytest.mark.parametrize("compression", ["zlib", "zstd"])
+    def test_values_are_read_back_whichever_codec_wrote_them(self, compression):
+        """
+        Given a `Counter` written with each codec
+        When the stored value is read back by a column with the default codec
+        Then the results are returned as a dict
+        """
+        # Given
+        if not is_compression_available(compression):
+            pytest.skip(f"{compression} is not installed")
+        results = collections.Counter({"fake": 2, "html": 1})
+        stored_value = CompressedJSON(compression=compression).process_bind_param(
+            results, dialect=None
+        )
+
+        # When
+        value = CompressedJSON().process_result_value(memoryview(stored_value), dialect=None)
+
+        # Then
+        assert value == {"fake": 2, "html": 1}
+        assert len(stored_value) < len(b'{"fake":2,"html":1}') * 2
+
+    def test_none_is_stored_as_null(self):
+        """
+        Given a page without results
+        When its results are written and read back
+        Then they are stored as null
+        """
+        # Given
+        compressed_json = CompressedJSON()
+
+        # When
+        stored_value = compressed_json.process_bind_param(None, dialect=None)
+
+        # Then
+        assert stored_value is None
+        assert compressed_json.process_result_value(stored_value, dialect=None) is None
+
+    @pytest.mark.parametrize(
+        "stored_value",
+        [
+            {"fake": 2, "html": 1},
+            '{"fake":2,"html":1}',
+            memoryview(b'{"fake":2,"html":1}'),
+        ],
+        ids=["decoded json", "json text", "uncompressed bytea"],
+    )
+    def test_values_stored_before_compression_are_read_back(self, stored_value):
+        """
+        Given results stored before compression, either in a `json` column as decoded by
+            `psycopg2` or `asyncpg`, or in a `bytea` column converted from `json`
+        When the stored value is read back
+        Then the results are returned as a dict
+        """
+        # When
+        value = CompressedJSON().process_result_value(stored_value, dialect=None)
+
+        # Then
+        assert value == {"fake": 2, "html": 1}
@@ -0,0 +1,115 @@
+"""
+This module holds tests for the `CompressionMiddleware` class
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from serializers.compression import (
+    CompressionMiddleware,
+    is_content_encoding_available,
+    select_content_encoding,
+)
+
+LARGE_BODY = "fake html " * 1000
+
+
+def build_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+
+    @app.get("/large")
+    def large():
+        return PlainTextResponse(LARGE_BODY)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("fake")
+
+    @app.get("/events")
+    def events():
+        return StreamingResponse(iter([LARGE_BODY]), media_type="text/event-stream")
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([LARGE_BODY, LARGE_BODY]), media_type="text/plain")
+
+    return TestClient(app)
+
+
+class TestCompressionMiddleware:
+    def test_compresses_large_responses_with_gzip(self):
+        """
+        Given a client which only accepts gzip
+        When a large response is requested
+        Then the response is compressed with gzip and its length is that of the compressed body
+        """
+        # Given
+        client = build_client()
+
+        # When
+        response = client.get("/large", headers={"Accept-Encoding": "gzip"})
+
+        # Then
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert int(response.headers["Content-Length"]) < len(LARGE_BODY)
+        assert response.text == LARGE_BODY
+
+    def test_compresses_streamed_responses(self):
+        """
+        Given a client which only accepts gzip
+        When a response is streamed in several parts
+        Then the parts are compressed as 1 gzip stream
+        """
+        # Given
+        client = build_client()
+
+        # When
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        # Then
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.text == LARGE_BODY * 2
+
+    @pytest.mark.parametrize("path", ["/small", "/events"])
+    def test_leaves_small_responses_and_event_streams_uncompressed(self, path):
+        """
+        Given a client which accepts gzip
+        When a small response or an event stream is requested
+        Then the response is sent as it is
+        """
+        # Given
+        client = build_client()
+
+        # When
+        response = client.get(path, headers={"Accept-Encoding": "gzip"})
+
+        # Then
+        assert "Content-Encoding" not in response.headers
+
+    @pytest.mark.skipif(not is_content_encoding_available("br"), reason="brotli is not installed")
+    def test_prefers_brotli_if_both_are_accepted(self):
+        """
+        Given a client which accepts both gzip and brotli with the same weight
+        When the encoding is selected
+        Then brotli is selected, unless it is given a lower weight
+        """
+        # Given
+        accept_encoding = "gzip, deflate, br"
+
+        # When / Then
+        assert select_content_encoding(accept_encoding) == "br"
+        assert select_content_encoding("gzip, br;q=0.5") == "gzip"
+
+    def test_selects_no_encoding_if_none_are_accepted(self):
+        """
+        Given a client which only accepts uncompressed responses
+        When the encoding is selected
+        Then no encoding is selected
+        """
+        # Given
+        accept_encoding = "identity, gzip;q=0"
+
+        # When / Then
+        assert select_content_encoding(accept_encoding) is None
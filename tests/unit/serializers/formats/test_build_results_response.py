@@ -0,0 +1,91 @@
+"""
+This module holds tests for the `build_results_response` function
+"""
+import collections
+import datetime
+
+import orjson
+import pytest
+
+from serializers.formats import (
+    COLUMNAR_JSON_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    build_results_response,
+    is_media_type_available,
+)
+
+CREATED_AT = datetime.datetime(2022, 4, 1, 12, 30, tzinfo=datetime.timezone.utc)
+
+
+def build_output():
+    return {
+        "target_url": "https://fake.com",
+        "created at": CREATED_AT,
+        "status": "DONE",
+        "results": collections.Counter({"fake": 2, "html": 1}),
+    }
+
+
+class TestBuildResultsResponse:
+    def test_encodes_results_as_an_object_by_default(self):
+        """
+        Given the output of a page holding a `datetime` and a `Counter`
+        When `build_results_response()` is called with the default format
+        Then the output is encoded as JSON with the results as an object
+        """
+        # Given
+        output = build_output()
+
+        # When
+        response = build_results_response(output)
+
+        # Then
+        assert response.media_type == JSON_MEDIA_TYPE
+        assert orjson.loads(response.body) == {
+            "target_url": "https://fake.com",
+            "created at": "2022-04-01T12:30:00+00:00",
+            "status": "DONE",
+            "results": {"fake": 2, "html": 1},
+        }
+
+    def test_encodes_results_as_columns(self):
+        """
+        Given the output of a page
+        When `build_results_response()` is called with the columnar format
+        Then the results are encoded as parallel arrays of words and counts
+        """
+        # Given
+        output = build_output()
+
+        # When
+        response = build_results_response(output, media_type=COLUMNAR_JSON_MEDIA_TYPE)
+
+        # Then
+        assert response.media_type == COLUMNAR_JSON_MEDIA_TYPE
+        assert orjson.loads(response.body)["results"] == {
+            "words": ["fake", "html"],
+            "counts": [2, 1],
+        }
+
+    @pytest.mark.skipif(
+        not is_media_type_available(MSGPACK_MEDIA_TYPE), reason="msgpack is not installed"
+    )
+    def test_encodes_columns_with_msgpack(self):
+        """
+        Given the output of a page
+        When `build_results_response()` is called with the MessagePack format
+        Then the columnar output is encoded with MessagePack
+        """
+        # Given
+        import msgpack
+
+        output = build_output()
+
+        # When
+        response = build_results_response(output, media_type=MSGPACK_MEDIA_TYPE)
+
+        # Then
+        decoded_output = msgpack.unpackb(response.body)
+        assert decoded_output["created at"] == CREATED_AT.isoformat()
+        assert decoded_output["results"] == {"words": ["fake", "html"], "counts": [2, 1]}
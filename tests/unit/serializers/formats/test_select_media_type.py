@@ -0,0 +1,60 @@
+"""
+This module holds tests for the `select_media_type` function
+"""
+from unittest import mock
+
+import pytest
+
+from serializers.formats import (
+    COLUMNAR_JSON_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    select_media_type,
+)
+
+
+class TestSelectMediaType:
+    @pytest.mark.parametrize(
+        "accept, expected_media_type",
+        [
+            (None, JSON_MEDIA_TYPE),
+            ("*/*", JSON_MEDIA_TYPE),
+            ("text/html", JSON_MEDIA_TYPE),
+            ("application/vnd.nate.columnar+json", COLUMNAR_JSON_MEDIA_TYPE),
+            ("application/json;q=0.5, application/vnd.nate.columnar+json", COLUMNAR_JSON_MEDIA_TYPE),
+            ("application/vnd.nate.columnar+json;q=0.5, */*", JSON_MEDIA_TYPE),
+        ],
+    )
+    def test_selects_the_accepted_format_with_the_highest_weight(
+        self, accept, expected_media_type
+    ):
+        """
+        Given an `Accept` header
+        When `select_media_type()` is called
+        Then the available format with the highest weight is selected,
+            falling back to JSON
+        """
+        # Given / When
+        media_type = select_media_type(accept)
+
+        # Then
+        assert media_type == expected_media_type
+
+    @mock.patch("serializers.formats.importlib.util.find_spec")
+    def test_falls_back_to_json_if_msgpack_is_not_installed(self, mocked_find_spec):
+        """
+        Given MessagePack is requested but `msgpack` is not installed
+        When `select_media_type()` is called
+        Then JSON is selected
+
+        Patches:
+            `mocked_find_spec`: To report that `msgpack` is not installed
+        """
+        # Given
+        mocked_find_spec.return_value = None
+
+        # When
+        media_type = select_media_type(MSGPACK_MEDIA_TYPE)
+
+        # Then
+        assert media_type == JSON_MEDIA_TYPE
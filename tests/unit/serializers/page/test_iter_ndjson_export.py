@@ -0,0 +1,75 @@
+"""
+This module holds tests for the `iter_ndjson_export` function
+"""
+import datetime
+import json
+from typing import NamedTuple, Optional
+
+from serializers.page import iter_ndjson_export
+
+CREATED_AT = datetime.datetime(2022, 4, 1, tzinfo=datetime.timezone.utc)
+
+
+class ExportRow(NamedTuple):
+    id: int
+    target_url: str
+    status: str
+    created_at: datetime.datetime
+    results: Optional[dict]
+
+
+class TestIterNdjsonExport:
+    def test_writes_1_page_per_line_filtered_by_min_count(self):
+        """
+        Given exported rows, 1 of which has no results yet
+        When `iter_ndjson_export()` is called with a `min_count`
+        Then each page is written on its own line
+            and only words occurring at least `min_count` times are included
+        """
+        # Given
+        rows = [
+            ExportRow(1, "https://a.com", "DONE", CREATED_AT, {"a": 3, "b": 1}),
+            ExportRow(2, "https://b.com", "STARTED", CREATED_AT, None),
+        ]
+
+        # When
+        ndjson = "".join(iter_ndjson_export(rows, min_count=2))
+
+        # Then
+        lines = [json.loads(line) for line in ndjson.splitlines()]
+        assert lines == [
+            {
+                "id": 1,
+                "target_url": "https://a.com",
+                "status": "DONE",
+                "created_at": CREATED_AT.isoformat(),
+                "results": {"a": 3},
+            },
+            {
+                "id": 2,
+                "target_url": "https://b.com",
+                "status": "STARTED",
+                "created_at": CREATED_AT.isoformat(),
+                "results": {},
+            },
+        ]
+
+    def test_buffers_lines_into_chunks(self):
+        """
+        Given more rows than fit within the `buffer_size`
+        When `iter_ndjson_export()` is called
+        Then lines are yielded in several chunks, each ending on a line boundary
+        """
+        # Given
+        rows = (
+            ExportRow(page_id, "https://a.com", "DONE", CREATED_AT, {"a": 1})
+            for page_id in range(100)
+        )
+
+        # When
+        chunks = list(iter_ndjson_export(rows, buffer_size=1024))
+
+        # Then
+        assert 1 < len(chunks) < 100
+        assert all(chunk.endswith("\n") for chunk in chunks)
+        assert sum(chunk.count("\n") for chunk in chunks) == 100
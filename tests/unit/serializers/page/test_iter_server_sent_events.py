@@ -0,0 +1,37 @@
+"""
+This module holds tests for the `iter_server_sent_events` function
+"""
+import asyncio
+
+from serializers.page import iter_server_sent_events
+
+
+async def _iter_statuses(*statuses):
+    for status in statuses:
+        yield status
+
+
+class TestIterServerSentEvents:
+    def test_writes_status_events_and_keep_alives(self):
+        """
+        Given a page created without a status which is then started and done
+        When `iter_server_sent_events()` is called
+        Then the first status is sent as an event even though it is None
+            and later Nones are sent as keep-alive comments
+        """
+        # Given
+        statuses = _iter_statuses(None, None, "STARTED", "DONE")
+
+        async def collect():
+            return [chunk async for chunk in iter_server_sent_events(1, statuses)]
+
+        # When
+        chunks = asyncio.run(collect())
+
+        # Then
+        assert chunks == [
+            'event: status\ndata: {"page_id": 1, "status": null}\n\n',
+            ": keep-alive\n\n",
+            'event: status\ndata: {"page_id": 1, "status": "STARTED"}\n\n',
+            'event: status\ndata: {"page_id": 1, "status": "DONE"}\n\n',
+        ]
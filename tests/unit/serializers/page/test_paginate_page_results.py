@@ -0,0 +1,96 @@
+"""
+This module holds tests for the `paginate_page_results` function
+"""
+from unittest import mock
+
+import pytest
+
+from db.models.cursors import InvalidCursorError, decode_cursor
+from db.models.page import Page
+from serializers.page import paginate_page_results
+
+
+class TestPaginatePageResults:
+    def test_slices_results_field_when_word_counts_are_not_stored(self):
+        """
+        Given a page without stored word counts
+        When `paginate_page_results()` is called for each cursor in turn
+        Then every result is returned once, in frequency order
+        """
+        # Given
+        page = Page(has_word_counts=False, results={"a": 1, "b": 3, "c": 2})
+        slices, after = [], None
+
+        # When
+        while True:
+            results, next_cursor = paginate_page_results(
+                page=page, ordering="frequency", limit=2, after=after
+            )
+            slices.append(results)
+            if next_cursor is None:
+                break
+            after = decode_cursor(next_cursor)
+
+        # Then
+        assert slices == [{"b": 3, "c": 2}, {"a": 1}]
+
+    @mock.patch("serializers.page.crud.get_page_word_counts")
+    def test_reads_word_counts_table_when_stored(self, mocked_get_page_word_counts):
+        """
+        Given a page with stored word counts and more rows than the `limit`
+        When `paginate_page_results()` is called
+        Then 1 extra row is requested to detect the next slice
+            and the cursor holds the last returned row
+
+        Patches:
+            `mocked_get_page_word_counts`: For the main assertion
+        """
+        # Given
+        mocked_page = mock.Mock(has_word_counts=True, id=1)
+        mocked_get_page_word_counts.return_value = [("b", 3), ("c", 2), ("a", 1)]
+
+        # When
+        results, next_cursor = paginate_page_results(
+            page=mocked_page, ordering="frequency", limit=2
+        )
+
+        # Then
+        assert mocked_get_page_word_counts.call_args.kwargs["limit"] == 3
+        assert results == {"b": 3, "c": 2}
+        assert decode_cursor(next_cursor) == {"word": "c", "count": 2}
+
+    @pytest.mark.parametrize("after", [{"offset": "x"}, {"offset": -5}, {"offset": True}, {}])
+    def test_malformed_offset_is_rejected(self, after):
+        """
+        Given a page without stored word counts
+        When `paginate_page_results()` is called with a malformed offset position
+        Then an `InvalidCursorError` is raised
+        """
+        # Given
+        page = Page(has_word_counts=False, results={"a": 1})
+
+        # When / Then
+        with pytest.raises(InvalidCursorError):
+            paginate_page_results(page=page, ordering="frequency", limit=2, after=after)
+
+    @pytest.mark.parametrize(
+        "after", [{"offset": 2}, {"word": 1, "count": 2}, {"word": "a", "count": "2"}]
+    )
+    @mock.patch("serializers.page.crud.get_page_word_counts")
+    def test_malformed_word_count_position_is_rejected(self, mocked_get_page_word_counts, after):
+        """
+        Given a page with stored word counts
+        When `paginate_page_results()` is called with a malformed word count position,
+            including the offset position of pages without stored word counts
+        Then an `InvalidCursorError` is raised before the table is read
+
+        Patches:
+            `mocked_get_page_word_counts`: To check the table is not read
+        """
+        # Given
+        mocked_page = mock.Mock(has_word_counts=True, id=1)
+
+        # When / Then
+        with pytest.raises(InvalidCursorError):
+            paginate_page_results(page=mocked_page, ordering="frequency", limit=2, after=after)
+        mocked_get_page_word_counts.assert_not_called()
@@ -0,0 +1,58 @@
+"""
+This module holds tests for the `paginate_page_results_async` function
+"""
+import asyncio
+from unittest import mock
+
+from db.models.cursors import decode_cursor
+from db.models.page import Page
+from serializers.page import paginate_page_results_async
+
+
+class TestPaginatePageResultsAsync:
+    @mock.patch("serializers.page.async_crud.get_page_word_counts", new_callable=mock.AsyncMock)
+    def test_awaits_word_counts_table_when_stored(self, mocked_get_page_word_counts):
+        """
+        Given a page with stored word counts and more rows than the `limit`
+        When `paginate_page_results_async()` is awaited
+        Then the rows are read through the asynchronous session
+            and the cursor holds the last returned row
+
+        Patches:
+            `mocked_get_page_word_counts`: For the main assertion
+        """
+        # Given
+        page = Page(id=1, has_word_counts=True)
+        mocked_db = mock.Mock()
+        mocked_get_page_word_counts.return_value = [("b", 3), ("c", 2), ("a", 1)]
+
+        # When
+        results, next_cursor = asyncio.run(
+            paginate_page_results_async(page=page, ordering="frequency", limit=2, db=mocked_db)
+        )
+
+        # Then
+        mocked_get_page_word_counts.assert_awaited_once()
+        assert mocked_get_page_word_counts.call_args.kwargs["db"] == mocked_db
+        assert results == {"b": 3, "c": 2}
+        assert decode_cursor(next_cursor) == {"word": "c", "count": 2}
+
+    def test_slices_results_field_without_querying(self):
+        """
+        Given a page without stored word counts
+        When `paginate_page_results_async()` is awaited
+        Then the slice is taken from the `results` field without using the session
+        """
+        # Given
+        page = Page(has_word_counts=False, results={"a": 1, "b": 3, "c": 2})
+        mocked_db = mock.Mock()
+
+        # When
+        results, next_cursor = asyncio.run(
+            paginate_page_results_async(page=page, ordering="alphabetical", limit=5, db=mocked_db)
+        )
+
+        # Then
+        assert results == {"a": 1, "b": 3, "c": 2}
+        assert next_cursor is None
+        assert not mocked_db.mock_calls
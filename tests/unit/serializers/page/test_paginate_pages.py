@@ -0,0 +1,72 @@
+"""
+This module holds tests for the `paginate_pages` function
+"""
+import datetime
+from unittest import mock
+
+import pytest
+
+from db.models.cursors import InvalidCursorError, decode_cursor
+from db.models.page import Page
+from serializers.page import paginate_pages
+
+CREATED_AT = datetime.datetime(2022, 4, 1, tzinfo=datetime.timezone.utc)
+
+
+class TestPaginatePages:
+    @mock.patch("serializers.page.crud.get_pages")
+    def test_cursor_holds_position_of_last_returned_page(self, mocked_get_pages):
+        """
+        Given more pages than the `limit`
+        When `paginate_pages()` is called
+        Then 1 extra page is requested to detect the next slice
+            and the cursor holds the `created_at` and `id` of the last returned page
+
+        Patches:
+            `mocked_get_pages`: For the main assertion
+        """
+        # Given
+        mocked_get_pages.return_value = [
+            Page(id=page_id, created_at=CREATED_AT) for page_id in (3, 2, 1)
+        ]
+
+        # When
+        pages, next_cursor = paginate_pages(limit=2)
+
+        # Then
+        assert mocked_get_pages.call_args.kwargs["limit"] == 3
+        assert [page.id for page in pages] == [3, 2]
+        assert decode_cursor(next_cursor) == {"created_at": CREATED_AT.isoformat(), "id": 2}
+
+    @mock.patch("serializers.page.crud.get_pages")
+    def test_decodes_position_from_previous_cursor(self, mocked_get_pages):
+        """
+        Given the position decoded from a previous cursor
+        When `paginate_pages()` is called
+        Then pages are requested after that `created_at` and `id`
+            and no cursor is returned once the last slice has been read
+
+        Patches:
+            `mocked_get_pages`: For the main assertion
+        """
+        # Given
+        mocked_get_pages.return_value = [Page(id=1, created_at=CREATED_AT)]
+        after = {"created_at": CREATED_AT.isoformat(), "id": 2}
+
+        # When
+        pages, next_cursor = paginate_pages(limit=2, after=after)
+
+        # Then
+        assert mocked_get_pages.call_args.kwargs["after"] == (CREATED_AT, 2)
+        assert next_cursor is None
+
+    @pytest.mark.parametrize("after", [{}, {"offset": 10}, {"created_at": "yesterday", "id": 1}])
+    def test_raises_for_cursor_without_page_position(self, after):
+        """
+        Given a cursor position which does not identify a page
+        When `paginate_pages()` is called
+        Then an `InvalidCursorError` is raised
+        """
+        # When / Then
+        with pytest.raises(InvalidCursorError):
+            paginate_pages(limit=2, after=after)